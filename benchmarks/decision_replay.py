@@ -0,0 +1,349 @@
+"""Replays recorded decision tasks through a floto.decider.Decider without touching SWF and
+reports the decision throughput, the per-decision latency and allocations. The produced decisions
+are compared with the decisions recorded in the history, so refactorings can be checked for
+behaviour changes.
+
+The decision tasks are read from a JSON-lines file, one decision task per line:
+
+    {"response": <PollForDecisionTask response, first page>,
+     "pages": {<nextPageToken>: <PollForDecisionTask response of that page>, ...},
+     "describe": <DescribeWorkflowExecution response>}
+
+"pages" and "describe" are optional. Event timestamps are epoch seconds, as in the SWF wire
+format. decision_tasks_from_history() turns a complete history (e.g. from
+GetWorkflowExecutionHistory) into this format.
+
+Run with: python benchmarks/decision_replay.py decider_spec.json tasks.jsonl [repeat]
+"""
+import collections
+import datetime as dt
+import json
+import sys
+import time
+import tracemalloc
+
+import floto
+import floto.decider
+
+EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+DEFAULT_DESCRIPTION = {'openCounts': {'openActivityTasks': 0, 'openTimers': 0}}
+
+# Event type -> (decision type, attribute identifying the decision)
+EVENT_DECISIONS = {
+    'ActivityTaskScheduled': ('ScheduleActivityTask', 'activityId'),
+    'ScheduleActivityTaskFailed': ('ScheduleActivityTask', 'activityId'),
+    'ActivityTaskCancelRequested': ('RequestCancelActivityTask', 'activityId'),
+    'RequestCancelActivityTaskFailed': ('RequestCancelActivityTask', 'activityId'),
+    'TimerStarted': ('StartTimer', 'timerId'),
+    'StartTimerFailed': ('StartTimer', 'timerId'),
+    'TimerCanceled': ('CancelTimer', 'timerId'),
+    'CancelTimerFailed': ('CancelTimer', 'timerId'),
+    'MarkerRecorded': ('RecordMarker', 'markerName'),
+    'RecordMarkerFailed': ('RecordMarker', 'markerName'),
+    'WorkflowExecutionCompleted': ('CompleteWorkflowExecution', None),
+    'CompleteWorkflowExecutionFailed': ('CompleteWorkflowExecution', None),
+    'WorkflowExecutionFailed': ('FailWorkflowExecution', None),
+    'FailWorkflowExecutionFailed': ('FailWorkflowExecution', None),
+    'WorkflowExecutionCanceled': ('CancelWorkflowExecution', None),
+    'CancelWorkflowExecutionFailed': ('CancelWorkflowExecution', None),
+    'WorkflowExecutionContinuedAsNew': ('ContinueAsNewWorkflowExecution', None),
+    'ContinueAsNewWorkflowExecutionFailed': ('ContinueAsNewWorkflowExecution', None),
+    'StartChildWorkflowExecutionInitiated': ('StartChildWorkflowExecution', None),
+    'StartChildWorkflowExecutionFailed': ('StartChildWorkflowExecution', None),
+    'SignalExternalWorkflowExecutionInitiated': ('SignalExternalWorkflowExecution',
+                                                 'signalName'),
+    'SignalExternalWorkflowExecutionFailed': ('SignalExternalWorkflowExecution', None),
+    'RequestCancelExternalWorkflowExecutionInitiated': (
+        'RequestCancelExternalWorkflowExecution', None),
+    'RequestCancelExternalWorkflowExecutionFailed': (
+        'RequestCancelExternalWorkflowExecution', None)}
+
+# Decision type -> attribute identifying the decision
+DECISION_KEYS = {decision_type: key for decision_type, key in EVENT_DECISIONS.values()}
+
+
+def load_decision_tasks(path):
+    with open(path) as f:
+        return [_decode_task(json.loads(line)) for line in f if line.strip()]
+
+
+def write_decision_tasks(path, tasks):
+    with open(path, 'w') as f:
+        for task in tasks:
+            f.write(json.dumps(task, default=_encode_datetime, sort_keys=True) + '\n')
+
+
+def decision_tasks_from_history(events, workflow_execution, workflow_type=None, page_size=None):
+    """The decision tasks of a complete workflow history, one per DecisionTaskStarted event.
+
+    Parameters
+    ----------
+    events: list
+        All events of the workflow execution, in any order
+    workflow_execution: dict
+        {'workflowId': ..., 'runId': ...}
+    workflow_type: dict
+    page_size: int
+        If given, the events of each decision task are split into pages of <page_size> events
+    """
+    events = sorted(events, key=lambda e: e['eventId'])
+    started_ids = [e['eventId'] for e in events if e['eventType'] == 'DecisionTaskStarted']
+    tasks = []
+    for previous_started_id, started_id in zip([0] + started_ids, started_ids):
+        reverse_events = list(reversed(events[:started_id]))
+        size = page_size or len(reverse_events)
+        pages = [reverse_events[i:i + size] for i in range(0, len(reverse_events), size)]
+        tokens = ['{}:{}'.format(started_id, i) for i in range(1, len(pages))]
+
+        response = {'events': pages[0],
+                    'previousStartedEventId': previous_started_id,
+                    'startedEventId': started_id,
+                    'taskToken': 'task_token:{}'.format(started_id),
+                    'workflowExecution': workflow_execution,
+                    'workflowType': workflow_type or {}}
+        task = {'response': response, 'pages': {}}
+        for token, page_events in zip(tokens, pages[1:]):
+            task['pages'][token] = {'events': page_events}
+        for page, token in zip([response] + [task['pages'][t] for t in tokens], tokens):
+            page['nextPageToken'] = token
+        tasks.append(task)
+    return tasks
+
+
+def recorded_decisions(events_by_id, started_event_id):
+    """Keys (see decision_key) of the decisions of the decision task <started_event_id> as recorded
+    in the history, None if the decision task has not been completed in the recorded events."""
+    completed_id = None
+    for event in events_by_id.values():
+        if event['eventType'] == 'DecisionTaskCompleted' and \
+                _attributes(event).get('startedEventId') == started_event_id:
+            completed_id = event['eventId']
+            break
+    if completed_id is None:
+        return None
+
+    decisions = collections.Counter()
+    for event in events_by_id.values():
+        if event['eventType'] in EVENT_DECISIONS and \
+                _attributes(event).get('decisionTaskCompletedEventId') == completed_id:
+            decision_type, key = EVENT_DECISIONS[event['eventType']]
+            decisions[(decision_type, _attributes(event).get(key) if key else None)] += 1
+    return decisions
+
+
+def decision_key(decision):
+    """(decisionType, id) of a decision as sent to SWF, e.g. ('StartTimer', 'timer_id')."""
+    decision_type = decision['decisionType']
+    key = DECISION_KEYS.get(decision_type)
+    attributes_key = decision_type[:1].lower() + decision_type[1:] + 'DecisionAttributes'
+    value = decision.get(attributes_key, {}).get(key) if key else None
+    return decision_type, value
+
+
+class ReplaySwf(object):
+    """Stands in for floto.api.Swf and its boto3 client while decision tasks are replayed."""
+
+    def __init__(self):
+        self.task = None
+        self.events_by_id = {}
+        self.decisions = None
+        self.client = self
+
+    def poll_for_decision_task_page(self, domain=None, task_list=None, page_token=None,
+                                    page_size=None):
+        if page_token:
+            return self.task['pages'][page_token]
+        return self.task['response']
+
+    def poll_page(self, domain, task_list, page_token):
+        return self.task['pages'][page_token]
+
+    def describe_workflow_execution(self, domain, workflow_id, run_id):
+        return self.task.get('describe') or DEFAULT_DESCRIPTION
+
+    def respond_decision_task_completed(self, taskToken=None, decisions=None):
+        self.decisions = decisions
+
+    def start_workflow_execution(self, **args):
+        pass
+
+    def workflow_start_event(self):
+        return self.events_by_id[min(self.events_by_id)]
+
+
+class DecisionReplay(object):
+    """Replays decision tasks through deciders created by <decider_factory>. Each workflow
+    execution (runId) gets its own decider, the decision tasks of an execution are replayed in
+    order."""
+
+    def __init__(self, decider_factory, tasks):
+        """
+        Parameters
+        ----------
+        decider_factory: callable
+            Returns a new floto.decider.Decider
+        tasks: list
+            Decision tasks, see load_decision_tasks
+        """
+        self.decider_factory = decider_factory
+        self.tasks_by_run = collections.OrderedDict()
+        self.events_by_run = {}
+        for task in tasks:
+            run_id = task['response']['workflowExecution']['runId']
+            self.tasks_by_run.setdefault(run_id, []).append(task)
+            events = self.events_by_run.setdefault(run_id, {})
+            for page in [task['response']] + list(task.get('pages', {}).values()):
+                events.update((e['eventId'], e) for e in page['events'])
+
+    @property
+    def number_tasks(self):
+        return sum(len(tasks) for tasks in self.tasks_by_run.values())
+
+    def run(self, trace_allocations=False):
+        """Replays all decision tasks.
+
+        Parameters
+        ----------
+        trace_allocations: bool
+            If True, the memory allocated per decision is traced with tracemalloc, which slows
+            down the replay. Do not combine with latency measurements.
+
+        Returns
+        -------
+        dict: latencies (seconds per decision task), allocations (peak bytes allocated per
+            decision task, if traced), mismatches (decisions which differ from the recorded ones) and
+            errors (decision tasks which raised)
+        """
+        result = {'latencies': [], 'allocations': [], 'mismatches': [], 'errors': []}
+        if trace_allocations:
+            tracemalloc.start()
+        try:
+            for run_id, tasks in self.tasks_by_run.items():
+                self._replay_run(run_id, tasks, result, trace_allocations)
+        finally:
+            if trace_allocations:
+                tracemalloc.stop()
+        return result
+
+    def _replay_run(self, run_id, tasks, result, trace_allocations):
+        swf = ReplaySwf()
+        swf.events_by_id = self.events_by_run[run_id]
+        decider = self._create_decider(swf)
+
+        for task in tasks:
+            swf.task = task
+            swf.decisions = None
+            if trace_allocations:
+                if hasattr(tracemalloc, 'reset_peak'):
+                    tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+            started_id = task['response']['startedEventId']
+            start = time.perf_counter()
+            try:
+                decider.poll_for_decision()
+                decider.get_decisions()
+                decider.complete()
+            except Exception as e:
+                result['errors'].append({'run_id': run_id,
+                                         'started_event_id': started_id,
+                                         'error': repr(e)})
+                decider = self._create_decider(swf)
+                continue
+            result['latencies'].append(time.perf_counter() - start)
+            if trace_allocations:
+                _, peak = tracemalloc.get_traced_memory()
+                result['allocations'].append(peak - before)
+
+            expected = recorded_decisions(swf.events_by_id, started_id)
+            produced = collections.Counter(decision_key(d) for d in swf.decisions or [])
+            if expected is not None and expected != produced:
+                result['mismatches'].append({'run_id': run_id,
+                                             'started_event_id': started_id,
+                                             'missing': sorted(expected - produced, key=str),
+                                             'unexpected': sorted(produced - expected, key=str)})
+
+    def _create_decider(self, swf):
+        decider = self.decider_factory()
+        decider.swf = swf
+
+        class ReplayHistory(decider.history_class):
+            _poll_page = staticmethod(swf.poll_page)
+
+            def _fetch_workflow_start_event(self):
+                return swf.workflow_start_event()
+
+        decider.history_class = ReplayHistory
+        return decider
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of <values>."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(int(round(p / 100.0 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def report(replay, repeat=1, trace_allocations=True):
+    latencies = []
+    for _ in range(repeat):
+        result = replay.run()
+        latencies.extend(result['latencies'])
+
+    total = sum(latencies)
+    print('{} decision tasks of {} workflow executions, {} repetition(s)'.format(
+        replay.number_tasks, len(replay.tasks_by_run), repeat))
+    print('decision tasks raising an error: {}'.format(len(result['errors'])))
+    print('decisions/s: {:.1f}'.format(len(latencies) / total if total else 0.0))
+    print('latency p50: {:.3f} ms  p99: {:.3f} ms  max: {:.3f} ms'.format(
+        percentile(latencies, 50) * 1000, percentile(latencies, 99) * 1000,
+        max(latencies or [0]) * 1000))
+
+    if trace_allocations:
+        allocations = replay.run(trace_allocations=True)['allocations']
+        print('peak allocations per decision p50: {:.1f} KiB  p99: {:.1f} KiB'.format(
+            percentile(allocations, 50) / 1024, percentile(allocations, 99) / 1024))
+
+    for error in result['errors'][:20]:
+        print('  run {run_id} decision task {started_event_id} raised {error}'.format(**error))
+    mismatches = result['mismatches']
+    print('decisions differing from the recorded ones: {}'.format(len(mismatches)))
+    for mismatch in mismatches[:20]:
+        print('  run {run_id} decision task {started_event_id}: missing {missing}, '
+              'unexpected {unexpected}'.format(**mismatch))
+    return result
+
+
+def main(decider_spec_path, tasks_path, repeat=1):
+    with open(decider_spec_path) as f:
+        decider_spec = f.read()
+    tasks = load_decision_tasks(tasks_path)
+    replay = DecisionReplay(lambda: floto.decider.Decider(decider_spec=decider_spec), tasks)
+    report(replay, repeat=int(repeat))
+
+
+def _attributes(event):
+    event_type = event['eventType']
+    return event.get(event_type[:1].lower() + event_type[1:] + 'EventAttributes', {})
+
+
+def _decode_task(task):
+    for page in [task['response']] + list(task.get('pages', {}).values()):
+        for event in page['events']:
+            if isinstance(event.get('eventTimestamp'), (int, float)):
+                event['eventTimestamp'] = EPOCH + dt.timedelta(seconds=event['eventTimestamp'])
+    return task
+
+
+def _encode_datetime(obj):
+    if isinstance(obj, dt.datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=dt.timezone.utc)
+        return (obj - EPOCH).total_seconds()
+    raise TypeError('{!r} is not JSON serializable'.format(obj))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
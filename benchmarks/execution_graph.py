@@ -0,0 +1,60 @@
+"""Builds execution graphs of random DAGs and reports the time and memory needed for the
+adjacency lists, the first and outgoing tasks and the transitive reduction.
+
+Each task requires up to <degree> tasks chosen among the <window> preceding tasks.
+
+Run with: python benchmarks/execution_graph.py [degree] [window]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+import floto.decider
+from floto.specs import ActivityTask
+
+SIZES = [100, 1000, 10000, 100000]
+
+
+def random_dag(number_tasks, degree=3, window=1000, seed=0):
+    """List of ActivityTasks of a random DAG, in random order."""
+    rnd = random.Random(seed)
+    tasks = []
+    for i in range(number_tasks):
+        candidates = tasks[max(0, i - window):]
+        requires = rnd.sample(candidates, min(rnd.randint(0, degree), len(candidates)))
+        tasks.append(ActivityTask(name='task', version='1', activity_id='task_{}'.format(i),
+                                  requires=requires or None))
+    rnd.shuffle(tasks)
+    return tasks
+
+
+def measure(tasks):
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph = floto.decider.ExecutionGraph(activity_tasks=tasks)
+    graph.get_first_tasks()
+    graph.outgoing_vertices()
+    construction = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reduced_edges = sum(len(s) for s in graph.reduced_successors)
+    reduction = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    edges = sum(len(s) for s in graph.successors)
+    return construction, reduction, peak, edges, reduced_edges
+
+
+def main(degree=3, window=1000):
+    print('{:>8} {:>8} {:>8} {:>12} {:>12} {:>10}'.format(
+        'tasks', 'edges', 'reduced', 'build [s]', 'reduce [s]', 'peak [MB]'))
+    for number_tasks in SIZES:
+        tasks = random_dag(number_tasks, degree, window)
+        construction, reduction, peak, edges, reduced_edges = measure(tasks)
+        print('{:>8} {:>8} {:>8} {:>12.4f} {:>12.4f} {:>10.1f}'.format(
+            number_tasks, edges, reduced_edges, construction, reduction, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,40 @@
+"""Compares the memory used by floto.History and floto.ColumnarHistory.
+
+Run with: python benchmarks/history_memory.py [number_events]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+import floto
+from synthetic_history import generate_response
+
+
+def measure(history_class, number_events):
+    """Memory retained by the history after the response (as parsed by boto3) is released."""
+    gc.collect()
+    tracemalloc.start()
+    response = generate_response(number_events)
+    start = time.perf_counter()
+    history = history_class(domain='d', task_list='tl', response=response)
+    duration = time.perf_counter() - start
+    del response
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return history, retained, peak, duration
+
+
+def main(number_events=25000):
+    print('{:<16} {:>8} {:>14} {:>14} {:>10}'.format('store', 'events', 'retained KiB',
+                                                     'peak KiB', 'read s'))
+    for history_class in [floto.History, floto.ColumnarHistory]:
+        history, retained, peak, duration = measure(history_class, number_events)
+        print('{:<16} {:>8} {:>14.1f} {:>14.1f} {:>10.3f}'.format(
+            history_class.__name__, len(history.events_by_id), retained / 1024, peak / 1024,
+            duration))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
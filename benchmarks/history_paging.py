@@ -0,0 +1,37 @@
+"""Reads a synthetic history page by page and reports the time needed per page. The indexing
+cost per page must not grow with the number of pages already read.
+
+Run with: python benchmarks/history_paging.py [number_events] [page_size] [parallel]
+"""
+import sys
+import time
+
+import floto
+from synthetic_history import generate_events, generate_pages
+
+
+def main(number_events=25000, page_size=1000, parallel=500):
+    events = generate_events(number_events, failure_rate=0.1, parallel=parallel)
+    pages = generate_pages(events, page_size)
+    pages_by_token = {'page_{}'.format(i): p for i, p in enumerate(pages)}
+    # Serve the pages from memory instead of SWF
+    floto.History._poll_page = staticmethod(lambda domain, task_list, token:
+                                            pages_by_token[token])
+
+    for history_class in [floto.History, floto.ColumnarHistory]:
+        start = time.perf_counter()
+        history = history_class(domain='d', task_list='tl', response=pages[0])
+        page_durations = [time.perf_counter() - start]
+        while history.next_page_token:
+            start = time.perf_counter()
+            history._read_next_event_page()
+            page_durations.append(time.perf_counter() - start)
+
+        print('{}: {} pages of {} events, total {:.3f}s'.format(
+            history_class.__name__, len(page_durations), page_size, sum(page_durations)))
+        print('  first 5 pages: ' + ' '.join('{:.4f}'.format(d) for d in page_durations[:5]))
+        print('  last 5 pages:  ' + ' '.join('{:.4f}'.format(d) for d in page_durations[-5:]))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
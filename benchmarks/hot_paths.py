@@ -0,0 +1,176 @@
+"""Micro-benchmarks of floto's hot paths, each measured on its own:
+
+    history_init             floto.History.__init__ on synthetic responses of 1k, 10k, 25k events
+    events_for_decision      History.get_events_for_decision of the whole history
+    graph_from_task_specs    ExecutionGraph.graph_from_task_specs of random DAGs
+    transitive_reduction     ExecutionGraph.transitive_reduction of random DAGs
+    decision_builder         DecisionBuilder.get_decisions of all decision tasks of a fan-out/fan-in
+                             workflow (see synthetic_history.generate_dag_events)
+    json_dump, json_load     JSON round-trip of large DeciderSpecs (floto.specs.JSONEncoder)
+
+Each operation is repeated <repeat> times, the best and the median time per operation are
+reported. Setup work (e.g. creating the History a decision is made on) is not timed.
+
+Run with: python benchmarks/hot_paths.py [benchmark ...] [--repeat 5] [--output results.json]
+"""
+import argparse
+import collections
+import json
+import sys
+import time
+
+import floto
+import floto.decider
+from floto.specs import ActivityTask, DeciderSpec
+from floto.specs.retry_strategy import InstantRetry
+from decision_replay import decision_tasks_from_history
+from execution_graph import random_dag
+from synthetic_history import generate_dag_events, generate_response
+
+HISTORY_SIZES = [1000, 10000, 25000]
+GRAPH_SIZES = [100, 1000, 10000]
+FAN_OUT_WIDTHS = [10, 100, 1000]
+SPEC_SIZES = [100, 1000, 10000]
+FAILURE_RATE = 0.1
+
+WORKFLOW_EXECUTION = {'workflowId': 'workflow_id', 'runId': 'run_id'}
+
+
+def history_init():
+    for number_events in HISTORY_SIZES:
+        response = generate_response(number_events, failure_rate=FAILURE_RATE, parallel=10)
+        yield number_events, 1, None, lambda _, r=response: \
+            floto.History(domain='d', task_list='tl', response=r)
+
+
+def events_for_decision():
+    for number_events in HISTORY_SIZES:
+        response = generate_response(number_events, failure_rate=FAILURE_RATE, parallel=10)
+        history = floto.History(domain='d', task_list='tl', response=response)
+        started_id = response['startedEventId']
+        yield number_events, 1, None, lambda _, h=history, s=started_id: \
+            h.get_events_for_decision(1, s)
+
+
+def graph_from_task_specs():
+    for number_tasks in GRAPH_SIZES:
+        tasks = random_dag(number_tasks)
+        yield number_tasks, 1, None, lambda _, t=tasks: \
+            floto.decider.ExecutionGraph(activity_tasks=t).graph_from_task_specs()
+
+
+def transitive_reduction():
+    for number_tasks in GRAPH_SIZES:
+        graph = floto.decider.ExecutionGraph(activity_tasks=random_dag(number_tasks))
+        graph.topological_order()
+        yield number_tasks, 1, None, lambda _, g=graph: g.transitive_reduction(g.successors)
+
+
+def decision_builder():
+    for width in FAN_OUT_WIDTHS:
+        tasks = fan_out_fan_in(width)
+        graph = floto.decider.ExecutionGraph(activity_tasks=tasks)
+        events = generate_dag_events(tasks, failure_rate=FAILURE_RATE)
+        responses = [t['response'] for t in decision_tasks_from_history(events,
+                                                                        WORKFLOW_EXECUTION)]
+
+        def histories(responses=responses):
+            return [floto.History(domain='d', task_list='tl', response=r) for r in responses]
+
+        def get_decisions(histories, graph=graph):
+            for history in histories:
+                floto.decider.DecisionBuilder(graph, 'floto_activities').get_decisions(history)
+
+        yield width, len(responses), histories, get_decisions
+
+
+def json_dump():
+    for number_tasks in SPEC_SIZES:
+        spec = decider_spec(number_tasks)
+        yield number_tasks, 1, None, lambda _, s=spec: s.to_json()
+
+
+def json_load():
+    for number_tasks in SPEC_SIZES:
+        json_spec = decider_spec(number_tasks).to_json()
+        yield number_tasks, 1, None, lambda _, j=json_spec: DeciderSpec.from_json(j)
+
+
+BENCHMARKS = collections.OrderedDict([('history_init', history_init),
+                                      ('events_for_decision', events_for_decision),
+                                      ('graph_from_task_specs', graph_from_task_specs),
+                                      ('transitive_reduction', transitive_reduction),
+                                      ('decision_builder', decision_builder),
+                                      ('json_dump', json_dump),
+                                      ('json_load', json_load)])
+
+
+def fan_out_fan_in(width):
+    """One activity task, <width> tasks requiring it and one task requiring those."""
+    retry_strategy = InstantRetry(retries=1000)
+    root = ActivityTask(name='task', version='1', activity_id='root',
+                        retry_strategy=retry_strategy)
+    parallel = [ActivityTask(name='task', version='1', activity_id='task_{}'.format(i),
+                             requires=[root], input={'n': i}, retry_strategy=retry_strategy)
+                for i in range(width)]
+    join = ActivityTask(name='task', version='1', activity_id='join', requires=parallel,
+                        retry_strategy=retry_strategy)
+    return [root] + parallel + [join]
+
+
+def decider_spec(number_tasks):
+    tasks = random_dag(number_tasks)
+    for i, task in enumerate(tasks):
+        task.input = {'n': i, 'path': 's3://bucket/input/{}'.format(i)}
+        task.retry_strategy = InstantRetry(retries=3)
+    return DeciderSpec(domain='d', task_list='tl', activity_tasks=tasks,
+                       activity_task_list='floto_activities')
+
+
+def measure(setup, function, repeat):
+    """Best and median seconds of <repeat> calls of function(setup())."""
+    durations = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        function(argument)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[0], durations[len(durations) // 2]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='floto micro-benchmarks')
+    parser.add_argument('benchmarks', nargs='*',
+                        help='Any of {}, defaults to all'.format(', '.join(BENCHMARKS)))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Path of the JSON results')
+    args = parser.parse_args(argv)
+    unknown = [b for b in args.benchmarks if b not in BENCHMARKS]
+    if unknown:
+        parser.error('Unknown benchmark(s): {}'.format(', '.join(unknown)))
+    return args
+
+
+def main(argv):
+    args = parse_args(argv)
+    results = []
+    print('{:<22} {:>8} {:>6} {:>14} {:>14}'.format('benchmark', 'size', 'ops', 'best [us/op]',
+                                                    'median [us/op]'))
+    for name in args.benchmarks or BENCHMARKS:
+        for size, number_operations, setup, function in BENCHMARKS[name]():
+            best, median = measure(setup, function, args.repeat)
+            result = {'benchmark': name, 'size': size, 'operations': number_operations,
+                      'best_us': best / number_operations * 1e6,
+                      'median_us': median / number_operations * 1e6}
+            results.append(result)
+            print('{benchmark:<22} {size:>8} {operations:>6} {best_us:>14.1f} '
+                  '{median_us:>14.1f}'.format(**result))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'repeat': args.repeat, 'results': results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
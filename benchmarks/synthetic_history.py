@@ -0,0 +1,209 @@
+"""Synthetic SWF histories for benchmarks. The events mimic the responses of
+'poll_for_decision_task' with reverseOrder=True."""
+import datetime as dt
+import json
+import random
+
+import floto.specs
+
+START = dt.datetime(2016, 1, 1, tzinfo=dt.timezone.utc)
+WORKFLOW_INPUT = {'foo': 'bar'}
+
+
+def generate_events(number_events, failure_rate=0.0, result_size=200, parallel=1, seed=0):
+    """Events (in ascending order) of a workflow execution which runs batches of <parallel>
+    activities until <number_events> events are recorded.
+
+    Parameters
+    ----------
+    number_events: int
+    failure_rate: float
+        Fraction of the activity executions which fail
+    result_size: int
+        Approximate size in bytes of the activity results
+    parallel: int
+        Number of activities scheduled by each decision. The larger <parallel>, the further
+        the close events of the activities are away from their scheduled events.
+    """
+    rnd = random.Random(seed)
+    events = []
+
+    def add(event_type, **attributes):
+        return _add_event(events, event_type, **attributes)
+
+    def add_decision():
+        return _add_decision(events)
+
+    completed = _start_workflow(events)
+
+    activity = 0
+    while len(events) + 6 * parallel <= number_events:
+        scheduled = []
+        for i in range(parallel):
+            activity_id = 'activity:v1:{}'.format(activity + i)
+            scheduled.append(add('ActivityTaskScheduled',
+                                 activityId=activity_id,
+                                 activityType={'name': 'activity', 'version': 'v1'},
+                                 input=json.dumps({'activity_task': {'n': activity + i}}),
+                                 taskList={'name': 'floto_activities'},
+                                 decisionTaskCompletedEventId=completed))
+        started = [add('ActivityTaskStarted', scheduledEventId=s, identity='worker')
+                   for s in scheduled]
+        for scheduled_id, started_id in zip(scheduled, started):
+            if rnd.random() < failure_rate:
+                add('ActivityTaskFailed', scheduledEventId=scheduled_id,
+                    startedEventId=started_id, reason='error', details='Something went wrong')
+            else:
+                result = json.dumps({'status': 'finished', 'data': 'x' * result_size})
+                add('ActivityTaskCompleted', scheduledEventId=scheduled_id,
+                    startedEventId=started_id, result=result)
+            completed = add_decision()
+        activity += parallel
+
+    # The last decision task is the one which is polled
+    events.pop()
+    return events
+
+
+def generate_dag_events(activity_tasks, failure_rate=0.0, result_size=200, seed=0):
+    """Events (in ascending order) of a workflow execution of the DAG of <activity_tasks>, run
+    the way floto.decider.Decider runs it. The first decision schedules the tasks without
+    requirements. Each further decision schedules the tasks whose required tasks are completed
+    and the activities which failed. The open tasks close in random order, a random number of
+    them before each decision. The workflow completes with the last decision task, which is
+    left open (it is the one which is polled).
+
+    Parameters
+    ----------
+    activity_tasks: list
+        floto.specs.ActivityTasks and floto.specs.Timers
+    failure_rate: float
+        Fraction of the activity executions which fail. Failed activities are retried until
+        they succeed.
+    result_size: int
+        Approximate size in bytes of the activity results
+    """
+    rnd = random.Random(seed)
+    events = []
+    requires = {t.id_: [r.id_ for r in t.requires or []] for t in activity_tasks}
+    results = {}
+    scheduled_ids = set()
+    open_tasks = []
+
+    completed = _start_workflow(events)
+    ready = [t for t in activity_tasks if not requires[t.id_]]
+    while ready or open_tasks:
+        started = []
+        for task in ready:
+            scheduled_ids.add(task.id_)
+            if isinstance(task, floto.specs.Timer):
+                scheduled = _add_event(events, 'TimerStarted', timerId=task.id_,
+                                       startToFireTimeout=str(task.delay_in_seconds),
+                                       decisionTaskCompletedEventId=completed)
+                open_tasks.append((task, scheduled, None))
+            else:
+                input_ = {r: results[r] for r in requires[task.id_] if results[r]}
+                if not requires[task.id_]:
+                    input_['workflow'] = WORKFLOW_INPUT
+                if task.input:
+                    input_['activity_task'] = task.input
+                scheduled = _add_event(events, 'ActivityTaskScheduled', activityId=task.id_,
+                                       activityType={'name': task.name,
+                                                     'version': task.version},
+                                       input=json.dumps(input_),
+                                       taskList={'name': 'floto_activities'},
+                                       decisionTaskCompletedEventId=completed)
+                started.append((task, scheduled))
+        for task, scheduled in started:
+            open_tasks.append((task, scheduled, _add_event(events, 'ActivityTaskStarted',
+                                                           scheduledEventId=scheduled,
+                                                           identity='worker')))
+
+        rnd.shuffle(open_tasks)
+        number_closed = rnd.randint(1, len(open_tasks))
+        closed, open_tasks = open_tasks[:number_closed], open_tasks[number_closed:]
+        ready = []
+        for task, scheduled, started in closed:
+            if started is None:
+                _add_event(events, 'TimerFired', timerId=task.id_, startedEventId=scheduled)
+                results[task.id_] = None
+            elif rnd.random() < failure_rate:
+                _add_event(events, 'ActivityTaskFailed', scheduledEventId=scheduled,
+                           startedEventId=started, reason='error',
+                           details='Something went wrong')
+                ready.append(task)
+            else:
+                result = {'status': 'finished', 'data': 'x' * result_size}
+                _add_event(events, 'ActivityTaskCompleted', scheduledEventId=scheduled,
+                           startedEventId=started, result=json.dumps(result))
+                results[task.id_] = result
+        completed = _add_decision(events)
+        ready.extend(t for t in activity_tasks if t.id_ not in scheduled_ids and
+                     all(r in results for r in requires[t.id_]))
+
+    events.pop()
+    return events
+
+
+def generate_pages(events, page_size=1000):
+    """Splits <events> into the pages of a decision task (reverse order).
+
+    Returns
+    -------
+    list: dict
+        The first page is the response of 'poll_for_decision_task', the following pages the
+        responses of the subsequent calls with 'nextPageToken'.
+    """
+    started = [e['eventId'] for e in events if e['eventType'] == 'DecisionTaskStarted']
+    reverse_events = list(reversed(events))
+    pages = []
+    for i in range(0, len(reverse_events), page_size):
+        page = {'events': reverse_events[i:i + page_size],
+                'startedEventId': started[-1],
+                'previousStartedEventId': started[-2] if len(started) > 1 else 0,
+                'taskToken': 'task_token',
+                'workflowExecution': {'workflowId': 'workflow_id', 'runId': 'run_id'},
+                'workflowType': {'name': 'wf', 'version': 'v1'}}
+        if i + page_size < len(reverse_events):
+            page['nextPageToken'] = 'page_{}'.format(len(pages) + 1)
+        pages.append(page)
+    return pages
+
+
+def generate_response(number_events, **args):
+    """A single 'poll_for_decision_task' response which contains all events."""
+    events = generate_events(number_events, **args)
+    return generate_pages(events, page_size=len(events))[0]
+
+
+def generate_dag_response(activity_tasks, **args):
+    """A single 'poll_for_decision_task' response which contains all events of
+    generate_dag_events."""
+    events = generate_dag_events(activity_tasks, **args)
+    return generate_pages(events, page_size=len(events))[0]
+
+
+def _add_event(events, event_type, **attributes):
+    event_id = len(events) + 1
+    event = {'eventId': event_id,
+             'eventType': event_type,
+             'eventTimestamp': START + dt.timedelta(seconds=event_id)}
+    key = event_type[:1].lower() + event_type[1:] + 'EventAttributes'
+    event[key] = attributes
+    events.append(event)
+    return event_id
+
+
+def _add_decision(events):
+    scheduled = _add_event(events, 'DecisionTaskScheduled', taskList={'name': 'tl'},
+                           startToCloseTimeout='60')
+    started = _add_event(events, 'DecisionTaskStarted', scheduledEventId=scheduled)
+    return _add_event(events, 'DecisionTaskCompleted', scheduledEventId=scheduled,
+                      startedEventId=started)
+
+
+def _start_workflow(events):
+    """Adds the start event and the first decision, returns the id of DecisionTaskCompleted."""
+    _add_event(events, 'WorkflowExecutionStarted', input=json.dumps(WORKFLOW_INPUT),
+               taskList={'name': 'tl'}, workflowType={'name': 'wf', 'version': 'v1'})
+    return _add_decision(events)
@@ -0,0 +1,379 @@
+"""Runs workflows of several topologies through floto.decider.Decider and floto.ActivityWorker
+threads against an in-memory floto.emulator.SwfEmulator and reports the throughput: workflows/s,
+decision tasks/s, the latency of the decision tasks, the SWF API calls per workflow and the peak
+RSS of the process.
+
+Topologies (see TOPOLOGIES):
+    chain       <size> activities, each requiring its predecessor
+    fan_out     one activity, <size> parallel activities requiring it, one activity joining them
+    diamond     <size> layers of <width> activities, each requiring all activities of the layer
+                before
+    timers      <size> pairs of a timer and an activity, in a chain
+    retries     <size> parallel activities failing with <failure_rate>, retried instantly
+
+The decision task latency is the time of Decider.get_decisions and RespondDecisionTaskCompleted,
+the long poll and the history pages are not included.
+
+Results are written as JSON with --output. Given a --baseline (the output of an earlier run, e.g.
+of another floto version), the relative change of each metric is printed.
+
+Run with: python benchmarks/throughput.py [--topology chain] [--size 10] [--workflows 50] ...
+"""
+import argparse
+import collections
+import datetime as dt
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+import floto
+import floto.api
+import floto.decider
+import floto.emulator
+from floto.specs import ActivityTask, DeciderSpec, Timer
+from floto.specs.retry_strategy import InstantRetry
+from decision_replay import percentile
+
+DOMAIN = 'floto_benchmark'
+WORKFLOW_TYPE = {'name': 'throughput', 'version': 'v1'}
+ACTIVITY_TYPE = {'name': 'throughput_activity', 'version': 'v1'}
+DECISION_TASK_LIST = 'throughput_decisions'
+ACTIVITY_TASK_LIST = 'throughput_activities'
+START_TIME_FILTER = {'oldestDate': dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)}
+
+# Emulated seconds of the timers of the 'timers' topology
+TIMER_DELAY = 5
+
+# Metrics compared with the baseline and whether larger values are better
+METRICS = collections.OrderedDict([('workflows_per_second', True),
+                                   ('decisions_per_second', True),
+                                   ('decision_latency_p50_ms', False),
+                                   ('decision_latency_p99_ms', False),
+                                   ('api_calls_per_workflow', False),
+                                   ('peak_rss_mib', False)])
+
+
+@floto.activity(name=ACTIVITY_TYPE['name'], version=ACTIVITY_TYPE['version'])
+def throughput_activity(context):
+    task = context.get('activity_task', {})
+    if task.get('seconds'):
+        time.sleep(task['seconds'])
+    if random.random() < task.get('failure_rate', 0):
+        raise RuntimeError('Failed on purpose')
+    return {'status': 'finished'}
+
+
+def activity_task(activity_id, requires=None, seconds=0, failure_rate=0, retries=None):
+    return ActivityTask(name=ACTIVITY_TYPE['name'], version=ACTIVITY_TYPE['version'],
+                        activity_id=activity_id, requires=requires,
+                        input={'seconds': seconds, 'failure_rate': failure_rate},
+                        retry_strategy=InstantRetry(retries) if retries else None)
+
+
+def chain(size, width, seconds, failure_rate):
+    tasks = []
+    for i in range(size):
+        tasks.append(activity_task('a{}'.format(i), tasks[-1:] or None, seconds))
+    return tasks
+
+
+def fan_out(size, width, seconds, failure_rate):
+    root = activity_task('root', seconds=seconds)
+    parallel = [activity_task('a{}'.format(i), [root], seconds) for i in range(size)]
+    return [root] + parallel + [activity_task('join', parallel, seconds)]
+
+
+def diamond(size, width, seconds, failure_rate):
+    tasks = []
+    layer = []
+    for i in range(size):
+        layer = [activity_task('a{}_{}'.format(i, j), layer or None, seconds)
+                 for j in range(width)]
+        tasks.extend(layer)
+    return tasks
+
+
+def timers(size, width, seconds, failure_rate):
+    tasks = []
+    for i in range(size):
+        timer = Timer(id_='t{}'.format(i), requires=tasks[-1:] or None,
+                      delay_in_seconds=TIMER_DELAY)
+        tasks.extend([timer, activity_task('a{}'.format(i), [timer], seconds)])
+    return tasks
+
+
+def retries(size, width, seconds, failure_rate):
+    return [activity_task('a{}'.format(i), seconds=seconds, failure_rate=failure_rate,
+                          retries=20) for i in range(size)]
+
+
+TOPOLOGIES = collections.OrderedDict([('chain', chain),
+                                      ('fan_out', fan_out),
+                                      ('diamond', diamond),
+                                      ('timers', timers),
+                                      ('retries', retries)])
+
+
+class CountingClient(object):
+    """Counts the calls of the SWF API per operation and passes them to <client>."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = collections.Counter()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            with self._lock:
+                self.calls[name] += 1
+            return attribute(*args, **kwargs)
+
+        return call
+
+
+class ThroughputBenchmark(object):
+    """Runs <number_workflows> workflows of a decider spec with <number_deciders> decider threads
+    and <number_workers> activity worker threads, all sharing one emulator."""
+
+    def __init__(self, activity_tasks, number_workflows=50, number_deciders=4, number_workers=8,
+                 poll_timeout=0.05):
+        self.activity_tasks = activity_tasks
+        self.number_workflows = number_workflows
+        self.number_deciders = number_deciders
+        self.number_workers = number_workers
+
+        clock = floto.emulator.Clock(manual=True)
+        self.emulator = floto.emulator.SwfEmulator(clock=clock, poll_timeout=poll_timeout)
+        self.client = CountingClient(self.emulator)
+        self.client_factory = floto.emulator.EmulatorClientFactory(emulator=self.client)
+        self.swf = floto.api.Swf(client_factory=self.client_factory)
+        self.decider_spec = DeciderSpec(domain=DOMAIN, task_list=DECISION_TASK_LIST,
+                                        activity_tasks=activity_tasks,
+                                        activity_task_list=ACTIVITY_TASK_LIST)
+
+        self.latencies = []
+        self.number_errors = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._register_types()
+
+    @property
+    def has_timers(self):
+        return any(isinstance(t, Timer) for t in self.activity_tasks)
+
+    def run(self):
+        """Starts all workflows and waits until they are closed.
+
+        Returns
+        -------
+        dict: The metrics of the run
+        """
+        threads = [threading.Thread(target=self._run_decider) for _ in range(self.number_deciders)]
+        threads += [threading.Thread(target=self._run_worker) for _ in range(self.number_workers)]
+        if self.has_timers:
+            threads.append(threading.Thread(target=self._run_clock))
+
+        # Swf objects created by floto itself (heartbeats, history prefetchers) use the emulator too
+        default_client_factory = floto.api.ClientFactory.default()
+        floto.api.ClientFactory.set_default(self.client_factory)
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for i in range(self.number_workflows):
+            self.swf.start_workflow_execution(domain=DOMAIN,
+                                              workflow_type_name=WORKFLOW_TYPE['name'],
+                                              workflow_type_version=WORKFLOW_TYPE['version'],
+                                              workflow_id='workflow_{}'.format(i))
+        while self._number_closed() < self.number_workflows:
+            time.sleep(0.01)
+        duration = time.perf_counter() - start
+
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+        floto.api.ClientFactory.set_default(default_client_factory)
+        return self._metrics(duration)
+
+    def _register_types(self):
+        self.emulator.register_domain(name=DOMAIN, workflowExecutionRetentionPeriodInDays='1')
+        self.emulator.register_workflow_type(domain=DOMAIN,
+                                             defaultTaskList={'name': DECISION_TASK_LIST},
+                                             defaultTaskStartToCloseTimeout='86400',
+                                             defaultExecutionStartToCloseTimeout='31536000',
+                                             defaultChildPolicy='TERMINATE', **WORKFLOW_TYPE)
+        self.emulator.register_activity_type(domain=DOMAIN,
+                                             defaultTaskList={'name': ACTIVITY_TASK_LIST},
+                                             defaultTaskHeartbeatTimeout='NONE',
+                                             defaultTaskStartToCloseTimeout='86400',
+                                             defaultTaskScheduleToStartTimeout='86400',
+                                             defaultTaskScheduleToCloseTimeout='86400',
+                                             **ACTIVITY_TYPE)
+
+    def _run_decider(self):
+        prototype = floto.decider.Decider(decider_spec=self.decider_spec, swf=self.swf)
+        while not self._stop.is_set():
+            decider = prototype.copy_for_decision_task()
+            decider.poll_for_decision()
+            if not decider.task_token:
+                continue
+            start = time.perf_counter()
+            try:
+                decider.get_decisions()
+                decider.complete()
+            except Exception:
+                with self._lock:
+                    self.number_errors += 1
+                continue
+            with self._lock:
+                self.latencies.append(time.perf_counter() - start)
+
+    def _run_worker(self):
+        worker = floto.ActivityWorker(swf=self.swf, domain=DOMAIN, task_list=ACTIVITY_TASK_LIST,
+                                      task_heartbeat_in_seconds=0)
+        worker.get_terminate_activity_worker = self._stop.is_set
+        worker.run()
+
+    def _run_clock(self):
+        # Timers fire when the manual clock of the emulator passes them
+        while not self._stop.wait(0.001):
+            self.emulator.advance_clock(1)
+
+    def _number_closed(self):
+        return self.emulator.count_closed_workflow_executions(
+            domain=DOMAIN, startTimeFilter=START_TIME_FILTER)['count']
+
+    def _metrics(self, duration):
+        close_status = collections.Counter()
+        for status in ['COMPLETED', 'FAILED', 'TIMED_OUT', 'TERMINATED']:
+            close_status[status] = self.emulator.count_closed_workflow_executions(
+                domain=DOMAIN, startTimeFilter=START_TIME_FILTER,
+                closeStatusFilter={'status': status})['count']
+        calls = self.client.calls
+        return {'workflows': self.number_workflows,
+                'decision_tasks': len(self.latencies),
+                'decision_errors': self.number_errors,
+                'close_status': dict(close_status),
+                'duration_seconds': duration,
+                'workflows_per_second': self.number_workflows / duration,
+                'decisions_per_second': len(self.latencies) / duration,
+                'decision_latency_p50_ms': percentile(self.latencies, 50) * 1000,
+                'decision_latency_p99_ms': percentile(self.latencies, 99) * 1000,
+                'decision_latency_max_ms': max(self.latencies or [0]) * 1000,
+                'api_calls_per_workflow': sum(calls.values()) / self.number_workflows,
+                'api_calls': dict(calls),
+                'peak_rss_mib': peak_rss_mib()}
+
+
+def peak_rss_mib():
+    # ru_maxrss is given in KiB on Linux, in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0)
+
+
+def environment():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'floto_commit': commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': dt.datetime.now(dt.timezone.utc).isoformat()}
+
+
+def compare(results, baseline):
+    """Relative change of the METRICS of <results> against <baseline>, by topology.
+    Positive changes are improvements."""
+    baseline_by_topology = {r['config']['topology']: r['metrics'] for r in baseline['results']}
+    changes = collections.OrderedDict()
+    for result in results['results']:
+        topology = result['config']['topology']
+        if topology not in baseline_by_topology:
+            continue
+        changes[topology] = collections.OrderedDict()
+        for metric, larger_is_better in METRICS.items():
+            before = baseline_by_topology[topology][metric]
+            after = result['metrics'][metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            changes[topology][metric] = change if larger_is_better else -change
+    return changes
+
+
+def report(result):
+    config, metrics = result['config'], result['metrics']
+    print('{topology} (size {size}, width {width}): {workflows} workflows, '
+          '{deciders} deciders, {workers} workers'.format(**config))
+    print('  {:.1f} workflows/s, {:.1f} decision tasks/s, {} decision errors, closed: {}'.format(
+        metrics['workflows_per_second'], metrics['decisions_per_second'],
+        metrics['decision_errors'], metrics['close_status']))
+    print('  decision latency p50: {:.3f} ms  p99: {:.3f} ms  max: {:.3f} ms'.format(
+        metrics['decision_latency_p50_ms'], metrics['decision_latency_p99_ms'],
+        metrics['decision_latency_max_ms']))
+    print('  SWF API calls per workflow: {:.1f}, peak RSS: {:.1f} MiB'.format(
+        metrics['api_calls_per_workflow'], metrics['peak_rss_mib']))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='floto throughput benchmark')
+    parser.add_argument('--topology', choices=list(TOPOLOGIES) + ['all'], default='all')
+    parser.add_argument('--size', type=int, default=10)
+    parser.add_argument('--width', type=int, default=4, help='Width of the diamond layers')
+    parser.add_argument('--workflows', type=int, default=50)
+    parser.add_argument('--deciders', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--activity-seconds', type=float, default=0.0,
+                        help='Duration of each activity')
+    parser.add_argument('--failure-rate', type=float, default=0.3,
+                        help='Failure rate of the activities of the retries topology')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Path of the JSON results')
+    parser.add_argument('--baseline', help='Path of the JSON results to compare with')
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    topologies = list(TOPOLOGIES) if args.topology == 'all' else [args.topology]
+
+    results = {'environment': environment(), 'results': []}
+    for topology in topologies:
+        activity_tasks = TOPOLOGIES[topology](args.size, args.width, args.activity_seconds,
+                                              args.failure_rate)
+        benchmark = ThroughputBenchmark(activity_tasks, number_workflows=args.workflows,
+                                        number_deciders=args.deciders,
+                                        number_workers=args.workers)
+        config = {'topology': topology, 'size': args.size, 'width': args.width,
+                  'workflows': args.workflows, 'deciders': args.deciders,
+                  'workers': args.workers, 'activity_seconds': args.activity_seconds,
+                  'failure_rate': args.failure_rate, 'seed': args.seed}
+        result = {'config': config, 'metrics': benchmark.run()}
+        results['results'].append(result)
+        report(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            changes = compare(results, json.load(f))
+        for topology, metric_changes in changes.items():
+            print('{} vs. baseline: '.format(topology) + ', '.join(
+                '{} {:+.1%}'.format(metric, change) for metric, change in metric_changes.items()))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
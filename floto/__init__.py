@@ -1,4 +1,11 @@
 from .activity_worker import ActivityWorker
 from .history import History
-from .decorators import ACTIVITY_FUNCTIONS, activity
+from .columnar_history import ColumnarHistory
+from .history_cache import HistoryCache
+from .history_snapshot_store import HistorySnapshotStore
+from .decode_cache import DecodeCache
+from .task_state import TaskState
+from .decorators import ACTIVITY_FUNCTIONS, ACTIVITY_EXECUTORS, activity
 from .heartbeat_sender import HeartbeatSender
+from .concurrent_activity_worker import ConcurrentActivityWorker
+from .asyncio_activity_worker import AsyncioActivityWorker
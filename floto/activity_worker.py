@@ -1,9 +1,9 @@
 import json
 import logging
 import sys
-from inspect import signature
 
 import floto.api
+import floto.decorators
 import floto.specs
 
 logger = logging.getLogger(__name__)
@@ -70,11 +70,7 @@ class ActivityWorker:
                 try:
                     if function_id in floto.ACTIVITY_FUNCTIONS:
                         self.start_heartbeat()
-                        activity_function = floto.ACTIVITY_FUNCTIONS[function_id]
-                        if 'context' in signature(activity_function).parameters:
-                            self.result = activity_function(context=context)
-                        else:
-                            self.result = activity_function()
+                        self.result = floto.decorators.run_activity(function_id, context)
                         self.stop_heartbeat()
                         try:
                             self.complete()
@@ -105,13 +101,20 @@ class ActivityWorker:
         self._terminate_activity_worker = True
 
     def complete(self):
-        args = {'taskToken': self.task_token}
-        if self.result and isinstance(self.result, str):
-            args['result'] = self.result
-        if self.result and isinstance(self.result, dict):
-            args['result'] = json.dumps(self.result)
+        args = self.completed_args(self.task_token, self.result)
         self.swf.client.respond_activity_task_completed(**args)
 
+    @staticmethod
+    def completed_args(task_token, result):
+        """Arguments of RespondActivityTaskCompleted: str results are sent as they are, dict
+        results as JSON."""
+        args = {'taskToken': task_token}
+        if result and isinstance(result, str):
+            args['result'] = result
+        if result and isinstance(result, dict):
+            args['result'] = json.dumps(result)
+        return args
+
     def start_heartbeat(self):
         args = {'timeout': self.task_heartbeat_in_seconds,
                 'task_token': self.task_token}
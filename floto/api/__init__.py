@@ -1,3 +1,4 @@
+from .client_factory import ClientFactory
 from .swf import Swf
 from .domains import Domains
 
@@ -0,0 +1,106 @@
+import os
+import threading
+
+import boto3
+from botocore.client import Config
+
+
+class ClientFactory:
+    """Process-wide boto3 SWF clients, shared by all floto.api.Swf objects. Creating a session
+    and a client takes tens to hundreds of milliseconds and each client has its own connection
+    pool, hence clients are created once per region, profile and kind:
+
+    - short calls (respond, describe, history pages, heartbeats, ...)
+    - long polls (PollForDecisionTask, PollForActivityTask), which hold a connection for up to 60
+      seconds and must not exhaust the connections of the short calls
+
+    boto3 clients are thread-safe, but must not be shared with forked processes: after a fork,
+    the clients are created again.
+
+    Usage:
+    -----
+    floto.api.ClientFactory.set_default(floto.api.ClientFactory(max_pool_connections=50,
+                                                                long_poll_max_pool_connections=20))
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_pool_connections=10, long_poll_max_pool_connections=10,
+                 connect_timeout=50, read_timeout=70, long_poll_read_timeout=70):
+        """
+        Parameters
+        ----------
+        max_pool_connections: int
+            Connections of the client for short calls
+        long_poll_max_pool_connections: int
+            Connections of the client for long polls, i.e. the maximal number of concurrent polls
+        connect_timeout: int
+        read_timeout: int
+            Read timeout of short calls
+        long_poll_read_timeout: int
+            Read timeout of long polls, must exceed the 60 seconds of SWF long polls
+        """
+        self.max_pool_connections = max_pool_connections
+        self.long_poll_max_pool_connections = long_poll_max_pool_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.long_poll_read_timeout = long_poll_read_timeout
+
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    @classmethod
+    def default(cls):
+        """The process-wide ClientFactory."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @classmethod
+    def set_default(cls, client_factory):
+        with cls._default_lock:
+            cls._default = client_factory
+
+    def client(self, region_name=None, profile_name=None, long_poll=False):
+        """The shared SWF client of <region_name> and <profile_name>."""
+        self._reset_after_fork()
+        key = (region_name, profile_name, long_poll)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._create_client(region_name, profile_name, long_poll)
+                    self._clients[key] = client
+        return client
+
+    def clear(self):
+        with self._lock:
+            self._clients = {}
+
+    def __len__(self):
+        return len(self._clients)
+
+    def _create_client(self, region_name, profile_name, long_poll):
+        session_parameter = {k: v for k, v in [('region_name', region_name),
+                                               ('profile_name', profile_name)] if v}
+        if long_poll:
+            config = Config(connect_timeout=self.connect_timeout,
+                            read_timeout=self.long_poll_read_timeout,
+                            max_pool_connections=self.long_poll_max_pool_connections)
+        else:
+            config = Config(connect_timeout=self.connect_timeout,
+                            read_timeout=self.read_timeout,
+                            max_pool_connections=self.max_pool_connections)
+        session = boto3.session.Session(**session_parameter)
+        return session.client('swf', config=config)
+
+    def _reset_after_fork(self):
+        if self._pid != os.getpid():
+            # A lock held by another thread at the time of the fork is never released in the child
+            self._lock = threading.Lock()
+            self._clients = {}
+            self._pid = os.getpid()
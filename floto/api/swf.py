@@ -1,9 +1,8 @@
 import json
 import logging
+import os
 
-import boto3
 import botocore.exceptions
-from botocore.client import Config
 
 import floto.api
 import floto.specs
@@ -12,7 +11,16 @@ logger = logging.getLogger(__name__)
 
 
 class Swf(object):
-    def __init__(self, region_name=None, profile_name=None):
+    def __init__(self, region_name=None, profile_name=None, client_factory=None):
+        """
+        Parameters
+        ----------
+        region_name: str
+        profile_name: str
+        client_factory: floto.api.ClientFactory
+            The factory of the boto3 clients. Defaults to floto.api.ClientFactory.default()
+        """
+        self.client_factory = client_factory
         self.init_client(region_name, profile_name)
         self.domains = floto.api.Domains(self)
         self.default_maximum_page_size = 400
@@ -29,16 +37,35 @@ class Swf(object):
             params['profile_name'] = profile_name
 
         session_parameter = {k: v for k, v in params.items() if v}
+        self._session_parameter = session_parameter
         self._client = self.open_session(session_parameter)
+        self._long_poll_client = None
+        self._pid = os.getpid()
 
     @property
     def client(self):
+        if self._pid != os.getpid():
+            # boto3 clients must not be shared with forked processes
+            self.init_client(**self._session_parameter)
         return self._client
 
+    @property
+    def long_poll_client(self):
+        """The client for PollForDecisionTask and PollForActivityTask. If <client> has been
+        replaced (e.g. by a stub), it serves the long polls as well."""
+        client = self.client
+        if client is not self._client:
+            return client
+        if self._long_poll_client is None:
+            self._long_poll_client = self._get_client_factory().client(long_poll=True,
+                                                                       **self._session_parameter)
+        return self._long_poll_client
+
     def open_session(self, session_parameter):
-        config = Config(connect_timeout=50, read_timeout=70)
-        session = boto3.session.Session(**session_parameter)
-        return session.client('swf', config=config)
+        return self._get_client_factory().client(**session_parameter)
+
+    def _get_client_factory(self):
+        return self.client_factory or floto.api.ClientFactory.default()
 
     def poll_for_decision_task_page(self, domain=None, task_list=None, page_token=None,
                                     page_size=None):
@@ -54,12 +81,14 @@ class Swf(object):
 
         args['maximumPageSize'] = page_size if page_size else self.default_maximum_page_size
 
-        return self.client.poll_for_decision_task(**args)
+        # Further pages of the history are returned immediately
+        client = self.client if page_token else self.long_poll_client
+        return client.poll_for_decision_task(**args)
 
     def poll_for_activity_task(self, domain, task_list):
         args = {'domain': domain,
                 'taskList': {'name': task_list}}
-        return self.client.poll_for_activity_task(**args)
+        return self.long_poll_client.poll_for_activity_task(**args)
 
     def register_activity_type(self, swf_type):
         self.register_type(swf_type)
@@ -150,11 +179,16 @@ class Swf(object):
                               'runId': run_id}}
         return self.client.describe_workflow_execution(**args)
 
-    def get_workflow_execution_history(self, domain, run_id, workflow_id):
+    def get_workflow_execution_history(self, domain, run_id, workflow_id, reverse_order=True,
+                                       page_size=None, page_token=None):
         args = {'domain': domain,
                 'execution': {'runId': run_id,
                               'workflowId': workflow_id},
-                'reverseOrder': True}
+                'reverseOrder': reverse_order}
+        if page_size:
+            args['maximumPageSize'] = page_size
+        if page_token:
+            args['nextPageToken'] = page_token
         return self.client.get_workflow_execution_history(**args)
 
     def record_activity_task_heartbeat(self, task_token, details):
@@ -0,0 +1,227 @@
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import logging
+import sys
+import threading
+
+import floto
+import floto.api
+import floto.decorators
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncioActivityWorker:
+    """Activity worker which runs activity coroutines (async def activities) concurrently on one
+    event loop, e.g. thousands of network-bound activities. Synchronous activities are run in the
+    default executor of the loop.
+
+    The SWF client is synchronous: polls run in a thread pool of <number_pollers> threads, the
+    respond and heartbeat calls in a thread pool of <number_io_threads> threads. At most
+    <max_in_flight> activity tasks are polled and not yet responded; pollers wait while this limit
+    is reached. <activity_limits> limits the number of concurrently running tasks per activity,
+    further tasks of the activity wait (and count as in flight).
+
+    Heartbeats are sent every <task_heartbeat_in_seconds> by timers of the event loop.
+
+    Usage:
+    -----
+    @floto.activity(name='fetch', version='v1')
+    async def fetch(context):
+        async with session.get(context['activity_task']['url']) as response:
+            return {'status': response.status}
+
+    worker = floto.AsyncioActivityWorker(domain='d', task_list='tl', max_in_flight=2000,
+                                         activity_limits={'fetch:v1': 500})
+    worker.run()
+    """
+
+    def __init__(self, swf=None, task_list=None, domain=None, task_heartbeat_in_seconds=None,
+                 number_pollers=2, number_io_threads=16, max_in_flight=1000,
+                 activity_limits=None):
+        """
+        Parameters
+        ----------
+        swf: floto.api.Swf
+            If None a new instance is initiated
+        task_list: str [Required]
+        domain: str [Required]
+        task_heartbeat_in_seconds: int
+            Heartbeats are sent every <task_heartbeat_in_seconds> to SWF for each activity task
+            in flight. If set to 0 no heartbeats will be sent. Default is 120.
+        number_pollers: int
+        number_io_threads: int
+            Threads for the respond and heartbeat calls
+        max_in_flight: int
+            Maximal number of polled activity tasks which have not been responded yet
+        activity_limits: dict
+            <name>:<version> of an activity -> maximal number of its running tasks
+        """
+        self.swf = swf or floto.api.Swf()
+        self.task_list = task_list
+        self.domain = domain
+        self.task_heartbeat_in_seconds = task_heartbeat_in_seconds
+        if self.task_heartbeat_in_seconds is None:
+            self.task_heartbeat_in_seconds = 120
+        self.number_pollers = number_pollers
+        self.number_io_threads = number_io_threads
+        self.max_in_flight = max_in_flight
+        self.activity_limits = activity_limits or {}
+        # Total number of polls of all pollers
+        self.max_polls = sys.maxsize
+
+        self.number_polls = 0
+        self.number_completed = 0
+        self.number_failed = 0
+
+        # Task token -> activity id of the polled activity tasks which have not been responded
+        self._in_flight = {}
+        # Task token -> asyncio.TimerHandle of the next heartbeat
+        self._heartbeats = {}
+        self._stop = threading.Event()
+        self._loop = None
+        self._slots = None
+        self._limits = {}
+        self._tasks = set()
+        self._poll_executor = None
+        self._io_executor = None
+
+    @property
+    def number_in_flight(self):
+        return len(self._in_flight)
+
+    def run(self):
+        """Runs activity tasks on a new event loop until stop() is called or <max_polls> polls
+        have been made."""
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self.run_async())
+        finally:
+            loop.close()
+
+    def stop(self):
+        """Stops polling, also from other threads. Polled activity tasks are finished."""
+        self._stop.set()
+
+    async def run_async(self):
+        """Runs activity tasks on the current event loop, see run()."""
+        self._stop.clear()
+        self._loop = asyncio.get_event_loop()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._limits = {function_id: asyncio.Semaphore(limit)
+                        for function_id, limit in self.activity_limits.items()}
+        self._poll_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.number_pollers)
+        self._io_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.number_io_threads)
+        try:
+            await asyncio.gather(*[self._poll() for _ in range(self.number_pollers)])
+            while self._tasks:
+                await asyncio.wait(list(self._tasks))
+        finally:
+            self._poll_executor.shutdown(wait=False)
+            self._io_executor.shutdown()
+
+    async def _poll(self):
+        while not self._stop.is_set():
+            await self._slots.acquire()
+            if self._stop.is_set() or self.number_polls >= self.max_polls:
+                self._slots.release()
+                return
+            self.number_polls += 1
+
+            try:
+                response = await self._loop.run_in_executor(
+                    self._poll_executor, functools.partial(self.swf.poll_for_activity_task,
+                                                           domain=self.domain,
+                                                           task_list=self.task_list))
+            except Exception as e:
+                logger.warning('Polling for activity tasks failed: {}'.format(e))
+                self._slots.release()
+                continue
+
+            if 'taskToken' in response:
+                task = self._loop.create_task(self._handle_activity_task(response))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                self._slots.release()
+
+    async def _handle_activity_task(self, response):
+        task_token = response['taskToken']
+        self._in_flight[task_token] = response.get('activityId')
+        self._schedule_heartbeat(task_token)
+        result, error = None, None
+        try:
+            result = await self._run_activity(response)
+        except Exception as e:
+            error = e
+        finally:
+            heartbeat = self._heartbeats.pop(task_token, None)
+            if heartbeat:
+                heartbeat.cancel()
+
+        try:
+            await self._respond(task_token, result, error)
+        finally:
+            del self._in_flight[task_token]
+            self._slots.release()
+
+    async def _run_activity(self, response):
+        activity_type = response['activityType']
+        function_id = activity_type['name'] + ':' + activity_type['version']
+        if function_id not in floto.ACTIVITY_FUNCTIONS:
+            raise ValueError('No activity with id {} registered'.format(function_id))
+        context = floto.ConcurrentActivityWorker.get_context(response)
+        limit = self._limits.get(function_id)
+        if not limit:
+            return await self._call_activity(function_id, context)
+        await limit.acquire()
+        try:
+            return await self._call_activity(function_id, context)
+        finally:
+            limit.release()
+
+    async def _call_activity(self, function_id, context):
+        activity_function = floto.ACTIVITY_FUNCTIONS[function_id]
+        if asyncio.iscoroutinefunction(activity_function):
+            if 'context' in inspect.signature(activity_function).parameters:
+                return await activity_function(context=context)
+            return await activity_function()
+        return await self._loop.run_in_executor(None, floto.decorators.run_activity, function_id,
+                                                context)
+
+    async def _respond(self, task_token, result, error):
+        if error is None:
+            call = functools.partial(self.swf.client.respond_activity_task_completed,
+                                     **floto.ActivityWorker.completed_args(task_token, result))
+            self.number_completed += 1
+        else:
+            call = functools.partial(self.swf.client.respond_activity_task_failed,
+                                     taskToken=task_token, details=str(error))
+            self.number_failed += 1
+        try:
+            await self._loop.run_in_executor(self._io_executor, call)
+        except Exception as e:
+            logger.warning(e)
+
+    def _schedule_heartbeat(self, task_token):
+        if self.task_heartbeat_in_seconds:
+            self._heartbeats[task_token] = self._loop.call_later(
+                self.task_heartbeat_in_seconds, self._send_heartbeat, task_token)
+
+    def _send_heartbeat(self, task_token):
+        if task_token not in self._heartbeats:
+            return
+        future = self._loop.run_in_executor(
+            self._io_executor, functools.partial(self.swf.record_activity_task_heartbeat,
+                                                 task_token=task_token, details=None))
+        future.add_done_callback(self._log_heartbeat_error)
+        self._schedule_heartbeat(task_token)
+
+    @staticmethod
+    def _log_heartbeat_error(future):
+        if not future.cancelled() and future.exception():
+            logger.warning('Heartbeat failed: {}'.format(future.exception()))
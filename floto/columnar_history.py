@@ -0,0 +1,327 @@
+import array
+import collections.abc
+import datetime as dt
+import pickle
+
+from floto.history import History
+
+EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+NO_TIMESTAMP = -2 ** 63
+NO_TASK = -1
+
+# Keys which are stored in columns, everything else is part of the pickled payload
+COLUMN_KEYS = ('eventId', 'eventType', 'eventTimestamp')
+
+
+class ColumnarHistory(History):
+    """History with a compact event store. Instead of keeping the event dicts returned by boto3
+    and dict-of-list indexes of them, the events are stored in columns:
+
+    - event ids, interned event type codes and timestamps (int64 epoch micros) in arrays
+    - the activity or timer id of the events as interned codes in an array
+    - the remaining attributes of each event pickled into a single bytearray
+
+    Events are only materialized when they are queried, their attributes are unpickled on first
+    access. events_by_id, events_by_type and events_by_activity_id are read-only views which
+    behave like the dicts of floto.History, hence all query methods of floto.History work
+    unchanged.
+    """
+
+    decoded_events_cache_size = 1024
+
+    def _init_event_store(self):
+        self._event_ids = array.array('q')
+        self._type_codes = array.array('H')
+        self._timestamps = array.array('q')
+        self._task_codes = array.array('l')
+        self._payload_offsets = array.array('q', [0])
+        self._payload = bytearray()
+        self._row_by_event_id = array.array('l')
+
+        self._types = []
+        self._type_codes_by_name = {}
+        self._task_ids = []
+        self._task_codes_by_id = {}
+
+        # Event ids in descending order by type code and by task code and type code
+        self._ids_by_type = {}
+        self._ids_by_task = {}
+        # Events whose ActivityTaskScheduled event has not been read yet
+        self._pending_by_scheduled_id = {}
+        self.task_states = {}
+
+        self._decoded_events = collections.OrderedDict()
+
+        self.events_by_id = EventsById(self)
+        self.events_by_type = EventsByType(self)
+        self.events_by_activity_id = EventsByActivityId(self)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_decoded_events'] = collections.OrderedDict()
+        return state
+
+    def _read_event_page(self, events):
+        for event in events:
+            if event['eventId'] not in self.events_by_id:
+                self._store_event(event)
+
+    def _read_newer_events(self, events):
+        for event in reversed(events):
+            self._store_event(event)
+
+    def _store_event(self, event):
+        event_id = event['eventId']
+        row = len(self._event_ids)
+        type_code = self._intern_type(event['eventType'])
+
+        self._event_ids.append(event_id)
+        self._type_codes.append(type_code)
+        self._timestamps.append(self._encode_timestamp(event.get('eventTimestamp')))
+        self._task_codes.append(NO_TASK)
+
+        payload = {k: v for k, v in event.items() if k not in COLUMN_KEYS}
+        self._payload.extend(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        self._payload_offsets.append(len(self._payload))
+
+        if event_id >= len(self._row_by_event_id):
+            missing = event_id + 1 - len(self._row_by_event_id)
+            self._row_by_event_id.extend([-1] * missing)
+        self._row_by_event_id[event_id] = row
+
+        self._insert_id(self._ids_by_type.setdefault(type_code, array.array('q')), event_id)
+        self._index_task(event, row)
+
+    def _index_task(self, event, row):
+        event_type = event['eventType']
+        if event_type not in self.ACTIVITY_ID_EVENT_TYPES:
+            return
+
+        attributes = self.get_event_attributes(event)
+        if event_type in ('TimerStarted', 'TimerFired', 'TimerCanceled'):
+            self._set_task(row, attributes['timerId'])
+        elif event_type == 'ActivityTaskScheduled':
+            self._set_task(row, attributes['activityId'])
+            for pending_row in self._pending_by_scheduled_id.pop(event['eventId'], []):
+                self._set_task(pending_row, attributes['activityId'])
+        else:
+            scheduled_row = self.row_of(attributes['scheduledEventId'])
+            if scheduled_row < 0:
+                self._pending_by_scheduled_id.setdefault(attributes['scheduledEventId'],
+                                                         []).append(row)
+            else:
+                self._set_task(row, self._task_ids[self._task_codes[scheduled_row]])
+
+    def _set_task(self, row, task_id):
+        if task_id not in self._task_codes_by_id:
+            self._task_codes_by_id[task_id] = len(self._task_ids)
+            self._task_ids.append(task_id)
+        task_code = self._task_codes_by_id[task_id]
+        self._task_codes[row] = task_code
+        ids_by_type = self._ids_by_task.setdefault(task_code, {})
+        ids = ids_by_type.setdefault(self._type_codes[row], array.array('q'))
+        self._insert_id(ids, self._event_ids[row])
+        self._update_task_state(task_id, self._types[self._type_codes[row]], self._event_ids[row])
+
+    def _intern_type(self, event_type):
+        if event_type not in self._type_codes_by_name:
+            self._type_codes_by_name[event_type] = len(self._types)
+            self._types.append(event_type)
+        return self._type_codes_by_name[event_type]
+
+    def row_of(self, event_id):
+        """The row of the event in the columns, -1 if the event has not been read."""
+        if 0 <= event_id < len(self._row_by_event_id):
+            return self._row_by_event_id[event_id]
+        return -1
+
+    def decode_event(self, event_id):
+        """The event with <event_id> as dict. The attributes are unpickled on first access."""
+        if event_id in self._decoded_events:
+            self._decoded_events.move_to_end(event_id)
+            return self._decoded_events[event_id]
+
+        row = self.row_of(event_id)
+        if row < 0:
+            raise KeyError(event_id)
+        event = ColumnarEvent(self._payload[self._payload_offsets[row]:
+                                            self._payload_offsets[row + 1]])
+        dict.__setitem__(event, 'eventId', event_id)
+        dict.__setitem__(event, 'eventType', self._types[self._type_codes[row]])
+        timestamp = self._timestamps[row]
+        if timestamp != NO_TIMESTAMP:
+            dict.__setitem__(event, 'eventTimestamp', self._decode_timestamp(timestamp))
+
+        self._decoded_events[event_id] = event
+        if len(self._decoded_events) > self.decoded_events_cache_size:
+            self._decoded_events.popitem(last=False)
+        return event
+
+    @staticmethod
+    def _insert_id(ids, event_id):
+        """Inserts <event_id> into <ids>, which is sorted in descending order."""
+        if not ids or ids[-1] > event_id:
+            ids.append(event_id)
+        elif ids[0] < event_id:
+            ids.insert(0, event_id)
+        else:
+            lo, hi = 0, len(ids)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if ids[mid] > event_id:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            ids.insert(lo, event_id)
+
+    @staticmethod
+    def _encode_timestamp(timestamp):
+        if timestamp is None:
+            return NO_TIMESTAMP
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=dt.timezone.utc)
+        return (timestamp - EPOCH) // dt.timedelta(microseconds=1)
+
+    @staticmethod
+    def _decode_timestamp(micros):
+        return EPOCH + dt.timedelta(microseconds=micros)
+
+
+class ColumnarEvent(dict):
+    """An event of a ColumnarHistory. The event attributes are unpickled on first access."""
+
+    def __init__(self, payload):
+        super().__init__()
+        self._payload = bytes(payload)
+
+    def _decode(self):
+        if self._payload is not None:
+            payload, self._payload = self._payload, None
+            self.update(pickle.loads(payload))
+
+    def __missing__(self, key):
+        if self._payload is None:
+            raise KeyError(key)
+        self._decode()
+        return self[key]
+
+    def __contains__(self, key):
+        if not dict.__contains__(self, key):
+            self._decode()
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._decode()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._decode()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self._decode()
+        if isinstance(other, ColumnarEvent):
+            other._decode()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        self._decode()
+        return dict.__repr__(self)
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        self._decode()
+        return dict.keys(self)
+
+    def values(self):
+        self._decode()
+        return dict.values(self)
+
+    def items(self):
+        self._decode()
+        return dict.items(self)
+
+    def copy(self):
+        self._decode()
+        return dict(self)
+
+
+class EventSequence(collections.abc.Sequence):
+    """Read-only sequence of the events with <event_ids>, decoded on access."""
+
+    def __init__(self, history, event_ids):
+        self._history = history
+        self._event_ids = event_ids
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._history.decode_event(i) for i in self._event_ids[index]]
+        return self._history.decode_event(self._event_ids[index])
+
+    def __len__(self):
+        return len(self._event_ids)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+
+class EventsById(collections.abc.Mapping):
+    def __init__(self, history):
+        self._history = history
+
+    def __getitem__(self, event_id):
+        return self._history.decode_event(event_id)
+
+    def __contains__(self, event_id):
+        return isinstance(event_id, int) and self._history.row_of(event_id) >= 0
+
+    def __iter__(self):
+        return iter(self._history._event_ids)
+
+    def __len__(self):
+        return len(self._history._event_ids)
+
+
+class EventsByType(collections.abc.Mapping):
+    def __init__(self, history):
+        self._history = history
+
+    def __getitem__(self, event_type):
+        type_code = self._history._type_codes_by_name.get(event_type)
+        if type_code not in self._history._ids_by_type:
+            raise KeyError(event_type)
+        return EventSequence(self._history, self._history._ids_by_type[type_code])
+
+    def __iter__(self):
+        return (self._history._types[c] for c in self._history._ids_by_type)
+
+    def __len__(self):
+        return len(self._history._ids_by_type)
+
+
+class EventsByActivityId(collections.abc.Mapping):
+    """Events by activity or timer id and event type."""
+
+    def __init__(self, history):
+        self._history = history
+
+    def __getitem__(self, task_id):
+        history = self._history
+        task_code = history._task_codes_by_id.get(task_id)
+        if task_code not in history._ids_by_task:
+            raise KeyError(task_id)
+        return {history._types[type_code]: EventSequence(history, ids)
+                for type_code, ids in history._ids_by_task[task_code].items()}
+
+    def __iter__(self):
+        return (self._history._task_ids[c] for c in self._history._ids_by_task)
+
+    def __len__(self):
+        return len(self._history._ids_by_task)
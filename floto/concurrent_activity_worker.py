@@ -0,0 +1,266 @@
+import concurrent.futures
+import logging
+import os
+import sys
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import floto
+import floto.api
+import floto.decorators
+import floto.specs
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrentActivityWorker:
+    """Activity worker which runs several activity tasks at a time. <number_pollers> threads poll
+    for activity tasks and hand them to a thread pool or a process pool, depending on the
+    executor the activity has been registered with (see floto.activity): threads for I/O-bound
+    activities, processes for CPU-bound ones.
+
+    At most <max_in_flight> activity tasks are polled and not yet responded. Pollers stop polling
+    while this limit is reached, so that no activity task is polled (and its start-to-close
+    timeout started) before it can be run soon. Tasks exceeding the free threads and processes
+    wait in the queue of their executor.
+
+    Heartbeats of all running activity tasks are sent by a single thread every
+    <task_heartbeat_in_seconds>.
+
+    Usage:
+    -----
+    @floto.activity(name='download', version='v1')
+    def download(context):
+        ...
+
+    @floto.activity(name='transform', version='v1', executor='process')
+    def transform(context):
+        ...
+
+    worker = floto.ConcurrentActivityWorker(domain='d', task_list='tl', number_threads=16,
+                                            number_processes=4)
+    worker.run()
+    """
+
+    def __init__(self, swf=None, task_list=None, domain=None, task_heartbeat_in_seconds=None,
+                 number_pollers=2, number_threads=8, number_processes=None, queue_size=0,
+                 max_in_flight=None):
+        """
+        Parameters
+        ----------
+        swf: floto.api.Swf
+            If None a new instance is initiated
+        task_list: str [Required]
+        domain: str [Required]
+        task_heartbeat_in_seconds: int
+            Heartbeats are sent every <task_heartbeat_in_seconds> to SWF for each running
+            activity task. If set to 0 no heartbeats will be sent. Default is 120.
+        number_pollers: int
+        number_threads: int
+            Threads of the thread pool
+        number_processes: int
+            Processes of the process pool, defaults to the number of CPUs. If 0, activities
+            registered with the 'process' executor are run in the thread pool.
+        queue_size: int
+            Polled activity tasks which may wait for a free thread or process, if <max_in_flight>
+            is not given
+        max_in_flight: int
+            Maximal number of polled activity tasks which have not been responded yet. Defaults
+            to <number_threads> + <number_processes> + <queue_size>.
+        """
+        self.swf = swf or floto.api.Swf()
+        self.task_list = task_list
+        self.domain = domain
+        self.task_heartbeat_in_seconds = task_heartbeat_in_seconds
+        if self.task_heartbeat_in_seconds is None:
+            self.task_heartbeat_in_seconds = 120
+        self.number_pollers = number_pollers
+        self.number_threads = number_threads
+        self.number_processes = os.cpu_count() if number_processes is None else number_processes
+        self.queue_size = queue_size
+        self.max_in_flight = max_in_flight or (self.number_threads + self.number_processes +
+                                               self.queue_size)
+        # Total number of polls of all pollers
+        self.max_polls = sys.maxsize
+
+        self.number_polls = 0
+        self.number_completed = 0
+        self.number_failed = 0
+
+        # Task token -> activity id of the polled activity tasks which have not been responded
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stop_heartbeats = threading.Event()
+        self._slots = None
+        self._pollers = []
+        self._heartbeat_thread = None
+        self._thread_pool = None
+        self._process_pool = None
+        # Respond the activity tasks run by the process pool
+        self._responders = None
+
+    @property
+    def number_in_flight(self):
+        return len(self._in_flight)
+
+    def run(self):
+        """Runs activity tasks until stop() is called or <max_polls> polls have been made."""
+        self.start()
+        self.join()
+
+    def start(self):
+        """Starts the pollers and the pools and returns."""
+        self._stop.clear()
+        self._stop_heartbeats.clear()
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.number_threads)
+        if self.number_processes:
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.number_processes)
+            self._responders = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.number_pollers)
+        self._pollers = [self._start_thread(self._poll, 'poller-{}'.format(i))
+                         for i in range(self.number_pollers)]
+        if self.task_heartbeat_in_seconds:
+            self._heartbeat_thread = self._start_thread(self._send_heartbeats, 'heartbeats')
+
+    def stop(self):
+        """Stops polling. Polled activity tasks are finished."""
+        self._stop.set()
+
+    def join(self):
+        for poller in self._pollers:
+            poller.join()
+        # All activity tasks have been responded once all slots are free
+        for _ in range(self.max_in_flight):
+            self._slots.acquire()
+        for _ in range(self.max_in_flight):
+            self._slots.release()
+
+        self._stop_heartbeats.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join()
+        self._thread_pool.shutdown()
+        if self._process_pool:
+            self._process_pool.shutdown()
+            self._responders.shutdown()
+
+    def _start_thread(self, target, name):
+        thread = threading.Thread(target=target, name='floto-activity-worker-{}'.format(name))
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _poll(self):
+        while not self._stop.is_set():
+            # Wait for a free slot, but do not miss stop()
+            if not self._slots.acquire(timeout=1):
+                continue
+            with self._lock:
+                if self._stop.is_set() or self.number_polls >= self.max_polls:
+                    self._slots.release()
+                    return
+                self.number_polls += 1
+
+            try:
+                response = self.swf.poll_for_activity_task(domain=self.domain,
+                                                           task_list=self.task_list)
+            except Exception as e:
+                logger.warning('Polling for activity tasks failed: {}'.format(e))
+                self._slots.release()
+                continue
+
+            if 'taskToken' in response:
+                self._submit(response)
+            else:
+                self._slots.release()
+
+    def _submit(self, response):
+        task_token = response['taskToken']
+        with self._lock:
+            self._in_flight[task_token] = response.get('activityId')
+
+        activity_type = response['activityType']
+        function_id = activity_type['name'] + ':' + activity_type['version']
+        if function_id not in floto.ACTIVITY_FUNCTIONS:
+            self._respond(task_token, error=ValueError(
+                'No activity with id {} registered'.format(function_id)))
+            return
+
+        try:
+            context = self.get_context(response)
+        except Exception as e:
+            self._respond(task_token, error=e)
+            return
+        if floto.ACTIVITY_EXECUTORS.get(function_id) == 'process' and self._process_pool:
+            module = floto.ACTIVITY_FUNCTIONS[function_id].__module__
+            future = self._process_pool.submit(floto.decorators.run_activity, function_id,
+                                               context, module)
+            future.add_done_callback(lambda f: self._responders.submit(
+                self._respond_future, task_token, f))
+        else:
+            self._thread_pool.submit(self._run_in_thread, task_token, function_id, context)
+
+    def _run_in_thread(self, task_token, function_id, context):
+        try:
+            result = floto.decorators.run_activity(function_id, context)
+        except Exception as e:
+            self._respond(task_token, error=e)
+        else:
+            self._respond(task_token, result=result)
+
+    def _respond_future(self, task_token, future):
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._restart_process_pool()
+        if error:
+            self._respond(task_token, error=error)
+        else:
+            self._respond(task_token, result=future.result())
+
+    def _respond(self, task_token, result=None, error=None):
+        try:
+            if error is None:
+                self.swf.client.respond_activity_task_completed(
+                    **floto.ActivityWorker.completed_args(task_token, result))
+            else:
+                self.swf.client.respond_activity_task_failed(taskToken=task_token,
+                                                             details=str(error))
+        except Exception as e:
+            logger.warning(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(task_token, None)
+                if error is None:
+                    self.number_completed += 1
+                else:
+                    self.number_failed += 1
+            self._slots.release()
+
+    def _restart_process_pool(self):
+        with self._lock:
+            pool = self._process_pool
+            if pool is None or not getattr(pool, '_broken', False):
+                return
+            logger.warning('A process of the process pool died, restarting the pool')
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.number_processes)
+        pool.shutdown(wait=False)
+
+    def _send_heartbeats(self):
+        while not self._stop_heartbeats.wait(self.task_heartbeat_in_seconds):
+            with self._lock:
+                task_tokens = list(self._in_flight)
+            for task_token in task_tokens:
+                try:
+                    self.swf.record_activity_task_heartbeat(task_token=task_token, details=None)
+                except Exception as e:
+                    logger.warning('Heartbeat failed: {}'.format(e))
+
+    @staticmethod
+    def get_context(response):
+        context = {}
+        if 'input' in response:
+            context = floto.specs.JSONEncoder.load_string(response['input'])
+        return context
@@ -1,5 +1,11 @@
 from .base import Base
 from .decider import Decider
+from .concurrent_decider import ConcurrentDecider
+from .routing_decider import RoutingDecider
 from .execution_graph import ExecutionGraph
+from .decider_spec_cache import DeciderSpecCache
+from .child_decider_pool import ChildDeciderPool
 from .daemon import Daemon
 from .decision_builder import DecisionBuilder
+from .ready_set_scheduler import ReadySetScheduler
+from .graph_metadata import GraphMetadata
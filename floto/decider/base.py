@@ -1,3 +1,4 @@
+import copy
 import multiprocessing
 import sys
 
@@ -12,12 +13,18 @@ logger = logging.getLogger(__name__)
 class Base:
     domain = None
 
-    def __init__(self, swf=None):
+    def __init__(self, swf=None, history_cache=None, history_snapshot_store=None):
         """Base class for deciders.
         Parameters
         ----------
         swf: floto.api.Swf
             The SWF client, if swf is None an instance is created
+        history_cache: floto.HistoryCache
+            If given, the histories of the workflow executions are kept between decision tasks and
+            only new events are read when polling
+        history_snapshot_store: floto.HistorySnapshotStore
+            If given, a snapshot of the history is stored after each decision. Histories which are
+            not in <history_cache> (e.g. after a restart) are resumed from their snapshot.
         """
         self.task_token = None
         self.last_response = None
@@ -29,6 +36,12 @@ class Base:
         self.max_polls = sys.maxsize
         self.swf = swf or floto.api.Swf()
         self.task_list = None
+        self.history_cache = history_cache
+        self.history_snapshot_store = history_snapshot_store
+        self.history_class = floto.History
+        self.history_prefetch_pages = 0
+        # Read the history pages needed for the decision as soon as the decision task is polled
+        self.load_history_for_decision = True
 
         self.terminate_workflow = False
         self.terminate_decider = False
@@ -45,8 +58,23 @@ class Base:
             logger.warning(e)
 
         self.decisions = []
+        if self.history:
+            logger.debug('Decision task of run {}: {} history page(s) fetched'.format(
+                self.run_id, self.history.decision_page_fetch_count))
         if self.terminate_workflow:
+            if self.history_cache is not None:
+                self.history_cache.remove(self.run_id)
+            if self.history_snapshot_store is not None:
+                self.history_snapshot_store.remove(self.run_id)
             self.tear_down()
+        elif self.history and self.history_snapshot_store is not None:
+            self.save_history_snapshot()
+
+    def save_history_snapshot(self):
+        try:
+            self.history_snapshot_store.save(self.run_id, self.history)
+        except Exception as e:
+            logger.warning('Could not save history snapshot of run {}: {}'.format(self.run_id, e))
 
     def tear_down(self):
         """Tear down method to be overridden by child class."""
@@ -60,14 +88,32 @@ class Base:
                                                                   task_list=self.task_list)
         if 'taskToken' in self.last_response:
             self.task_token = self.last_response['taskToken']
-            self.history = floto.History(domain=self.domain, task_list=self.task_list,
-                                         response=self.last_response)
             self.run_id = self.last_response['workflowExecution']['runId']
             self.workflow_id = self.last_response['workflowExecution']['workflowId']
+            self.history = self.get_history(self.last_response)
+            if self.load_history_for_decision:
+                self.history.load_events_for_decision()
         else:
             self.history = None
             self.task_token = None
 
+    def get_history(self, response):
+        """The history of the polled decision task. If a history cache is set and the workflow
+        execution is known, the cached history is updated with the new events. Otherwise the
+        history is resumed from its snapshot if there is one."""
+        history = None
+        if self.history_cache is not None:
+            history = self.history_cache.get(self.run_id)
+        if history is None and self.history_snapshot_store is not None:
+            history = self.history_snapshot_store.load(self.run_id)
+        if not (history and history.update(response)):
+            history = self.history_class(domain=self.domain, task_list=self.task_list,
+                                         response=response,
+                                         prefetch_pages=self.history_prefetch_pages)
+        if self.history_cache is not None:
+            self.history_cache.put(self.run_id, history)
+        return history
+
     def get_decisions(self):
         """This method must be implemented by child classes to fill self.decisions"""
         raise NotImplementedError
@@ -89,5 +135,20 @@ class Base:
                 self.get_decisions()
                 self.complete()
 
+    def copy_for_decision_task(self):
+        """A shallow copy of the decider which handles one decision task, e.g. in a thread of
+        floto.decider.ConcurrentDecider. The copy shares the configuration, the SWF client and the
+        caches of the decider, but not the state of the decision task."""
+        decider = copy.copy(self)
+        decider.task_token = None
+        decider.last_response = None
+        decider.history = None
+        decider.decisions = []
+        decider.run_id = None
+        decider.workflow_id = None
+        decider.terminate_workflow = False
+        decider._separate_process = None
+        return decider
+
     def get_workflow_execution_description(self):
         return self.swf.describe_workflow_execution(self.domain, self.workflow_id, self.run_id)
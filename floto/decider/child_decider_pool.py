@@ -0,0 +1,210 @@
+import collections
+import logging
+import multiprocessing
+import queue
+import sys
+
+import floto.decider
+import floto.specs
+
+logger = logging.getLogger(__name__)
+
+
+class ChildDeciderPool:
+    """Fixed number of decider processes for the child workflows of a floto.decider.Daemon.
+    Each process runs a floto.decider.RoutingDecider on its own task list. A child workflow is
+    started on the task list of the least loaded process, which routes the decision tasks of the
+    child by its workflow id.
+
+    At most <max_children> child workflows are active. Further children are queued until active
+    children close (see release). Processes which died are restarted and get the specs of their
+    active children again (see reap).
+
+    Usage:
+    -----
+    daemon = floto.decider.Daemon(domain='d')
+    daemon.child_decider_pool = floto.decider.ChildDeciderPool(domain='d', number_workers=4)
+    daemon.child_decider_pool.start()
+    daemon.run()
+    """
+
+    # Seconds a worker waits for the spec of a child whose decision task has been polled before
+    # the spec arrived
+    REGISTRATION_TIMEOUT = 1
+
+    def __init__(self, domain, number_workers=4, max_children=1000,
+                 task_list_prefix='floto_children'):
+        """
+        Parameters
+        ----------
+        domain: str
+        number_workers: int
+            Number of decider processes
+        max_children: int
+            Maximal number of active child workflows
+        task_list_prefix: str
+            The task list of worker i is <task_list_prefix>_<i>
+        """
+        self.domain = domain
+        self.number_workers = number_workers
+        self.max_children = max_children
+        self.task_lists = ['{}_{}'.format(task_list_prefix, i) for i in range(number_workers)]
+
+        # workflow_id -> (worker index, JSON decider spec)
+        self.active = {}
+        # Queued children: (decider spec, item of the caller, e.g. the pending decision)
+        self.queued = collections.deque()
+
+        self._inboxes = [None] * number_workers
+        self._processes = [None] * number_workers
+        self._loads = [0] * number_workers
+
+    @property
+    def is_full(self):
+        return len(self.active) >= self.max_children
+
+    @property
+    def metrics(self):
+        return {'active_children': len(self.active),
+                'queued_children': len(self.queued),
+                'children_per_worker': list(self._loads),
+                'alive_workers': sum(1 for p in self._processes if p and p.is_alive())}
+
+    def start(self):
+        for i in range(self.number_workers):
+            self._start_worker(i)
+
+    def stop(self):
+        for i, process in enumerate(self._processes):
+            if process and process.is_alive():
+                self._inboxes[i].put(('stop',))
+        for process in self._processes:
+            if process:
+                process.join()
+
+    def submit(self, workflow_id, decider_spec):
+        """Hands the child workflow <workflow_id> to the least loaded worker.
+
+        Parameters
+        ----------
+        decider_spec: floto.specs.DeciderSpec or str (JSON)
+
+        Returns
+        -------
+        str: The task list the child workflow must be started on
+
+        Raises
+        ------
+        RuntimeError
+            If <max_children> child workflows are active
+        """
+        if self.is_full:
+            raise RuntimeError('Maximal number of {} child deciders reached'.format(
+                self.max_children))
+        if isinstance(decider_spec, floto.specs.DeciderSpec):
+            decider_spec = decider_spec.to_json()
+        worker = self._loads.index(min(self._loads))
+        self.active[workflow_id] = (worker, decider_spec)
+        self._loads[worker] += 1
+        self._send(worker, ('register', workflow_id, decider_spec))
+        return self.task_lists[worker]
+
+    def enqueue(self, decider_spec, item=None):
+        """Queues a child which cannot be admitted now. <item> is returned by next_queued."""
+        self.queued.append((decider_spec, item))
+
+    def next_queued(self):
+        """(decider_spec, item) of the next queued child if a child can be admitted, else None."""
+        if self.queued and not self.is_full:
+            return self.queued.popleft()
+        return None
+
+    def release(self, workflow_id):
+        """Frees the slot of the closed child workflow <workflow_id>."""
+        if workflow_id not in self.active:
+            return
+        worker, _ = self.active.pop(workflow_id)
+        self._loads[worker] -= 1
+        self._send(worker, ('unregister', workflow_id))
+
+    def reap(self):
+        """Restarts dead worker processes and hands them the specs of their active children.
+
+        Returns
+        -------
+        int: Number of restarted workers
+        """
+        restarted = 0
+        for i, process in enumerate(self._processes):
+            if process and not process.is_alive():
+                logger.warning('Child decider worker {} exited with code {}, restarting'.format(
+                    i, process.exitcode))
+                self._start_worker(i)
+                for workflow_id, (worker, decider_spec) in self.active.items():
+                    if worker == i:
+                        self._send(i, ('register', workflow_id, decider_spec))
+                restarted += 1
+        return restarted
+
+    def _send(self, worker, message):
+        if self._inboxes[worker] is not None:
+            self._inboxes[worker].put(message)
+
+    def _start_worker(self, i):
+        self._inboxes[i] = multiprocessing.Queue()
+        self._processes[i] = multiprocessing.Process(target=self.run_worker,
+                                                     args=(self.domain, self.task_lists[i],
+                                                           self._inboxes[i]))
+        self._processes[i].daemon = True
+        self._processes[i].start()
+
+    @staticmethod
+    def run_worker(domain, task_list, inbox, swf=None, max_polls=sys.maxsize):
+        """Decider loop of a worker process: handles the messages of <inbox> and the decision
+        tasks of <task_list>.
+
+        Messages: ('register', workflow_id, json_decider_spec), ('unregister', workflow_id),
+        ('stop',)
+        """
+        router = floto.decider.RoutingDecider(domain=domain, task_list=task_list, swf=swf,
+                                              spec_cache=floto.decider.DeciderSpecCache())
+        number_polls = 0
+        while number_polls < max_polls:
+            if not ChildDeciderPool._handle_messages(router, inbox):
+                return
+            router.poll_for_decision()
+            number_polls += 1
+            if not router.task_token:
+                continue
+
+            if not ChildDeciderPool._handle_messages(router, inbox):
+                return
+            if router.get_decider(router.last_response, router.history) is None:
+                # The spec may still be on its way
+                if not ChildDeciderPool._handle_messages(router, inbox,
+                                                         ChildDeciderPool.REGISTRATION_TIMEOUT):
+                    return
+            router.get_decisions()
+            router.complete()
+
+    @staticmethod
+    def _handle_messages(router, inbox, timeout=None):
+        """Handles the messages in <inbox>. If <timeout> is given, waits up to <timeout> seconds
+        for the first message. Returns False if the worker is to stop."""
+        while True:
+            try:
+                if timeout:
+                    message = inbox.get(timeout=timeout)
+                    timeout = None
+                else:
+                    message = inbox.get_nowait()
+            except queue.Empty:
+                return True
+
+            if message[0] == 'register':
+                _, workflow_id, json_decider_spec = message
+                router.register(json_decider_spec, workflow_id=workflow_id)
+            elif message[0] == 'unregister':
+                router.unregister(message[1])
+            elif message[0] == 'stop':
+                return False
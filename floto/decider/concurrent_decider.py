@@ -0,0 +1,164 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrentDecider:
+    """Runs a decider with <number_pollers> threads polling for decision tasks and
+    <number_workers> threads handling them. A slow history page or RespondDecisionTaskCompleted
+    call then only delays its own workflow execution. Polled decision tasks wait in a queue of at
+    most <queue_size> tasks; pollers stop polling while the queue is full, so that decision tasks
+    are not polled before a worker can handle them.
+
+    Each decision task is handled by a copy of the decider (see
+    floto.decider.Base.copy_for_decision_task) with its own history and decision state. SWF
+    never hands out two decision tasks of the same workflow execution at a time.
+
+    The durations of the phases of the decision tasks are collected in <phase_timings>:
+    'poll' (PollForDecisionTask and reading the first history page), 'queue' (waiting for a
+    worker), 'history' (reading the history pages needed for the decision), 'decide'
+    (get_decisions) and 'complete' (RespondDecisionTaskCompleted and tear down).
+
+    Usage:
+    -----
+    decider = floto.decider.Decider(decider_spec=spec)
+    decider.history_cache = floto.HistoryCache(max_size=5000)
+    floto.decider.ConcurrentDecider(decider, number_pollers=4, number_workers=16).run()
+    """
+
+    PHASES = ('poll', 'queue', 'history', 'decide', 'complete')
+
+    def __init__(self, decider, number_pollers=2, number_workers=8, queue_size=None):
+        """
+        Parameters
+        ----------
+        decider: floto.decider.Base
+        number_pollers: int
+        number_workers: int
+        queue_size: int
+            Maximal number of polled decision tasks waiting for a worker. Defaults to
+            <number_workers>.
+        """
+        self.decider = decider
+        self.number_pollers = number_pollers
+        self.number_workers = number_workers
+        self.queue_size = queue_size or number_workers
+        # Total number of polls of all pollers
+        self.max_polls = decider.max_polls
+
+        self.number_polls = 0
+        self.number_decision_tasks = 0
+        self.number_errors = 0
+
+        self._timings = {phase: [0, 0.0, 0.0] for phase in self.PHASES}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._queue = None
+        self._pollers = []
+        self._workers = []
+
+    @property
+    def phase_timings(self):
+        """Phase -> {'count', 'total_seconds', 'mean_seconds', 'max_seconds'}"""
+        with self._lock:
+            return {phase: {'count': count,
+                            'total_seconds': total,
+                            'mean_seconds': total / count if count else 0.0,
+                            'max_seconds': maximum}
+                    for phase, (count, total, maximum) in self._timings.items()}
+
+    def run(self):
+        """Handles decision tasks until stop() is called or <max_polls> polls have been made."""
+        self.start()
+        self.join()
+
+    def start(self):
+        """Starts the threads and returns."""
+        self._stop.clear()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._pollers = [self._start_thread(self._poll, 'poller', i)
+                         for i in range(self.number_pollers)]
+        self._workers = [self._start_thread(self._work, 'worker', i)
+                         for i in range(self.number_workers)]
+
+    def stop(self):
+        """Stops polling. Polls in progress and polled decision tasks are finished."""
+        self._stop.set()
+
+    def join(self):
+        for poller in self._pollers:
+            poller.join()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def _start_thread(self, target, name, number):
+        thread = threading.Thread(target=target, name='floto-decider-{}-{}'.format(name, number))
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _poll(self):
+        while not self._stop.is_set():
+            with self._lock:
+                if self.number_polls >= self.max_polls:
+                    return
+                self.number_polls += 1
+
+            decider = self.decider.copy_for_decision_task()
+            decider.load_history_for_decision = False
+            start = time.perf_counter()
+            try:
+                decider.poll_for_decision()
+            except Exception as e:
+                self._record_error('Polling for decision tasks failed: {}'.format(e))
+                continue
+            self._record('poll', start)
+
+            if decider.task_token:
+                self._queue.put((decider, time.perf_counter()))
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            decider, queued = item
+            self._record('queue', queued)
+            try:
+                self._handle_decision_task(decider)
+            except Exception as e:
+                self._record_error('Decision task of run {} failed: {}'.format(decider.run_id, e))
+
+    def _handle_decision_task(self, decider):
+        if self.decider.load_history_for_decision:
+            start = time.perf_counter()
+            decider.history.load_events_for_decision()
+            self._record('history', start)
+
+        start = time.perf_counter()
+        decider.get_decisions()
+        self._record('decide', start)
+
+        start = time.perf_counter()
+        decider.complete()
+        self._record('complete', start)
+        with self._lock:
+            self.number_decision_tasks += 1
+
+    def _record(self, phase, start):
+        duration = time.perf_counter() - start
+        with self._lock:
+            timing = self._timings[phase]
+            timing[0] += 1
+            timing[1] += duration
+            timing[2] = max(timing[2], duration)
+
+    def _record_error(self, message):
+        logger.warning(message)
+        with self._lock:
+            self.number_errors += 1
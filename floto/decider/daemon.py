@@ -1,17 +1,37 @@
+import copy
+import logging
 import uuid
 
 import floto.decider
 from floto.decider import Base
 
+logger = logging.getLogger(__name__)
+
 
 class Daemon(Base):
+    # Events which close child workflow executions
+    CHILD_CLOSED_EVENT_TYPES = ['ChildWorkflowExecutionCompleted',
+                                'ChildWorkflowExecutionFailed',
+                                'ChildWorkflowExecutionTimedOut',
+                                'ChildWorkflowExecutionCanceled',
+                                'ChildWorkflowExecutionTerminated',
+                                'StartChildWorkflowExecutionFailed']
+
     def __init__(self, domain=None, task_list=None, swf=None):
         super().__init__(swf=swf)
         self.task_list = task_list or 'floto_daemon'
         if domain:
             self.domain = domain
+        # Specs submitted repeatedly are parsed and validated only once
+        self.decider_spec_cache = floto.decider.DeciderSpecCache()
+        # If set, child workflows are decided by the floto.decider.ChildDeciderPool instead of a
+        # process per child
+        self.child_decider_pool = None
 
     def get_decisions(self):
+        if self.child_decider_pool:
+            self.release_closed_child_workflows()
+            self.decisions.extend(self.get_decisions_queued_child_workflows())
         signals = self.history.get_events_up_to_last_decision('WorkflowExecutionSignaled')
         self.decisions.extend(self.get_decisions_child_workflows(signals))
 
@@ -32,12 +52,51 @@ class Daemon(Base):
                 input_ = floto.specs.JSONEncoder.load_string(attributes['input'])
                 if 'decider_spec' in input_:
                     json_decider_spec = floto.specs.JSONEncoder.dump_object(input_['decider_spec'])
+                    if self.child_decider_pool:
+                        return self.submit_child_workflow(json_decider_spec, decision)
                     decider_spec = self.get_decider_spec(json_decider_spec,
                                                          decision.task_list['name'],
                                                          self.domain)
                     self.start_child_decider(decider_spec)
         return decision
 
+    def submit_child_workflow(self, json_decider_spec, decision):
+        """Hands the child workflow of <decision> to the child decider pool. Returns <decision>
+        with the task list of the pool worker, None if the child has been queued."""
+        pool = self.child_decider_pool
+        if pool.is_full:
+            pool.enqueue(json_decider_spec, decision)
+            logger.info('Child workflow {} queued, {} queued children'.format(
+                decision.workflow_id, len(pool.queued)))
+            return None
+        # Validates the spec before the child workflow is started
+        self.decider_spec_cache.get(json_decider_spec)
+        task_list = pool.submit(decision.workflow_id, json_decider_spec)
+        decision.task_list = {'name': task_list}
+        return decision
+
+    def get_decisions_queued_child_workflows(self):
+        decisions = []
+        queued = self.child_decider_pool.next_queued()
+        while queued:
+            json_decider_spec, decision = queued
+            decisions.append(self.submit_child_workflow(json_decider_spec, decision))
+            queued = self.child_decider_pool.next_queued()
+        return decisions
+
+    def release_closed_child_workflows(self):
+        """Releases the children which have closed since the last decision from the pool and
+        restarts dead pool workers."""
+        for event_type in self.CHILD_CLOSED_EVENT_TYPES:
+            for event in self.history.get_events_up_to_last_decision(event_type):
+                attributes = self.history.get_event_attributes(event)
+                if 'workflowExecution' in attributes:
+                    workflow_id = attributes['workflowExecution']['workflowId']
+                else:
+                    workflow_id = attributes.get('workflowId')
+                self.child_decider_pool.release(workflow_id)
+        self.child_decider_pool.reap()
+
     def get_decision_start_child_workflow_execution(self):
         child_workflow_type = floto.api.WorkflowType(name='child_workflow', version='v1')
         child_workflow_id = str(uuid.uuid4())
@@ -50,11 +109,13 @@ class Daemon(Base):
         return child_workflow
 
     def start_child_decider(self, decider_spec):
-        decider = floto.decider.Decider(decider_spec=decider_spec)
+        decider = floto.decider.Decider(decider_spec=decider_spec,
+                                        spec_cache=self.decider_spec_cache)
         decider.run(separate_process=True)
 
     def get_decider_spec(self, json_decider_spec, task_list, domain):
-        decider_spec = floto.specs.DeciderSpec.from_json(json_decider_spec)
+        # The cached spec is shared, its copy shares the activity tasks and the execution graph
+        decider_spec = copy.copy(self.decider_spec_cache.get(json_decider_spec))
         decider_spec.task_list = task_list
         decider_spec.domain = domain
         return decider_spec
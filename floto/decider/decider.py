@@ -1,3 +1,5 @@
+import copy
+
 import floto
 import floto.api
 import floto.decisions
@@ -12,13 +14,21 @@ class Decider(Base):
     ----------
     decider_spec: str (JSON) or floto.specs.DeciderSpec
        For definition of decider spec see floto.specs.DeciderSpec
+    spec_cache: floto.decider.DeciderSpecCache
+       If given, JSON specs are taken from the cache, as well as the execution graphs of the
+       specs in the cache
+    swf: floto.api.Swf
+       The SWF client, if swf is None an instance is created
     """
 
-    def __init__(self, decider_spec=None):
-        super().__init__()
+    def __init__(self, decider_spec=None, spec_cache=None, swf=None):
+        super().__init__(swf=swf)
 
         if isinstance(decider_spec, str):
-            self.decider_spec = floto.specs.DeciderSpec.from_json(decider_spec)
+            if spec_cache is not None:
+                self.decider_spec = spec_cache.get(decider_spec)
+            else:
+                self.decider_spec = floto.specs.DeciderSpec.from_json(decider_spec)
         else:
             self.decider_spec = decider_spec
 
@@ -32,16 +42,26 @@ class Decider(Base):
         self.activity_task_list = self.decider_spec.activity_task_list or 'floto_activities'
 
         activity_tasks = self.decider_spec.activity_tasks
-        execution_graph = floto.decider.ExecutionGraph(activity_tasks)
+        if spec_cache is not None:
+            execution_graph = spec_cache.execution_graph(activity_tasks)
+        else:
+            execution_graph = floto.decider.ExecutionGraph(activity_tasks)
         self.decision_builder = floto.decider.DecisionBuilder(execution_graph,
                                                               self.activity_task_list)
+        # If True, the open counts derived from the history are checked against
+        # DescribeWorkflowExecution in each decision task
+        self.verify_open_counts = False
+
+    def copy_for_decision_task(self):
+        decider = super().copy_for_decision_task()
+        decider.decision_builder = copy.copy(self.decision_builder)
+        return decider
 
     def get_decisions(self):
         """Heart of the decider logics. Called by floto.decider.Base in each 
         'poll_for_decision_taks loop'. Fills self.decisions, which are returned to SWF.
         """
-        # TODO: redesign desc
-        desc = self.get_workflow_execution_description()
+        desc = self.get_workflow_execution_description() if self.verify_open_counts else None
         self.decision_builder.current_workflow_execution_description = desc
         self.decisions = self.decision_builder.get_decisions(self.history)
         self.terminate_workflow = self.decision_builder.is_terminate_workflow()
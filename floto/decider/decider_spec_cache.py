@@ -0,0 +1,164 @@
+import collections
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+
+import floto.decider
+import floto.specs
+
+logger = logging.getLogger(__name__)
+
+
+class DeciderSpecCache:
+    """Keeps compiled decider specs: the DeciderSpec parsed from JSON together with its
+    validated ExecutionGraph (indices, adjacency lists, first and outgoing tasks). Specs are keyed
+    by the SHA-256 of their canonical JSON, hence a spec which is submitted repeatedly is parsed
+    and validated only once. Least recently used specs are evicted if the cache exceeds
+    <max_size> entries. If <directory> is given, compiled specs are also pickled to
+    <directory>/<hash>.pickle and survive restarts.
+
+    The cached DeciderSpec objects are shared: copy them before changing their attributes
+    (copy.copy keeps the activity tasks and hence the cached ExecutionGraph).
+
+    Usage:
+    -----
+    cache = floto.decider.DeciderSpecCache(max_size=100, directory='/var/cache/floto/specs')
+    decider = floto.decider.Decider(decider_spec=json_spec, spec_cache=cache)
+    """
+
+    SUFFIX = '.pickle'
+
+    def __init__(self, max_size=128, directory=None):
+        """
+        Parameters
+        ----------
+        max_size: int
+            Maximal number of compiled specs kept in memory
+        directory: str
+            If given, compiled specs are pickled into this directory. It is created if it does
+            not exist.
+        """
+        self.max_size = max_size
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        # key -> (decider_spec, execution_graph)
+        self._compiled = collections.OrderedDict()
+        # id(decider_spec.activity_tasks) -> key
+        self._keys_by_tasks = {}
+
+    @staticmethod
+    def key(json_decider_spec):
+        """SHA-256 of the canonical form (sorted keys, no whitespace) of <json_decider_spec>."""
+        canonical = json.dumps(json.loads(json_decider_spec), sort_keys=True,
+                               separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, decider_spec):
+        """The compiled DeciderSpec of <decider_spec>.
+
+        Parameters
+        ----------
+        decider_spec: str (JSON) or floto.specs.DeciderSpec
+
+        Returns
+        -------
+        floto.specs.DeciderSpec
+        """
+        if isinstance(decider_spec, floto.specs.DeciderSpec):
+            decider_spec = decider_spec.to_json()
+        key = self.key(decider_spec)
+        if key in self._compiled:
+            self.hits += 1
+            self._compiled.move_to_end(key)
+            return self._compiled[key][0]
+
+        self.misses += 1
+        compiled = self._load(key)
+        if compiled:
+            self.disk_hits += 1
+        else:
+            compiled = self.compile(decider_spec)
+            self._save(key, compiled)
+        self._put(key, compiled)
+        return compiled[0]
+
+    def execution_graph(self, activity_tasks):
+        """The compiled ExecutionGraph of <activity_tasks> if they are the activity tasks of a
+        cached spec, otherwise a new ExecutionGraph."""
+        key = self._keys_by_tasks.get(id(activity_tasks))
+        if key in self._compiled:
+            decider_spec, execution_graph = self._compiled[key]
+            if decider_spec.activity_tasks is activity_tasks:
+                return execution_graph
+        return floto.decider.ExecutionGraph(activity_tasks)
+
+    @staticmethod
+    def compile(json_decider_spec):
+        """Parses <json_decider_spec> and builds its ExecutionGraph.
+
+        Returns
+        -------
+        tuple: (floto.specs.DeciderSpec, floto.decider.ExecutionGraph)
+
+        Raises
+        ------
+        ValueError
+            If task ids are used twice or the dependencies contain a cycle
+        """
+        decider_spec = floto.specs.DeciderSpec.from_json(json_decider_spec)
+        execution_graph = floto.decider.ExecutionGraph(decider_spec.activity_tasks)
+        if decider_spec.activity_tasks:
+            execution_graph.topological_order()
+            execution_graph.get_first_tasks()
+            execution_graph.outgoing_vertices()
+        return decider_spec, execution_graph
+
+    def clear(self):
+        self._compiled.clear()
+        self._keys_by_tasks.clear()
+
+    def __contains__(self, key):
+        return key in self._compiled
+
+    def __len__(self):
+        return len(self._compiled)
+
+    def _put(self, key, compiled):
+        self._compiled[key] = compiled
+        self._keys_by_tasks[id(compiled[0].activity_tasks)] = key
+        while len(self._compiled) > self.max_size:
+            _, (decider_spec, _) = self._compiled.popitem(last=False)
+            self._keys_by_tasks.pop(id(decider_spec.activity_tasks), None)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _load(self, key):
+        if not self.directory or not os.path.isfile(self._path(key)):
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning('Could not load compiled decider spec {}: {}'.format(key, e))
+            return None
+
+    def _save(self, key, compiled):
+        if not self.directory:
+            return
+        try:
+            file_descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(file_descriptor, 'wb') as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning('Could not save compiled decider spec {}: {}'.format(key, e))
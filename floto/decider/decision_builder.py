@@ -1,8 +1,13 @@
 import json
+import logging
+import weakref
 
 import floto
 import floto.decisions
 import floto.specs
+from floto.decider.ready_set_scheduler import ReadySetScheduler
+
+logger = logging.getLogger(__name__)
 
 
 class DecisionBuilder:
@@ -14,6 +19,9 @@ class DecisionBuilder:
         self.activity_task_list = activity_task_list
         self.workflow_input = None
         self.current_workflow_execution_description = None
+        # History -> ReadySetScheduler. The counters of a history which is kept between decisions
+        # (see floto.HistoryCache) are updated incrementally, otherwise they are rebuilt.
+        self._schedulers = weakref.WeakKeyDictionary()
 
     def get_decisions(self, history):
         self.history = history
@@ -22,7 +30,14 @@ class DecisionBuilder:
 
         first_event_id = self.history.previous_decision_id
         last_event_id = self.history.decision_task_started_event_id
+        scheduler = self._schedulers.get(history)
+        if scheduler and scheduler.decision_id != first_event_id:
+            # Decisions have been made without this history: the counters are outdated
+            del self._schedulers[history]
+
         decisions = self._collect_decisions(first_event_id, last_event_id)
+        if history in self._schedulers:
+            self._schedulers[history].decision_id = last_event_id
         return decisions
 
     def is_terminate_workflow(self):
@@ -215,21 +230,25 @@ class DecisionBuilder:
         False otherwise."""
         for t in completed_tasks:
             id_ = self.history.get_id_task_event(t)
-            depending_tasks = self.execution_graph.get_depending_tasks(id_)
-            if depending_tasks:
+            if self.execution_graph.has_depending_tasks(id_):
                 return True
         return False
 
     def open_task_counts(self):
-        """Return True if there are "openActivityTasks" or "openTimers" in the "workflow execution
-        description. False otherwise."""
-        if not self.current_workflow_execution_description:
-            return False
+        """Return True if there are open activity tasks or timers, False otherwise. The open
+        tasks are derived from the history. If a workflow execution description is set, its
+        "openCounts" are used instead and a deviation from the history is logged."""
+        open_counts = self.history.get_open_task_counts()
 
         description = self.current_workflow_execution_description
-        open_activity_tasks = description['openCounts']['openActivityTasks']
-        open_timers = description['openCounts']['openTimers']
-        if open_activity_tasks or open_timers:
+        if description:
+            described = {k: description['openCounts'][k] for k in open_counts}
+            if described != open_counts:
+                logger.warning('Open counts of the history {} differ from the workflow execution '
+                               'description {}'.format(open_counts, described))
+            open_counts = described
+
+        if open_counts['openActivityTasks'] or open_counts['openTimers']:
             return True
         return False
 
@@ -260,13 +279,18 @@ class DecisionBuilder:
         return tasks
 
     def get_tasks_to_be_scheduled_single_id(self, activity_id):
-        depending = self.execution_graph.get_depending_tasks(activity_id)
-        tasks = []
-        for d in depending:
-            dependencies = self.execution_graph.get_dependencies(d.id_)
-            if all([self.history.is_task_completed(t) for t in dependencies]):
-                tasks.append(d)
-        return tasks
+        return self.scheduler.complete(activity_id)
+
+    @property
+    def scheduler(self):
+        """The ReadySetScheduler of the current history. It is built from the history when it is
+        first needed."""
+        scheduler = self._schedulers.get(self.history)
+        if scheduler is None or scheduler.execution_graph is not self.execution_graph:
+            scheduler = ReadySetScheduler(self.execution_graph)
+            scheduler.build(self.history.is_task_completed)
+            self._schedulers[self.history] = scheduler
+        return scheduler
 
     def uniqify_activity_tasks(self, activity_tasks):
         return list({t.id_: t for t in activity_tasks}.values())
@@ -1,4 +1,47 @@
+import floto.decider
+
+
+class AdjacencyMatrix:
+    """Read-only matrix view of adjacency lists: m[idx_1][idx_2] == 1 <=> idx_2 in lists[idx_1].
+    Only the adjacency lists are stored.
+    """
+
+    def __init__(self, adjacency_lists):
+        self._rows = [AdjacencyRow(a, len(adjacency_lists)) for a in adjacency_lists]
+
+    def __getitem__(self, idx):
+        return self._rows[idx]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class AdjacencyRow:
+    def __init__(self, adjacent, size):
+        self._adjacent = frozenset(adjacent)
+        self._size = size
+
+    def __getitem__(self, idx):
+        if not -self._size <= idx < self._size:
+            raise IndexError('AdjacencyRow index out of range')
+        return 1 if idx % self._size in self._adjacent else 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for idx in range(self._size):
+            yield 1 if idx in self._adjacent else 0
+
+
 class ExecutionGraph:
+    """The dependencies between the tasks of a decider spec, stored as adjacency lists of task
+    indices. The transitively reduced graph (see get_depending_tasks) is computed on first use.
+    """
+
     def __init__(self, activity_tasks=None):
         self.tasks = activity_tasks
 
@@ -7,10 +50,19 @@ class ExecutionGraph:
         self._ids = None
         self._tasks_by_id = None
 
+        # idx -> indices of the tasks which require the task / which the task requires
+        self._successors = None
+        self._predecessors = None
+        self._reduced_successors = None
+        self._first_tasks = None
+        self._outgoing_vertices = None
+        self._metadata = None
+
         self.graph_matrix = None
 
     @property
     def graph(self):
+        """Matrix view of the transitively reduced graph (see graph_from_task_specs)."""
         if not self.graph_matrix:
             self.graph_matrix = self.graph_from_task_specs()
         return self.graph_matrix
@@ -39,6 +91,35 @@ class ExecutionGraph:
             self.generate_indices()
         return self._tasks_by_id
 
+    @property
+    def successors(self):
+        """List of sorted lists: successors[idx] are the indices of the tasks requiring task idx."""
+        if self._successors is None:
+            self.generate_adjacency_lists()
+        return self._successors
+
+    @property
+    def predecessors(self):
+        """List of sorted lists: predecessors[idx] are the indices of the tasks required by task
+        idx."""
+        if self._predecessors is None:
+            self.generate_adjacency_lists()
+        return self._predecessors
+
+    @property
+    def reduced_successors(self):
+        """The successors of the transitively reduced graph."""
+        if self._reduced_successors is None:
+            self._reduced_successors = self.transitive_reduction(self.successors)
+        return self._reduced_successors
+
+    @property
+    def metadata(self):
+        """floto.decider.GraphMetadata of the graph, computed on first access."""
+        if self._metadata is None:
+            self._metadata = floto.decider.GraphMetadata(self)
+        return self._metadata
+
     def task_by_idx(self, idx):
         return self.tasks_by_id[self.idx_to_id[idx]]
 
@@ -59,48 +140,100 @@ class ExecutionGraph:
                 message = 'You must not use the same task ID twice in your decider_spec'
                 raise ValueError(message)
 
+    def generate_adjacency_lists(self):
+        id_to_idx = self.id_to_idx
+        predecessors = [[] for _ in self.ids]
+        successors = [[] for _ in self.ids]
+        for t in self.tasks:
+            if t.requires:
+                index_task = id_to_idx[t.id_]
+                required = sorted(set(id_to_idx[r.id_] for r in t.requires))
+                predecessors[index_task] = required
+                for index_required_task in required:
+                    successors[index_required_task].append(index_task)
+        # Tasks are visited in index order, hence the successor lists are sorted
+        self._predecessors = predecessors
+        self._successors = successors
+
     def graph_from_task_specs(self):
         """First index depends on second index:
         m[id_1][id_2] == 1 => 2 depends on 1
         """
-        matrix = [[0] * len(self.id_to_idx) for i in range(len(self.id_to_idx))]
-        for t in self.tasks:
-            if t.requires:
-                for required_task in t.requires:
-                    index_task = self.id_to_idx[t.id_]
-                    index_required_task = self.id_to_idx[required_task.id_]
-                    matrix[index_required_task][index_task] = 1
-        matrix = self.transitive_reduction(matrix)
-        return matrix
-
-    def transitive_reduction(self, graph):
-        size = len(graph)
-        for j in range(size):
-            for i in range(size):
-                if graph[i][j]:
-                    for k in range(size):
-                        if graph[j][k]:
-                            graph[i][k] = 0
-        return graph
+        return AdjacencyMatrix(self.reduced_successors)
 
-    def get_first_tasks(self):
-        first_tasks_ids = []
-        for task_id in self.ids:
-            column = self._get_column_of_graph_matrix(task_id)
-            if all(e == 0 for e in column):
-                first_tasks_ids.append(task_id)
+    def topological_order(self):
+        """Task indices in topological order (Kahn's algorithm, ties in index order).
+
+        Raises
+        ------
+        ValueError
+            If the dependencies of the tasks contain a cycle
+        """
+        successors = self.successors
+        in_degrees = [len(p) for p in self.predecessors]
+        order = [idx for idx, in_degree in enumerate(in_degrees) if not in_degree]
+        for idx in order:
+            for successor in successors[idx]:
+                in_degrees[successor] -= 1
+                if not in_degrees[successor]:
+                    order.append(successor)
+        if len(order) != len(successors):
+            raise ValueError('The dependencies of the tasks in your decider_spec contain a cycle')
+        return order
 
-        first_tasks = []
-        for task_id in first_tasks_ids:
-            first_tasks.append(self.tasks_by_id[task_id])
-        return first_tasks
+    def transitive_reduction(self, successors):
+        """Transitive reduction of a DAG given by adjacency lists.
+
+        The vertices are visited in reverse topological order. The descendants of each vertex
+        are kept as a bitset (int) until all its predecessors are visited. An edge u -> v is
+        kept if v is not a descendant of a successor of u which precedes v in the topological
+        order. The cost is O(E * V / word size) in the worst case and close to O(E) for graphs
+        whose descendant sets are small.
+
+        Returns
+        -------
+        list: sorted lists of the successors in the reduced graph
+        """
+        order = self.topological_order()
+        position = [0] * len(successors)
+        for p, idx in enumerate(order):
+            position[idx] = p
+
+        remaining_predecessors = [len(p) for p in self.predecessors]
+        descendants = {}
+        reduced = [[] for _ in successors]
+        for u in reversed(order):
+            reachable = 0
+            kept = []
+            for v in sorted(successors[u], key=position.__getitem__):
+                if not reachable >> v & 1:
+                    kept.append(v)
+                    reachable |= descendants[v] | (1 << v)
+            reduced[u] = sorted(kept)
+
+            if remaining_predecessors[u]:
+                descendants[u] = reachable
+            for v in successors[u]:
+                remaining_predecessors[v] -= 1
+                if not remaining_predecessors[v]:
+                    del descendants[v]
+        return reduced
+
+    def get_first_tasks(self):
+        """Tasks which do not require other tasks."""
+        if self._first_tasks is None:
+            self._first_tasks = [self.task_by_idx(idx)
+                                 for idx, p in enumerate(self.predecessors) if not p]
+        return list(self._first_tasks)
 
     def get_depending_tasks(self, id_):
+        """Tasks which depend on <id_> in the transitively reduced graph."""
         completed_activity_idx = self.id_to_idx[id_]
-        tasks_indices = [idx for idx, val in enumerate(self.graph[completed_activity_idx]) if val]
-        tasks_ids = [self.idx_to_id[idx] for idx in tasks_indices]
-        tasks = [self.tasks_by_id[id_] for id_ in tasks_ids]
-        return tasks
+        return [self.task_by_idx(idx) for idx in self.reduced_successors[completed_activity_idx]]
+
+    def has_depending_tasks(self, id_):
+        """True if any task requires <id_>. Does not need the reduced graph."""
+        return bool(self.successors[self.id_to_idx[id_]])
 
     def get_dependencies(self, id_):
         activity_task = self.tasks_by_id[id_]
@@ -118,11 +251,10 @@ class ExecutionGraph:
         list: str
              Activity ids
         """
-        outgoing = []
-        for idx, row in enumerate(self.graph):
-            if all(e == 0 for e in row):
-                outgoing.append(self.task_by_idx(idx))
-        return outgoing
+        if self._outgoing_vertices is None:
+            self._outgoing_vertices = [self.task_by_idx(idx)
+                                       for idx, s in enumerate(self.successors) if not s]
+        return list(self._outgoing_vertices)
 
     def _get_column_of_graph_matrix(self, task_id):
         idx = self.id_to_idx[task_id]
@@ -0,0 +1,119 @@
+import json
+
+
+class GraphMetadata:
+    """Topological metadata of an ExecutionGraph, computed once in O(V + E):
+
+    - order: task ids in topological order
+    - levels: task id -> length of the longest chain of required tasks (first tasks: 0)
+    - level_widths: number of tasks per level. The tasks of a level do not depend on each other,
+      hence max_width is the maximal number of tasks which can run in parallel level by level
+    - heights: task id -> number of tasks on the longest path starting at the task. Tasks with a
+      larger height should be scheduled first
+    - longest_path: task ids of the longest path by task count
+    - critical_path: task ids of the longest path weighted by the estimated durations of the
+      tasks (ActivityTask.estimated_duration, Timer.delay_in_seconds), None if no task has a
+      duration. Tasks without duration count as 0.
+
+    Usage:
+    -----
+    metadata = floto.decider.ExecutionGraph(activity_tasks=spec.activity_tasks).metadata
+    workers = metadata.max_width
+    print(metadata.to_json())
+    """
+
+    def __init__(self, execution_graph):
+        """
+        Parameters
+        ----------
+        execution_graph: floto.decider.ExecutionGraph
+        """
+        graph = execution_graph
+        order = graph.topological_order()
+        ids = graph.ids
+        self.order = [ids[idx] for idx in order]
+        self.number_edges = sum(len(s) for s in graph.successors)
+
+        levels = [0] * len(order)
+        longest_predecessor = [None] * len(order)
+        for idx in order:
+            for p in graph.predecessors[idx]:
+                if levels[p] + 1 > levels[idx]:
+                    levels[idx] = levels[p] + 1
+                    longest_predecessor[idx] = p
+        self.levels = {ids[idx]: level for idx, level in enumerate(levels)}
+
+        self.level_widths = [0] * (max(levels) + 1 if levels else 0)
+        for level in levels:
+            self.level_widths[level] += 1
+        self.max_width = max(self.level_widths) if self.level_widths else 0
+
+        heights = [1] * len(order)
+        for idx in reversed(order):
+            for s in graph.successors[idx]:
+                heights[idx] = max(heights[idx], heights[s] + 1)
+        self.heights = {ids[idx]: height for idx, height in enumerate(heights)}
+
+        last = max(range(len(order)), key=levels.__getitem__) if order else None
+        self.longest_path = self._path_to(last, longest_predecessor, ids)
+
+        self.critical_path = None
+        self.critical_path_duration = None
+        self.earliest_finish = None
+        durations = [self._duration(graph.task_by_idx(idx)) for idx in range(len(order))]
+        if any(d is not None for d in durations):
+            durations = [d or 0 for d in durations]
+            finish = [0] * len(order)
+            critical_predecessor = [None] * len(order)
+            for idx in order:
+                start = 0
+                for p in graph.predecessors[idx]:
+                    if critical_predecessor[idx] is None or finish[p] > start:
+                        start, critical_predecessor[idx] = finish[p], p
+                finish[idx] = start + durations[idx]
+            last = max(range(len(order)), key=finish.__getitem__)
+            self.critical_path = self._path_to(last, critical_predecessor, ids)
+            self.critical_path_duration = finish[last]
+            self.earliest_finish = {ids[idx]: f for idx, f in enumerate(finish)}
+
+    @property
+    def longest_path_length(self):
+        return len(self.longest_path)
+
+    def level(self, task_id):
+        return self.levels[task_id]
+
+    def priority(self, task_id):
+        """Scheduling priority of <task_id>: its height."""
+        return self.heights[task_id]
+
+    def to_dict(self):
+        return {'number_tasks': len(self.order),
+                'number_edges': self.number_edges,
+                'order': self.order,
+                'levels': self.levels,
+                'level_widths': self.level_widths,
+                'max_width': self.max_width,
+                'heights': self.heights,
+                'longest_path': self.longest_path,
+                'critical_path': self.critical_path,
+                'critical_path_duration': self.critical_path_duration,
+                'earliest_finish': self.earliest_finish}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @staticmethod
+    def _duration(task):
+        duration = getattr(task, 'estimated_duration', None)
+        if duration is None:
+            duration = getattr(task, 'delay_in_seconds', None)
+        return duration
+
+    @staticmethod
+    def _path_to(idx, predecessor, ids):
+        path = []
+        while idx is not None:
+            path.append(ids[idx])
+            idx = predecessor[idx]
+        return list(reversed(path))
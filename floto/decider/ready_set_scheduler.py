@@ -0,0 +1,80 @@
+class ReadySetScheduler:
+    """Keeps the number of uncompleted dependencies of each task of an ExecutionGraph. Completed
+    tasks decrement the counters of the tasks which require them; tasks whose counter drops to
+    zero enter the ready set. Hence finding the tasks to be scheduled after a completion costs
+    O(number of depending tasks) instead of re-checking all dependencies in the history.
+    """
+
+    def __init__(self, execution_graph):
+        """
+        Parameters
+        ----------
+        execution_graph: floto.decider.ExecutionGraph
+        """
+        self.execution_graph = execution_graph
+        # The DecisionTaskStarted event id of the last decision applied to the counters
+        self.decision_id = None
+        # Ids of the tasks whose dependencies have completed, but which have not been recorded as
+        # completed yet
+        self.ready = set()
+
+        self._dependents = {}
+        self._remaining = {}
+        self._completed = set()
+
+    def build(self, is_task_completed):
+        """(Re)builds the counters. Only the tasks which other tasks depend on are looked up: the
+        completion of the remaining tasks does not change any counter.
+
+        Parameters
+        ----------
+        is_task_completed: callable
+            is_task_completed(task) returns True if <task> has completed, e.g.
+            floto.History.is_task_completed
+        """
+        self._dependents = {}
+        self._remaining = {}
+        self._completed = set()
+        tasks = self.execution_graph.tasks_by_id.values()
+        for task in tasks:
+            self._dependents.setdefault(task.id_, [])
+            dependencies = set(t.id_ for t in task.requires or [])
+            self._remaining[task.id_] = len(dependencies)
+            for dependency in dependencies:
+                self._dependents.setdefault(dependency, []).append(task.id_)
+
+        for task in tasks:
+            if self._dependents[task.id_] and is_task_completed(task):
+                self._mark_completed(task.id_)
+        self.ready = set(id_ for id_, remaining in self._remaining.items()
+                         if not remaining and id_ not in self._completed)
+
+    def complete(self, task_id):
+        """Records the completion of <task_id>.
+
+        Returns
+        -------
+        list: floto.specs.Task
+            The tasks which depend on <task_id> and whose dependencies have all completed
+        """
+        if task_id not in self._dependents:
+            raise KeyError(task_id)
+        if task_id not in self._completed:
+            self._mark_completed(task_id)
+        tasks_by_id = self.execution_graph.tasks_by_id
+        return [tasks_by_id[d] for d in self._dependents[task_id] if not self._remaining[d]]
+
+    def is_completed(self, task_id):
+        return task_id in self._completed
+
+    def remaining_dependencies(self, task_id):
+        """Number of dependencies of <task_id> which have not completed yet."""
+        return self._remaining[task_id]
+
+    def _mark_completed(self, task_id):
+        self._completed.add(task_id)
+        self.ready.discard(task_id)
+        for dependent in self._dependents[task_id]:
+            self._remaining[dependent] -= 1
+            if not self._remaining[dependent] and dependent not in self._completed:
+                self.ready.add(dependent)
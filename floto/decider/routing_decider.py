@@ -0,0 +1,162 @@
+import copy
+import logging
+
+import floto
+import floto.specs
+from floto.decider import Base
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingDecider(Base):
+    """Decider for many decider specs on one task list. The decision tasks are routed by their
+    workflow id, by the workflow type of their execution, or by the spec id in the workflow input,
+    to the Decider of the registered spec. The Deciders of the specs keep their DecisionBuilders and
+    ExecutionGraphs and share the SWF client of the RoutingDecider.
+
+    Routing order:
+    1. Workflow id. Routes by workflow id are removed when the workflow execution terminates.
+    2. <spec_id_key> of the workflow input (if specs are registered by spec id)
+    3. Workflow type name and version
+    4. Workflow type name
+
+    Decision tasks without matching spec are not responded to: they time out and are
+    rescheduled, e.g. to a decider which knows the spec.
+
+    Usage:
+    -----
+    decider = floto.decider.RoutingDecider(domain='d', task_list='shared_tl')
+    decider.register(nightly_spec, workflow_type_name='nightly', workflow_type_version='v1')
+    decider.register(adhoc_spec, spec_id='adhoc')
+    decider.run()
+    """
+
+    def __init__(self, domain=None, task_list=None, swf=None, spec_cache=None, **kwargs):
+        """
+        Parameters
+        ----------
+        domain: str
+        task_list: str
+            The shared task list of the registered specs
+        swf: floto.api.Swf
+            The SWF client, if swf is None an instance is created
+        spec_cache: floto.decider.DeciderSpecCache
+            If given, specs registered as JSON are taken from the cache
+        kwargs:
+            Passed to floto.decider.Base, e.g. history_cache
+        """
+        super().__init__(swf=swf, **kwargs)
+        self.domain = domain
+        self.task_list = task_list
+        self.spec_cache = spec_cache
+        # Key in the workflow input which holds the spec id
+        self.spec_id_key = 'decider_spec_id'
+
+        self._deciders_by_workflow_id = {}
+        self._deciders_by_workflow_type = {}
+        self._deciders_by_spec_id = {}
+        self._routed_decider = None
+
+    def register(self, decider_spec, workflow_type_name=None, workflow_type_version=None,
+                 spec_id=None, workflow_id=None):
+        """Registers <decider_spec> for the workflow type <workflow_type_name> (all versions if
+        <workflow_type_version> is None), for <spec_id> and/or for the workflow execution
+        <workflow_id>.
+
+        Parameters
+        ----------
+        decider_spec: str (JSON) or floto.specs.DeciderSpec
+            The domain and task list of the spec are replaced by those of the RoutingDecider
+
+        Returns
+        -------
+        floto.decider.Decider: The decider of the spec
+        """
+        if not (workflow_type_name or spec_id or workflow_id):
+            raise ValueError('Specs must be registered by workflow type name, spec id or '
+                             'workflow id')
+
+        if isinstance(decider_spec, str):
+            if self.spec_cache is not None:
+                decider_spec = self.spec_cache.get(decider_spec)
+            else:
+                decider_spec = floto.specs.DeciderSpec.from_json(decider_spec)
+        # The copy shares the activity tasks and hence the cached execution graph
+        decider_spec = copy.copy(decider_spec)
+        decider_spec.domain = self.domain
+        decider_spec.task_list = self.task_list
+        decider = floto.decider.Decider(decider_spec=decider_spec, spec_cache=self.spec_cache,
+                                        swf=self.swf)
+
+        if workflow_type_name:
+            self._deciders_by_workflow_type[(workflow_type_name, workflow_type_version)] = decider
+        if spec_id:
+            self._deciders_by_spec_id[spec_id] = decider
+        if workflow_id:
+            self._deciders_by_workflow_id[workflow_id] = decider
+        return decider
+
+    def unregister(self, workflow_id):
+        """Removes the route of <workflow_id>."""
+        self._deciders_by_workflow_id.pop(workflow_id, None)
+
+    @property
+    def number_workflow_id_routes(self):
+        return len(self._deciders_by_workflow_id)
+
+    def get_decider(self, response, history):
+        """The Decider of the decision task <response>, None if no spec matches."""
+        workflow_id = response.get('workflowExecution', {}).get('workflowId')
+        if workflow_id in self._deciders_by_workflow_id:
+            return self._deciders_by_workflow_id[workflow_id]
+
+        if self._deciders_by_spec_id:
+            workflow_input = history.get_workflow_input()
+            if isinstance(workflow_input, dict):
+                spec_id = workflow_input.get(self.spec_id_key)
+                if spec_id in self._deciders_by_spec_id:
+                    return self._deciders_by_spec_id[spec_id]
+
+        workflow_type = response.get('workflowType', {})
+        name, version = workflow_type.get('name'), workflow_type.get('version')
+        decider = self._deciders_by_workflow_type.get((name, version))
+        return decider or self._deciders_by_workflow_type.get((name, None))
+
+    def copy_for_decision_task(self):
+        decider = super().copy_for_decision_task()
+        decider._routed_decider = None
+        return decider
+
+    def get_decisions(self):
+        self._routed_decider = None
+        decider = self.get_decider(self.last_response, self.history)
+        if not decider:
+            workflow_type = self.last_response.get('workflowType')
+            logger.warning('No decider spec for run {} of workflow type {}'.format(self.run_id,
+                                                                                   workflow_type))
+            return
+
+        routed = decider.copy_for_decision_task()
+        routed.task_token = self.task_token
+        routed.last_response = self.last_response
+        routed.history = self.history
+        routed.run_id = self.run_id
+        routed.workflow_id = self.workflow_id
+        routed.get_decisions()
+
+        self.decisions = routed.decisions
+        self.terminate_workflow = routed.terminate_workflow
+        self._routed_decider = routed
+
+    def complete(self):
+        if self._routed_decider is None:
+            self.decisions = []
+            return
+        super().complete()
+
+    def tear_down(self):
+        """Tear down of the routed decider, e.g. restart of repeated workflows. The
+        RoutingDecider itself keeps running."""
+        self._routed_decider.tear_down()
+        if self._routed_decider.terminate_decider:
+            self.unregister(self.workflow_id)
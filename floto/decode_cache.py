@@ -0,0 +1,54 @@
+import collections
+
+import floto.specs
+
+
+class DecodeCache:
+    """Keeps the decoded JSON payloads of history events (activity results, workflow input) by
+    event id, so that each payload is parsed at most once. Least recently used entries are evicted
+    if the total length of the cached payload strings exceeds <max_bytes>.
+
+    The cached objects are shared between all callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        """
+        Parameters
+        ----------
+        max_bytes: int
+            Maximal total length of the payload strings whose decoded values are cached
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def decode(self, event_id, payload):
+        """The decoded <payload> of the event with <event_id>, see
+        floto.specs.JSONEncoder.load_string."""
+        if event_id in self._entries:
+            self._entries.move_to_end(event_id)
+            self.hits += 1
+            return self._entries[event_id][1]
+
+        self.misses += 1
+        value = floto.specs.JSONEncoder.load_string(payload)
+        size = len(payload) if isinstance(payload, str) else 0
+        if size <= self.max_bytes:
+            self._entries[event_id] = (size, value)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def __contains__(self, event_id):
+        return event_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,9 +1,55 @@
+import asyncio
+import importlib
+import inspect
+
 ACTIVITY_FUNCTIONS = {}
+# Function id -> executor of the activity in a floto.ConcurrentActivityWorker
+ACTIVITY_EXECUTORS = {}
+
+EXECUTORS = ('thread', 'process')
+
+
+def activity(name, version, executor='thread'):
+    """Registers an activity function.
 
+    Parameters
+    ----------
+    name: str
+    version: str
+    executor: str
+        'thread' for I/O-bound activities, 'process' for CPU-bound activities. Only used by
+        floto.ConcurrentActivityWorker. Activities can also be coroutine functions (async def),
+        which floto.AsyncioActivityWorker runs on its event loop.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError('Unknown executor {}, use one of {}'.format(executor, EXECUTORS))
 
-def activity(name, version):
     def function_wrapper(func):
         identifier = '{}:{}'.format(name, version)
         ACTIVITY_FUNCTIONS[identifier] = func
+        ACTIVITY_EXECUTORS[identifier] = executor
 
     return function_wrapper
+
+
+def run_activity(function_id, context, module=None):
+    """Runs the registered activity <function_id> with <context> if the activity has a context
+    parameter. Coroutine functions (async def) are run to completion on a new event loop.
+
+    If the activity is not registered in the process (e.g. a process of a process pool which has
+    not been forked), <module> is imported to register it.
+    """
+    if function_id not in ACTIVITY_FUNCTIONS and module:
+        importlib.import_module(module)
+    activity_function = ACTIVITY_FUNCTIONS[function_id]
+    if 'context' in inspect.signature(activity_function).parameters:
+        result = activity_function(context=context)
+    else:
+        result = activity_function()
+    if inspect.isawaitable(result):
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(result)
+        finally:
+            loop.close()
+    return result
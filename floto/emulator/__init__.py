@@ -0,0 +1,4 @@
+from .clock import Clock
+from .swf_emulator import SwfEmulator
+from .swf_emulator_server import SwfEmulatorServer, SwfEmulatorManager, SwfEmulatorProxy
+from .emulator_client_factory import EmulatorClientFactory
@@ -0,0 +1,45 @@
+import datetime as dt
+import time
+
+
+class Clock:
+    """Time of a floto.emulator.SwfEmulator: event timestamps, timers and timeouts follow this
+    clock. A real-time clock follows the system time, shifted by the seconds it has been advanced.
+    A manual clock stands still until it is advanced, hence timers and timeouts fire exactly when
+    the clock is advanced past them.
+
+    Usage:
+    -----
+    emulator = floto.emulator.SwfEmulator(clock=floto.emulator.Clock(manual=True))
+    ...
+    emulator.advance_clock(3600)
+    """
+
+    def __init__(self, manual=False, start=None):
+        """
+        Parameters
+        ----------
+        manual: bool
+            If True the clock only moves on advance()
+        start: datetime.datetime
+            Time of the clock when it is created. Defaults to the system time.
+        """
+        self.manual = manual
+        start_time = start.timestamp() if start else time.time()
+        self._time = start_time
+        self._offset = start_time - time.time()
+
+    def time(self):
+        """Seconds since the epoch."""
+        if self.manual:
+            return self._time
+        return time.time() + self._offset
+
+    def now(self):
+        return dt.datetime.fromtimestamp(self.time(), dt.timezone.utc)
+
+    def advance(self, seconds):
+        if seconds < 0:
+            raise ValueError('The clock can not be turned back')
+        self._time += seconds
+        self._offset += seconds
@@ -0,0 +1,57 @@
+import os
+import threading
+
+import floto.emulator
+
+
+class EmulatorClientFactory:
+    """Stands in for floto.api.ClientFactory: floto.api.Swf objects get a SwfEmulator instead of
+    boto3 clients. The emulator is either given or served by a floto.emulator.SwfEmulatorServer
+    at <address>. In the latter case, each process connects to the server on its first call.
+
+    Usage:
+    -----
+    factory = floto.emulator.EmulatorClientFactory(emulator=floto.emulator.SwfEmulator())
+    floto.api.ClientFactory.set_default(factory)
+    # or for a single Swf object:
+    swf = floto.api.Swf(client_factory=factory)
+    """
+
+    def __init__(self, emulator=None, address=None, authkey=None):
+        """
+        Parameters
+        ----------
+        emulator: floto.emulator.SwfEmulator
+            The emulator of this process
+        address: tuple
+            The address of a floto.emulator.SwfEmulatorServer
+        authkey: bytes
+            The authkey of the server
+        """
+        if (emulator is None) == (address is None):
+            raise ValueError('EmulatorClientFactory needs either an emulator or an address')
+        self.emulator = emulator
+        self.address = address
+        self.authkey = authkey
+
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._proxy = None
+
+    def client(self, region_name=None, profile_name=None, long_poll=False):
+        """The emulator or its proxy. Region, profile and long_poll are ignored: the proxy opens
+        a connection per thread."""
+        if self.emulator is not None:
+            return self.emulator
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._proxy = None
+            self._pid = os.getpid()
+        if self._proxy is None:
+            with self._lock:
+                if self._proxy is None:
+                    manager = floto.emulator.SwfEmulatorManager(address=self.address,
+                                                                authkey=self.authkey)
+                    manager.connect()
+                    self._proxy = manager.get_emulator()
+        return self._proxy
@@ -0,0 +1,1259 @@
+import base64
+import collections
+import copy
+import heapq
+import itertools
+import json
+import threading
+import time
+import uuid
+
+import botocore.exceptions
+
+import floto.emulator
+
+
+class SwfEmulator:
+    """In-memory stand-in for the boto3 SWF client. It implements the calls floto makes: domains,
+    registration of workflow and activity types, start, signal, cancel, terminate and describe of
+    workflow executions, paginated histories, polling and responding of decision and activity
+    tasks, heartbeats, timers, child workflow executions and the timeouts of SWF.
+
+    Polls block for up to <poll_timeout> seconds like the long polls of SWF. Timers and timeouts
+    follow <clock>, see floto.emulator.Clock. Payloads exceeding the limits of SWF are rejected
+    with a ValidationException, executions exceeding <MAX_HISTORY_EVENTS> events are terminated.
+    Errors are raised as botocore.exceptions.ClientError with the error codes of SWF.
+
+    The emulator is thread-safe. To share it between processes, serve it with a
+    floto.emulator.SwfEmulatorServer. The events returned by histories and polls are shared with
+    the emulator and must not be changed.
+
+    Usage:
+    -----
+    emulator = floto.emulator.SwfEmulator()
+    floto.api.ClientFactory.set_default(floto.emulator.EmulatorClientFactory(emulator=emulator))
+    floto.api.Swf().domains.register_domain('d')
+    """
+
+    # Maximal lengths of the payload and id fields of requests and decisions
+    PAYLOAD_LIMITS = {'input': 32768,
+                      'result': 32768,
+                      'details': 32768,
+                      'control': 32768,
+                      'executionContext': 32768,
+                      'reason': 256,
+                      'identity': 256,
+                      'workflowId': 256,
+                      'activityId': 256,
+                      'timerId': 256,
+                      'signalName': 256,
+                      'markerName': 256}
+    MAX_PAGE_SIZE = 1000
+    MAX_HISTORY_EVENTS = 25000
+    MAX_OPEN_ACTIVITY_TASKS = 1000
+    MAX_OPEN_TIMERS = 1000
+    MAX_OPEN_CHILD_WORKFLOW_EXECUTIONS = 1000
+
+    # (parameter, default of the workflow type, cause if neither is given)
+    EXECUTION_DEFAULTS = (
+        ('taskList', 'defaultTaskList', 'DEFAULT_TASK_LIST_UNDEFINED'),
+        ('executionStartToCloseTimeout', 'defaultExecutionStartToCloseTimeout',
+         'DEFAULT_EXECUTION_START_TO_CLOSE_TIMEOUT_UNDEFINED'),
+        ('taskStartToCloseTimeout', 'defaultTaskStartToCloseTimeout',
+         'DEFAULT_TASK_START_TO_CLOSE_TIMEOUT_UNDEFINED'),
+        ('childPolicy', 'defaultChildPolicy', 'DEFAULT_CHILD_POLICY_UNDEFINED'),
+        ('taskPriority', 'defaultTaskPriority', None),
+        ('lambdaRole', 'defaultLambdaRole', None))
+
+    # (parameter, default of the activity type, cause if neither is given)
+    ACTIVITY_TASK_DEFAULTS = (
+        ('taskList', 'defaultTaskList', 'DEFAULT_TASK_LIST_UNDEFINED'),
+        ('scheduleToStartTimeout', 'defaultTaskScheduleToStartTimeout',
+         'DEFAULT_SCHEDULE_TO_START_TIMEOUT_UNDEFINED'),
+        ('scheduleToCloseTimeout', 'defaultTaskScheduleToCloseTimeout',
+         'DEFAULT_SCHEDULE_TO_CLOSE_TIMEOUT_UNDEFINED'),
+        ('startToCloseTimeout', 'defaultTaskStartToCloseTimeout',
+         'DEFAULT_START_TO_CLOSE_TIMEOUT_UNDEFINED'),
+        ('heartbeatTimeout', 'defaultTaskHeartbeatTimeout', None),
+        ('taskPriority', 'defaultTaskPriority', None))
+
+    START_FAULTS = {'WORKFLOW_TYPE_DOES_NOT_EXIST': 'UnknownResourceFault',
+                    'WORKFLOW_TYPE_DEPRECATED': 'TypeDeprecatedFault',
+                    'WORKFLOW_ALREADY_RUNNING': 'WorkflowExecutionAlreadyStartedFault'}
+
+    CHILD_CLOSED_EVENT_TYPES = {'COMPLETED': 'ChildWorkflowExecutionCompleted',
+                                'FAILED': 'ChildWorkflowExecutionFailed',
+                                'CANCELED': 'ChildWorkflowExecutionCanceled',
+                                'TERMINATED': 'ChildWorkflowExecutionTerminated',
+                                'TIMED_OUT': 'ChildWorkflowExecutionTimedOut'}
+
+    DECISION_HANDLERS = {'ScheduleActivityTask': '_decide_schedule_activity_task',
+                         'RequestCancelActivityTask': '_decide_request_cancel_activity_task',
+                         'StartTimer': '_decide_start_timer',
+                         'CancelTimer': '_decide_cancel_timer',
+                         'RecordMarker': '_decide_record_marker',
+                         'StartChildWorkflowExecution': '_decide_start_child_workflow_execution',
+                         'CompleteWorkflowExecution': '_decide_complete_workflow_execution',
+                         'FailWorkflowExecution': '_decide_fail_workflow_execution',
+                         'CancelWorkflowExecution': '_decide_cancel_workflow_execution'}
+
+    PAGINATED_OPERATIONS = ('list_domains', 'get_workflow_execution_history',
+                            'poll_for_decision_task')
+
+    def __init__(self, clock=None, poll_timeout=60):
+        """
+        Parameters
+        ----------
+        clock: floto.emulator.Clock
+            Defaults to a real-time clock
+        poll_timeout: float
+            Seconds (of the system time) a poll waits for a task
+        """
+        self.clock = clock or floto.emulator.Clock()
+        self.poll_timeout = poll_timeout
+
+        self._condition = threading.Condition()
+        # name -> {'domainInfo': ..., 'configuration': ...}
+        self._domains = {}
+        # ('workflow'|'activity', domain, name, version) -> {'typeInfo': ..., 'configuration': ...}
+        self._types = {}
+        self._executions = {}
+        # (domain, workflow_id) -> run_id of the open execution
+        self._open_run_ids = {}
+        # (domain, task_list) -> run ids with scheduled decision tasks
+        self._decision_queues = collections.defaultdict(collections.deque)
+        # (domain, task_list) -> scheduled _ActivityTasks
+        self._activity_queues = collections.defaultdict(collections.deque)
+        self._decision_tokens = {}
+        self._activity_tokens = {}
+        # Heap of (time, sequence number, callback, args)
+        self._deadlines = []
+        self._sequence = itertools.count()
+
+    #############################################################################################
+    #### Domains and types                                                                  ###
+    #############################################################################################
+
+    def register_domain(self, name=None, workflowExecutionRetentionPeriodInDays=None,
+                        description=None):
+        operation = 'RegisterDomain'
+        with self._condition:
+            if name in self._domains:
+                raise self._client_error(operation, 'DomainAlreadyExistsFault',
+                                         'Domain already exists: {}'.format(name))
+            self._domains[name] = {
+                'domainInfo': self._attributes(name=name, status='REGISTERED',
+                                               description=description),
+                'configuration': {'workflowExecutionRetentionPeriodInDays':
+                                  workflowExecutionRetentionPeriodInDays}}
+            return {}
+
+    def deprecate_domain(self, name=None):
+        operation = 'DeprecateDomain'
+        with self._condition:
+            domain = self._get_domain(operation, name)
+            if domain['domainInfo']['status'] == 'DEPRECATED':
+                raise self._client_error(operation, 'DomainDeprecatedFault',
+                                         'Domain is deprecated: {}'.format(name))
+            domain['domainInfo']['status'] = 'DEPRECATED'
+            return {}
+
+    def describe_domain(self, name=None):
+        with self._condition:
+            return copy.deepcopy(self._get_domain('DescribeDomain', name))
+
+    def list_domains(self, registrationStatus=None, nextPageToken=None, maximumPageSize=None,
+                     reverseOrder=False):
+        operation = 'ListDomains'
+        with self._condition:
+            self._check_page_size(operation, maximumPageSize)
+            names = sorted((n for n, d in self._domains.items()
+                            if d['domainInfo']['status'] == registrationStatus),
+                           reverse=bool(reverseOrder))
+            start = self._decode_page_token(operation, nextPageToken)['index'] \
+                if nextPageToken else 0
+            end = start + (maximumPageSize or self.MAX_PAGE_SIZE)
+            page = {'domainInfos': [dict(self._domains[n]['domainInfo'])
+                                    for n in names[start:end]]}
+            if end < len(names):
+                page['nextPageToken'] = self._encode_page_token({'index': end})
+            return page
+
+    def register_workflow_type(self, domain=None, name=None, version=None, description=None,
+                               defaultTaskStartToCloseTimeout=None,
+                               defaultExecutionStartToCloseTimeout=None, defaultTaskList=None,
+                               defaultTaskPriority=None, defaultChildPolicy=None,
+                               defaultLambdaRole=None):
+        configuration = self._attributes(
+            defaultTaskStartToCloseTimeout=defaultTaskStartToCloseTimeout,
+            defaultExecutionStartToCloseTimeout=defaultExecutionStartToCloseTimeout,
+            defaultTaskList=defaultTaskList,
+            defaultTaskPriority=defaultTaskPriority,
+            defaultChildPolicy=defaultChildPolicy,
+            defaultLambdaRole=defaultLambdaRole)
+        return self._register_type('RegisterWorkflowType', 'workflow', domain, name, version,
+                                   description, configuration)
+
+    def register_activity_type(self, domain=None, name=None, version=None, description=None,
+                               defaultTaskStartToCloseTimeout=None,
+                               defaultTaskHeartbeatTimeout=None, defaultTaskList=None,
+                               defaultTaskPriority=None, defaultTaskScheduleToStartTimeout=None,
+                               defaultTaskScheduleToCloseTimeout=None):
+        configuration = self._attributes(
+            defaultTaskStartToCloseTimeout=defaultTaskStartToCloseTimeout,
+            defaultTaskHeartbeatTimeout=defaultTaskHeartbeatTimeout,
+            defaultTaskList=defaultTaskList,
+            defaultTaskPriority=defaultTaskPriority,
+            defaultTaskScheduleToStartTimeout=defaultTaskScheduleToStartTimeout,
+            defaultTaskScheduleToCloseTimeout=defaultTaskScheduleToCloseTimeout)
+        return self._register_type('RegisterActivityType', 'activity', domain, name, version,
+                                   description, configuration)
+
+    def deprecate_workflow_type(self, domain=None, workflowType=None):
+        return self._deprecate_type('DeprecateWorkflowType', 'workflow', domain, workflowType)
+
+    def deprecate_activity_type(self, domain=None, activityType=None):
+        return self._deprecate_type('DeprecateActivityType', 'activity', domain, activityType)
+
+    def describe_workflow_type(self, domain=None, workflowType=None):
+        with self._condition:
+            return copy.deepcopy(self._get_type('DescribeWorkflowType', 'workflow', domain,
+                                                workflowType))
+
+    def describe_activity_type(self, domain=None, activityType=None):
+        with self._condition:
+            return copy.deepcopy(self._get_type('DescribeActivityType', 'activity', domain,
+                                                activityType))
+
+    #############################################################################################
+    #### Workflow executions                                                                ###
+    #############################################################################################
+
+    def start_workflow_execution(self, domain=None, workflowId=None, workflowType=None,
+                                 taskList=None, taskPriority=None, input=None,
+                                 executionStartToCloseTimeout=None, tagList=None,
+                                 taskStartToCloseTimeout=None, childPolicy=None,
+                                 lambdaRole=None):
+        operation = 'StartWorkflowExecution'
+        with self._condition:
+            self._process_deadlines()
+            self._get_domain(operation, domain, registered=True)
+            self._validate_payload(operation, {'workflowId': workflowId, 'input': input})
+            parameters = {'taskList': taskList,
+                          'taskPriority': taskPriority,
+                          'executionStartToCloseTimeout': executionStartToCloseTimeout,
+                          'taskStartToCloseTimeout': taskStartToCloseTimeout,
+                          'childPolicy': childPolicy,
+                          'lambdaRole': lambdaRole}
+            configuration, cause = self._resolve_execution_configuration(domain, workflowId,
+                                                                         workflowType, parameters)
+            if cause:
+                raise self._client_error(operation,
+                                         self.START_FAULTS.get(cause, 'DefaultUndefinedFault'),
+                                         '{}: {}'.format(cause, workflowId))
+            execution = self._start_execution(domain, workflowId, workflowType, configuration,
+                                              input, tagList)
+            return {'runId': execution.run_id}
+
+    def signal_workflow_execution(self, domain=None, workflowId=None, signalName=None,
+                                  runId=None, input=None):
+        operation = 'SignalWorkflowExecution'
+        with self._condition:
+            self._process_deadlines()
+            self._validate_payload(operation, {'signalName': signalName, 'input': input})
+            execution = self._get_open_execution(operation, domain, workflowId, runId)
+            self._add_event(execution, 'WorkflowExecutionSignaled',
+                            self._attributes(signalName=signalName, input=input))
+            self._schedule_decision_task(execution)
+            return {}
+
+    def request_cancel_workflow_execution(self, domain=None, workflowId=None, runId=None):
+        operation = 'RequestCancelWorkflowExecution'
+        with self._condition:
+            self._process_deadlines()
+            execution = self._get_open_execution(operation, domain, workflowId, runId)
+            self._request_cancel(execution)
+            return {}
+
+    def terminate_workflow_execution(self, domain=None, workflowId=None, runId=None,
+                                     reason=None, details=None, childPolicy=None):
+        operation = 'TerminateWorkflowExecution'
+        with self._condition:
+            self._process_deadlines()
+            self._validate_payload(operation, {'reason': reason, 'details': details})
+            execution = self._get_open_execution(operation, domain, workflowId, runId)
+            attributes = self._attributes(
+                reason=reason, details=details, cause='OPERATOR_INITIATED',
+                childPolicy=childPolicy or execution.configuration['childPolicy'])
+            self._close_execution(execution, 'TERMINATED', 'WorkflowExecutionTerminated',
+                                  attributes)
+            return {}
+
+    def describe_workflow_execution(self, domain=None, execution=None):
+        with self._condition:
+            self._process_deadlines()
+            e = self._get_execution('DescribeWorkflowExecution', domain, execution)
+            parent = e.parent.execution_dict() if e.parent else None
+            info = self._attributes(execution=e.execution_dict(),
+                                    workflowType=dict(e.workflow_type),
+                                    startTimestamp=e.events[0]['eventTimestamp'],
+                                    closeTimestamp=e.close_timestamp,
+                                    executionStatus='OPEN' if e.is_open else 'CLOSED',
+                                    closeStatus=e.close_status,
+                                    parent=parent,
+                                    tagList=e.tag_list,
+                                    cancelRequested=e.cancel_requested)
+            open_decision_tasks = int(e.decision_scheduled_event_id is not None or
+                                      e.decision_started_event_id is not None)
+            open_counts = {'openActivityTasks': len(e.open_activity_tasks),
+                           'openDecisionTasks': open_decision_tasks,
+                           'openTimers': len(e.open_timers),
+                           'openChildWorkflowExecutions': len(e.open_child_executions),
+                           'openLambdaFunctions': 0}
+            return self._attributes(executionInfo=info,
+                                    executionConfiguration=copy.deepcopy(e.configuration),
+                                    openCounts=open_counts,
+                                    latestActivityTaskTimestamp=e.latest_activity_task_timestamp,
+                                    latestExecutionContext=e.latest_execution_context)
+
+    def get_workflow_execution_history(self, domain=None, execution=None, nextPageToken=None,
+                                       maximumPageSize=None, reverseOrder=False):
+        operation = 'GetWorkflowExecutionHistory'
+        with self._condition:
+            self._process_deadlines()
+            self._check_page_size(operation, maximumPageSize)
+            e = self._get_execution(operation, domain, execution)
+            if nextPageToken:
+                page = self._decode_page_token(operation, nextPageToken)
+            else:
+                page = {'run_id': e.run_id,
+                        'last_event_id': len(e.events),
+                        'reverse': bool(reverseOrder)}
+            return self._get_page(e, page, maximumPageSize)
+
+    def count_open_workflow_executions(self, domain=None, startTimeFilter=None, typeFilter=None,
+                                       tagFilter=None, executionFilter=None):
+        with self._condition:
+            self._process_deadlines()
+            self._get_domain('CountOpenWorkflowExecutions', domain)
+            count = sum(1 for run_id in self._open_run_ids.values()
+                        if self._matches(self._executions[run_id], domain, startTimeFilter,
+                                         typeFilter, tagFilter, executionFilter))
+            return {'count': count, 'truncated': False}
+
+    def count_closed_workflow_executions(self, domain=None, startTimeFilter=None,
+                                         closeTimeFilter=None, executionFilter=None,
+                                         closeStatusFilter=None, typeFilter=None,
+                                         tagFilter=None):
+        with self._condition:
+            self._process_deadlines()
+            self._get_domain('CountClosedWorkflowExecutions', domain)
+            status = (closeStatusFilter or {}).get('status')
+            count = sum(1 for e in self._executions.values()
+                        if not e.is_open and (not status or e.close_status == status) and
+                        self._in_time_range(e.close_timestamp, closeTimeFilter) and
+                        self._matches(e, domain, startTimeFilter, typeFilter, tagFilter,
+                                      executionFilter))
+            return {'count': count, 'truncated': False}
+
+    #############################################################################################
+    #### Decision tasks                                                                     ###
+    #############################################################################################
+
+    def poll_for_decision_task(self, domain=None, taskList=None, identity=None,
+                               nextPageToken=None, maximumPageSize=None, reverseOrder=False):
+        operation = 'PollForDecisionTask'
+        with self._condition:
+            self._get_domain(operation, domain)
+            self._check_page_size(operation, maximumPageSize)
+            self._validate_payload(operation, {'identity': identity})
+            if nextPageToken:
+                page = self._decode_page_token(operation, nextPageToken)
+                return self._decision_task_response(self._executions[page['run_id']], page,
+                                                     maximumPageSize)
+
+            key = (domain, taskList['name'])
+            execution = self._wait_for(lambda: self._next_decision_task(key))
+            if execution is None:
+                return {'startedEventId': 0, 'previousStartedEventId': 0}
+            page = {'run_id': execution.run_id,
+                    'task_token': self._start_decision_task(execution, identity),
+                    'last_event_id': execution.decision_started_event_id,
+                    'previous_started_event_id': execution.previous_started_event_id,
+                    'reverse': bool(reverseOrder)}
+            return self._decision_task_response(execution, page, maximumPageSize)
+
+    def respond_decision_task_completed(self, taskToken=None, decisions=None,
+                                        executionContext=None):
+        operation = 'RespondDecisionTaskCompleted'
+        with self._condition:
+            self._process_deadlines()
+            decisions = decisions or []
+            self._validate_payload(operation, {'executionContext': executionContext})
+            for i, decision in enumerate(decisions, 1):
+                self._validate_decision(operation, i, decision)
+            run_id = self._decision_tokens.pop(taskToken, None)
+            if run_id is None:
+                raise self._client_error(operation, 'UnknownResourceFault',
+                                         'Unknown decision task token')
+
+            execution = self._executions[run_id]
+            started_event_id = execution.decision_started_event_id
+            scheduled_event_id = execution.events[started_event_id - 1][
+                'decisionTaskStartedEventAttributes']['scheduledEventId']
+            completed_event_id = self._add_event(
+                execution, 'DecisionTaskCompleted',
+                self._attributes(scheduledEventId=scheduled_event_id,
+                                 startedEventId=started_event_id,
+                                 executionContext=executionContext))
+            execution.decision_token = None
+            execution.previous_started_event_id = started_event_id
+            if executionContext is not None:
+                execution.latest_execution_context = executionContext
+
+            # Events which arrived while the decision task was started have not been seen by the
+            # decider: the workflow execution can not be closed by this decision task
+            unhandled = execution.decision_pending
+            for decision in decisions:
+                if not execution.is_open:
+                    break
+                decision_type = decision['decisionType']
+                attributes = decision.get(self._attributes_key(decision_type, 'DecisionAttributes'),
+                                          {})
+                handler = getattr(self, self.DECISION_HANDLERS[decision_type])
+                handler(execution, attributes, completed_event_id, unhandled)
+
+            # Decisions which need a new decision task (e.g. failed decisions) only set
+            # decision_pending while the decision task is started
+            execution.decision_started_event_id = None
+            if execution.decision_pending:
+                execution.decision_pending = False
+                self._schedule_decision_task(execution)
+            return {}
+
+    #############################################################################################
+    #### Activity tasks                                                                     ###
+    #############################################################################################
+
+    def poll_for_activity_task(self, domain=None, taskList=None, identity=None):
+        operation = 'PollForActivityTask'
+        with self._condition:
+            self._get_domain(operation, domain)
+            self._validate_payload(operation, {'identity': identity})
+            key = (domain, taskList['name'])
+            task = self._wait_for(lambda: self._next_activity_task(key))
+            if task is None:
+                return {'startedEventId': 0}
+
+            execution = task.execution
+            task.started_event_id = self._add_event(
+                execution, 'ActivityTaskStarted',
+                self._attributes(scheduledEventId=task.scheduled_event_id, identity=identity))
+            task.token = self._new_token()
+            self._activity_tokens[task.token] = task
+            self._add_deadline(task.timeouts.get('startToCloseTimeout'),
+                               self._time_out_activity_task, task, 'START_TO_CLOSE', task.token)
+            self._add_deadline(task.timeouts.get('heartbeatTimeout'),
+                               self._time_out_activity_task, task, 'HEARTBEAT', 0)
+            return self._attributes(taskToken=task.token,
+                                    activityId=task.activity_id,
+                                    startedEventId=task.started_event_id,
+                                    workflowExecution=execution.execution_dict(),
+                                    activityType=dict(task.activity_type),
+                                    input=task.input)
+
+    def record_activity_task_heartbeat(self, taskToken=None, details=None):
+        operation = 'RecordActivityTaskHeartbeat'
+        with self._condition:
+            self._process_deadlines()
+            self._validate_payload(operation, {'details': details})
+            task = self._get_started_activity_task(operation, taskToken)
+            if details is not None:
+                task.heartbeat_details = details
+            task.heartbeats += 1
+            self._add_deadline(task.timeouts.get('heartbeatTimeout'),
+                               self._time_out_activity_task, task, 'HEARTBEAT', task.heartbeats)
+            return {'cancelRequested': task.cancel_requested_event_id is not None}
+
+    def respond_activity_task_completed(self, taskToken=None, result=None):
+        operation = 'RespondActivityTaskCompleted'
+        with self._condition:
+            self._process_deadlines()
+            self._validate_payload(operation, {'result': result})
+            task = self._get_started_activity_task(operation, taskToken)
+            self._close_activity_task(task, 'ActivityTaskCompleted',
+                                      self._attributes(result=result))
+            return {}
+
+    def respond_activity_task_failed(self, taskToken=None, reason=None, details=None):
+        operation = 'RespondActivityTaskFailed'
+        with self._condition:
+            self._process_deadlines()
+            self._validate_payload(operation, {'reason': reason, 'details': details})
+            task = self._get_started_activity_task(operation, taskToken)
+            self._close_activity_task(task, 'ActivityTaskFailed',
+                                      self._attributes(reason=reason, details=details))
+            return {}
+
+    def respond_activity_task_canceled(self, taskToken=None, details=None):
+        operation = 'RespondActivityTaskCanceled'
+        with self._condition:
+            self._process_deadlines()
+            self._validate_payload(operation, {'details': details})
+            task = self._get_started_activity_task(operation, taskToken)
+            attributes = self._attributes(
+                details=details, latestCancelRequestedEventId=task.cancel_requested_event_id)
+            self._close_activity_task(task, 'ActivityTaskCanceled', attributes)
+            return {}
+
+    #############################################################################################
+    #### Pending tasks, clock and pagination                                                ###
+    #############################################################################################
+
+    def count_pending_decision_tasks(self, domain=None, taskList=None):
+        with self._condition:
+            self._process_deadlines()
+            queue = self._decision_queues.get((domain, taskList['name']), ())
+            count = sum(1 for run_id in queue
+                        if self._is_decision_task_scheduled(self._executions[run_id]))
+            return {'count': count, 'truncated': False}
+
+    def count_pending_activity_tasks(self, domain=None, taskList=None):
+        with self._condition:
+            self._process_deadlines()
+            queue = self._activity_queues.get((domain, taskList['name']), ())
+            count = sum(1 for task in queue if task.is_open and task.started_event_id is None)
+            return {'count': count, 'truncated': False}
+
+    def now(self):
+        """The current time of the emulator's clock."""
+        with self._condition:
+            return self.clock.now()
+
+    def advance_clock(self, seconds):
+        """Advances the clock by <seconds> and fires the timers and timeouts which are due."""
+        with self._condition:
+            self.clock.advance(seconds)
+            self._process_deadlines()
+            self._condition.notify_all()
+
+    def get_paginator(self, operation_name):
+        return Paginator(self, operation_name)
+
+    #############################################################################################
+    #### Private: domains, types and payloads                                               ###
+    #############################################################################################
+
+    @staticmethod
+    def _client_error(operation, code, message):
+        return botocore.exceptions.ClientError({'Error': {'Code': code, 'Message': message}},
+                                               operation)
+
+    @staticmethod
+    def _attributes(**attributes):
+        """<attributes> without the ones which are None"""
+        return {k: v for k, v in attributes.items() if v is not None}
+
+    @staticmethod
+    def _attributes_key(type_, suffix):
+        return type_[:1].lower() + type_[1:] + suffix
+
+    @staticmethod
+    def _seconds(timeout):
+        """Seconds of the SWF duration <timeout>, None if the duration is unlimited"""
+        if timeout is None or timeout == 'NONE':
+            return None
+        return int(timeout)
+
+    def _get_domain(self, operation, name, registered=False):
+        domain = self._domains.get(name)
+        if domain is None:
+            raise self._client_error(operation, 'UnknownResourceFault',
+                                     'Unknown domain: {}'.format(name))
+        if registered and domain['domainInfo']['status'] != 'REGISTERED':
+            raise self._client_error(operation, 'DomainDeprecatedFault',
+                                     'Domain is deprecated: {}'.format(name))
+        return domain
+
+    def _register_type(self, operation, kind, domain, name, version, description,
+                       configuration):
+        with self._condition:
+            self._get_domain(operation, domain, registered=True)
+            key = (kind, domain, name, version)
+            if key in self._types:
+                raise self._client_error(operation, 'TypeAlreadyExistsFault',
+                                         'Type already exists: {}, {}'.format(name, version))
+            type_info = self._attributes(status='REGISTERED', description=description,
+                                         creationDate=self.clock.now())
+            type_info[kind + 'Type'] = {'name': name, 'version': version}
+            self._types[key] = {'typeInfo': type_info, 'configuration': configuration}
+            return {}
+
+    def _deprecate_type(self, operation, kind, domain, swf_type):
+        with self._condition:
+            registered = self._get_type(operation, kind, domain, swf_type)
+            if registered['typeInfo']['status'] == 'DEPRECATED':
+                raise self._client_error(operation, 'TypeDeprecatedFault',
+                                         'Type is deprecated: {}'.format(swf_type))
+            registered['typeInfo']['status'] = 'DEPRECATED'
+            registered['typeInfo']['deprecationDate'] = self.clock.now()
+            return {}
+
+    def _get_type(self, operation, kind, domain, swf_type):
+        self._get_domain(operation, domain)
+        swf_type = swf_type or {}
+        registered = self._types.get((kind, domain, swf_type.get('name'),
+                                      swf_type.get('version')))
+        if registered is None:
+            raise self._client_error(operation, 'UnknownResourceFault',
+                                     'Unknown type: {}'.format(swf_type))
+        return registered
+
+    def _validate_payload(self, operation, fields, prefix=''):
+        for key, value in fields.items():
+            limit = self.PAYLOAD_LIMITS.get(key)
+            if limit and isinstance(value, str) and len(value) > limit:
+                message = ("1 validation error detected: Value at '{}{}' failed to satisfy "
+                           "constraint: Member must have length less than or equal to "
+                           "{}").format(prefix, key, limit)
+                raise self._client_error(operation, 'ValidationException', message)
+
+    def _validate_decision(self, operation, index, decision):
+        decision_type = decision.get('decisionType')
+        if decision_type not in self.DECISION_HANDLERS:
+            raise self._client_error(operation, 'ValidationException',
+                                     'Unsupported decision type: {}'.format(decision_type))
+        attributes_key = self._attributes_key(decision_type, 'DecisionAttributes')
+        prefix = 'decisions.{}.member.{}.'.format(index, attributes_key)
+        self._validate_payload(operation, decision.get(attributes_key, {}), prefix)
+
+    def _check_page_size(self, operation, page_size):
+        if page_size and page_size > self.MAX_PAGE_SIZE:
+            message = ("1 validation error detected: Value at 'maximumPageSize' failed to "
+                       "satisfy constraint: Member must have value less than or equal to "
+                       "{}").format(self.MAX_PAGE_SIZE)
+            raise self._client_error(operation, 'ValidationException', message)
+
+    @staticmethod
+    def _encode_page_token(page):
+        return base64.urlsafe_b64encode(json.dumps(page).encode('utf-8')).decode('ascii')
+
+    def _decode_page_token(self, operation, token):
+        try:
+            return json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+        except (ValueError, TypeError, AttributeError):
+            raise self._client_error(operation, 'ValidationException',
+                                     'Invalid nextPageToken: {}'.format(token))
+
+    #############################################################################################
+    #### Private: executions, histories and deadlines                                       ###
+    #############################################################################################
+
+    def _new_token(self):
+        return uuid.uuid4().hex + uuid.uuid4().hex
+
+    def _add_event(self, execution, event_type, attributes):
+        event_id = len(execution.events) + 1
+        execution.events.append({'eventId': event_id,
+                                 'eventTimestamp': self.clock.now(),
+                                 'eventType': event_type,
+                                 self._attributes_key(event_type, 'EventAttributes'): attributes})
+        if execution.is_open and event_id >= self.MAX_HISTORY_EVENTS:
+            attributes = {'childPolicy': execution.configuration['childPolicy'],
+                          'cause': 'EVENT_LIMIT_EXCEEDED'}
+            self._close_execution(execution, 'TERMINATED', 'WorkflowExecutionTerminated',
+                                  attributes)
+        return event_id
+
+    def _get_page(self, execution, page, page_size):
+        """The events of <page> (see _encode_page_token) and the token of the next page."""
+        page_size = page_size or self.MAX_PAGE_SIZE
+        last_event_id = page['last_event_id']
+        if page['reverse']:
+            start = page.get('next_event_id') or last_event_id
+            low = max(0, start - page_size)
+            events = execution.events[low:start][::-1]
+            next_event_id = low
+        else:
+            start = page.get('next_event_id') or 1
+            high = min(last_event_id, start - 1 + page_size)
+            events = execution.events[start - 1:high]
+            next_event_id = high + 1 if high < last_event_id else None
+
+        response = {'events': events}
+        if next_event_id:
+            response['nextPageToken'] = self._encode_page_token(
+                dict(page, next_event_id=next_event_id))
+        return response
+
+    def _get_execution(self, operation, domain, execution_dict):
+        execution_dict = execution_dict or {}
+        execution = self._executions.get(execution_dict.get('runId'))
+        if (execution is None or execution.domain != domain or
+                execution.workflow_id != execution_dict.get('workflowId')):
+            raise self._client_error(operation, 'UnknownResourceFault',
+                                     'Unknown execution: {}'.format(execution_dict))
+        return execution
+
+    def _get_open_execution(self, operation, domain, workflow_id, run_id=None):
+        open_run_id = self._open_run_ids.get((domain, workflow_id))
+        if open_run_id is None or (run_id and run_id != open_run_id):
+            raise self._client_error(operation, 'UnknownResourceFault',
+                                     'Unknown execution: workflowId={}, runId={}'.format(
+                                         workflow_id, run_id))
+        return self._executions[open_run_id]
+
+    def _resolve_execution_configuration(self, domain, workflow_id, workflow_type, parameters):
+        """The execution configuration from <parameters> and the defaults of <workflow_type>.
+
+        Returns
+        -------
+        tuple: (configuration, None) or (None, cause) if the execution can not be started
+        """
+        workflow_type = workflow_type or {}
+        registered = self._types.get(('workflow', domain, workflow_type.get('name'),
+                                      workflow_type.get('version')))
+        if registered is None:
+            return None, 'WORKFLOW_TYPE_DOES_NOT_EXIST'
+        if registered['typeInfo']['status'] != 'REGISTERED':
+            return None, 'WORKFLOW_TYPE_DEPRECATED'
+        if (domain, workflow_id) in self._open_run_ids:
+            return None, 'WORKFLOW_ALREADY_RUNNING'
+
+        configuration = {}
+        for key, default, cause in self.EXECUTION_DEFAULTS:
+            value = parameters.get(key) or registered['configuration'].get(default)
+            if value is None and cause:
+                return None, cause
+            if value is not None:
+                configuration[key] = value
+        return configuration, None
+
+    def _start_execution(self, domain, workflow_id, workflow_type, configuration, input=None,
+                         tag_list=None, parent=None, parent_initiated_event_id=None):
+        execution = _WorkflowExecution(domain, workflow_id, uuid.uuid4().hex,
+                                       dict(workflow_type), configuration, tag_list, parent)
+        self._executions[execution.run_id] = execution
+        self._open_run_ids[(domain, workflow_id)] = execution.run_id
+
+        attributes = dict(configuration, workflowType=dict(workflow_type), input=input,
+                          tagList=tag_list, parentInitiatedEventId=parent_initiated_event_id,
+                          parentWorkflowExecution=parent.execution_dict() if parent else None)
+        self._add_event(execution, 'WorkflowExecutionStarted', self._attributes(**attributes))
+        self._add_deadline(self._seconds(configuration['executionStartToCloseTimeout']),
+                           self._time_out_execution, execution)
+        self._schedule_decision_task(execution)
+        return execution
+
+    def _close_execution(self, execution, close_status, event_type, attributes):
+        execution.is_open = False
+        execution.close_status = close_status
+        self._add_event(execution, event_type, attributes)
+        execution.close_timestamp = execution.events[-1]['eventTimestamp']
+        self._open_run_ids.pop((execution.domain, execution.workflow_id), None)
+
+        for task in execution.open_activity_tasks.values():
+            task.is_open = False
+            self._activity_tokens.pop(task.token, None)
+        execution.open_activity_tasks.clear()
+        execution.open_timers.clear()
+        self._decision_tokens.pop(execution.decision_token, None)
+        execution.decision_token = None
+        execution.decision_scheduled_event_id = None
+        execution.decision_started_event_id = None
+
+        child_policy = attributes.get('childPolicy') or execution.configuration['childPolicy']
+        for run_id in list(execution.open_child_executions):
+            child = self._executions[run_id]
+            if not child.is_open:
+                continue
+            if child_policy == 'TERMINATE':
+                child_attributes = {'childPolicy': child.configuration['childPolicy'],
+                                    'cause': 'CHILD_POLICY_APPLIED'}
+                self._close_execution(child, 'TERMINATED', 'WorkflowExecutionTerminated',
+                                      child_attributes)
+            elif child_policy == 'REQUEST_CANCEL':
+                self._request_cancel(child)
+        execution.open_child_executions.clear()
+
+        parent = execution.parent
+        if parent and parent.is_open and execution.run_id in parent.open_child_executions:
+            parent_attributes = {k: v for k, v in attributes.items()
+                                 if k in ('result', 'reason', 'details', 'timeoutType')}
+            parent_attributes.update(
+                workflowExecution=execution.execution_dict(),
+                workflowType=dict(execution.workflow_type),
+                initiatedEventId=parent.open_child_executions.pop(execution.run_id),
+                startedEventId=execution.parent_started_event_id)
+            self._add_event(parent, self.CHILD_CLOSED_EVENT_TYPES[close_status],
+                            parent_attributes)
+            self._schedule_decision_task(parent)
+
+    def _request_cancel(self, execution):
+        if execution.cancel_requested:
+            return
+        execution.cancel_requested = True
+        self._add_event(execution, 'WorkflowExecutionCancelRequested', {})
+        self._schedule_decision_task(execution)
+
+    @staticmethod
+    def _timestamp(value):
+        return value.timestamp() if hasattr(value, 'timestamp') else value
+
+    def _in_time_range(self, timestamp, time_filter):
+        if not time_filter:
+            return True
+        if timestamp is None:
+            return False
+        seconds = timestamp.timestamp()
+        oldest = time_filter.get('oldestDate')
+        latest = time_filter.get('latestDate')
+        return ((oldest is None or seconds >= self._timestamp(oldest)) and
+                (latest is None or seconds <= self._timestamp(latest)))
+
+    def _matches(self, execution, domain, start_time_filter, type_filter, tag_filter,
+                 execution_filter):
+        if execution.domain != domain:
+            return False
+        if not self._in_time_range(execution.events[0]['eventTimestamp'], start_time_filter):
+            return False
+        if type_filter and (execution.workflow_type['name'] != type_filter.get('name') or
+                            type_filter.get('version') not in (None,
+                                                               execution.workflow_type['version'])):
+            return False
+        if tag_filter and tag_filter.get('tag') not in (execution.tag_list or []):
+            return False
+        if execution_filter and execution.workflow_id != execution_filter.get('workflowId'):
+            return False
+        return True
+
+    def _add_deadline(self, seconds, callback, *args):
+        """Calls <callback>(*<args>) when the clock has advanced by <seconds>. Callbacks must
+        check whether they are still due."""
+        if seconds is None:
+            return
+        heapq.heappush(self._deadlines, (self.clock.time() + seconds, next(self._sequence),
+                                         callback, args))
+        # Pollers wait until the next deadline
+        self._condition.notify_all()
+
+    def _process_deadlines(self):
+        now = self.clock.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, callback, args = heapq.heappop(self._deadlines)
+            callback(*args)
+
+    def _wait_for(self, find):
+        """The first result of <find>() which is not None, waiting up to <poll_timeout> seconds.
+        Deadlines which are due meanwhile are processed."""
+        end = time.monotonic() + self.poll_timeout
+        while True:
+            self._process_deadlines()
+            item = find()
+            if item is not None:
+                return item
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return None
+            if self._deadlines and not self.clock.manual:
+                remaining = min(remaining, max(self._deadlines[0][0] - self.clock.time(), 0.001))
+            self._condition.wait(remaining)
+
+    def _time_out_execution(self, execution):
+        if execution.is_open:
+            attributes = {'timeoutType': 'START_TO_CLOSE',
+                          'childPolicy': execution.configuration['childPolicy']}
+            self._close_execution(execution, 'TIMED_OUT', 'WorkflowExecutionTimedOut',
+                                  attributes)
+
+    #############################################################################################
+    #### Private: decision tasks                                                            ###
+    #############################################################################################
+
+    @staticmethod
+    def _is_decision_task_scheduled(execution):
+        return (execution.is_open and execution.decision_scheduled_event_id is not None and
+                execution.decision_started_event_id is None)
+
+    def _schedule_decision_task(self, execution):
+        """Schedules a decision task for new events. If a decision task is started, the next
+        decision task is scheduled when it is completed or timed out."""
+        if not execution.is_open or execution.decision_scheduled_event_id is not None:
+            return
+        if execution.decision_started_event_id is not None:
+            execution.decision_pending = True
+            return
+        execution.decision_scheduled_event_id = self._add_event(
+            execution, 'DecisionTaskScheduled',
+            self._attributes(taskList=dict(execution.configuration['taskList']),
+                             startToCloseTimeout=execution.configuration[
+                                 'taskStartToCloseTimeout'],
+                             taskPriority=execution.configuration.get('taskPriority')))
+        if execution.is_open:
+            self._decision_queues[(execution.domain,
+                                   execution.configuration['taskList']['name'])].append(
+                execution.run_id)
+            self._condition.notify_all()
+
+    def _next_decision_task(self, key):
+        queue = self._decision_queues.get(key)
+        while queue:
+            execution = self._executions[queue.popleft()]
+            if self._is_decision_task_scheduled(execution):
+                return execution
+        return None
+
+    def _start_decision_task(self, execution, identity):
+        execution.decision_started_event_id = self._add_event(
+            execution, 'DecisionTaskStarted',
+            self._attributes(scheduledEventId=execution.decision_scheduled_event_id,
+                             identity=identity))
+        execution.decision_scheduled_event_id = None
+        execution.decision_pending = False
+        token = self._new_token()
+        execution.decision_token = token
+        self._decision_tokens[token] = execution.run_id
+        self._add_deadline(self._seconds(execution.configuration['taskStartToCloseTimeout']),
+                           self._time_out_decision_task, execution, token)
+        return token
+
+    def _decision_task_response(self, execution, page, page_size):
+        response = self._get_page(execution, page, page_size)
+        response.update(taskToken=page['task_token'],
+                        startedEventId=page['last_event_id'],
+                        previousStartedEventId=page['previous_started_event_id'],
+                        workflowExecution=execution.execution_dict(),
+                        workflowType=dict(execution.workflow_type))
+        return response
+
+    def _time_out_decision_task(self, execution, token):
+        if execution.decision_token != token:
+            return
+        started_event_id = execution.decision_started_event_id
+        scheduled_event_id = execution.events[started_event_id - 1][
+            'decisionTaskStartedEventAttributes']['scheduledEventId']
+        self._decision_tokens.pop(token, None)
+        execution.decision_token = None
+        execution.decision_started_event_id = None
+        execution.decision_pending = False
+        self._add_event(execution, 'DecisionTaskTimedOut',
+                        {'timeoutType': 'START_TO_CLOSE',
+                         'scheduledEventId': scheduled_event_id,
+                         'startedEventId': started_event_id})
+        self._schedule_decision_task(execution)
+
+    def _decision_failed(self, execution, event_type, attributes):
+        """Records the failure of a decision, which is handled by the next decision task."""
+        self._add_event(execution, event_type, attributes)
+        self._schedule_decision_task(execution)
+
+    def _decide_schedule_activity_task(self, execution, attributes, completed_event_id,
+                                       unhandled):
+        activity_type = attributes.get('activityType', {})
+        activity_id = attributes.get('activityId')
+        registered = self._types.get(('activity', execution.domain, activity_type.get('name'),
+                                      activity_type.get('version')))
+        cause = None
+        if registered is None:
+            cause = 'ACTIVITY_TYPE_DOES_NOT_EXIST'
+        elif registered['typeInfo']['status'] != 'REGISTERED':
+            cause = 'ACTIVITY_TYPE_DEPRECATED'
+        elif activity_id in execution.open_activity_tasks:
+            cause = 'ACTIVITY_ID_ALREADY_IN_USE'
+        elif len(execution.open_activity_tasks) >= self.MAX_OPEN_ACTIVITY_TASKS:
+            cause = 'OPEN_ACTIVITIES_LIMIT_EXCEEDED'
+
+        parameters = {}
+        if not cause:
+            for key, default, undefined_cause in self.ACTIVITY_TASK_DEFAULTS:
+                value = attributes.get(key) or registered['configuration'].get(default)
+                if value is None and undefined_cause:
+                    cause = undefined_cause
+                    break
+                parameters[key] = value
+        if cause:
+            self._decision_failed(execution, 'ScheduleActivityTaskFailed',
+                                  {'activityType': dict(activity_type),
+                                   'activityId': activity_id,
+                                   'cause': cause,
+                                   'decisionTaskCompletedEventId': completed_event_id})
+            return
+
+        scheduled_event_id = self._add_event(
+            execution, 'ActivityTaskScheduled',
+            self._attributes(activityType=dict(activity_type), activityId=activity_id,
+                             input=attributes.get('input'), control=attributes.get('control'),
+                             decisionTaskCompletedEventId=completed_event_id, **parameters))
+        timeouts = {key: self._seconds(parameters[key])
+                    for key in ('scheduleToStartTimeout', 'scheduleToCloseTimeout',
+                                'startToCloseTimeout', 'heartbeatTimeout')}
+        task = _ActivityTask(execution, activity_id, dict(activity_type), attributes.get('input'),
+                             timeouts, scheduled_event_id)
+        execution.open_activity_tasks[activity_id] = task
+        execution.latest_activity_task_timestamp = execution.events[-1]['eventTimestamp']
+        self._activity_queues[(execution.domain, parameters['taskList']['name'])].append(task)
+        self._add_deadline(timeouts['scheduleToStartTimeout'], self._time_out_activity_task,
+                           task, 'SCHEDULE_TO_START', None)
+        self._add_deadline(timeouts['scheduleToCloseTimeout'], self._time_out_activity_task,
+                           task, 'SCHEDULE_TO_CLOSE', None)
+        self._condition.notify_all()
+
+    def _decide_request_cancel_activity_task(self, execution, attributes, completed_event_id,
+                                             unhandled):
+        activity_id = attributes.get('activityId')
+        task = execution.open_activity_tasks.get(activity_id)
+        if task is None:
+            self._decision_failed(execution, 'RequestCancelActivityTaskFailed',
+                                  {'activityId': activity_id,
+                                   'cause': 'ACTIVITY_ID_UNKNOWN',
+                                   'decisionTaskCompletedEventId': completed_event_id})
+            return
+        task.cancel_requested_event_id = self._add_event(
+            execution, 'ActivityTaskCancelRequested',
+            {'activityId': activity_id, 'decisionTaskCompletedEventId': completed_event_id})
+        if task.started_event_id is None:
+            # Activity tasks which have not been started are canceled at once
+            self._close_activity_task(task, 'ActivityTaskCanceled',
+                                      {'latestCancelRequestedEventId':
+                                       task.cancel_requested_event_id})
+
+    def _decide_start_timer(self, execution, attributes, completed_event_id, unhandled):
+        timer_id = attributes.get('timerId')
+        cause = None
+        if timer_id in execution.open_timers:
+            cause = 'TIMER_ID_ALREADY_IN_USE'
+        elif len(execution.open_timers) >= self.MAX_OPEN_TIMERS:
+            cause = 'OPEN_TIMERS_LIMIT_EXCEEDED'
+        if cause:
+            self._decision_failed(execution, 'StartTimerFailed',
+                                  {'timerId': timer_id,
+                                   'cause': cause,
+                                   'decisionTaskCompletedEventId': completed_event_id})
+            return
+
+        started_event_id = self._add_event(
+            execution, 'TimerStarted',
+            self._attributes(timerId=timer_id, control=attributes.get('control'),
+                             startToFireTimeout=attributes.get('startToFireTimeout'),
+                             decisionTaskCompletedEventId=completed_event_id))
+        execution.open_timers[timer_id] = started_event_id
+        self._add_deadline(self._seconds(attributes.get('startToFireTimeout')), self._fire_timer,
+                           execution, timer_id, started_event_id)
+
+    def _decide_cancel_timer(self, execution, attributes, completed_event_id, unhandled):
+        timer_id = attributes.get('timerId')
+        if timer_id not in execution.open_timers:
+            self._decision_failed(execution, 'CancelTimerFailed',
+                                  {'timerId': timer_id,
+                                   'cause': 'TIMER_ID_UNKNOWN',
+                                   'decisionTaskCompletedEventId': completed_event_id})
+            return
+        self._add_event(execution, 'TimerCanceled',
+                        {'timerId': timer_id,
+                         'startedEventId': execution.open_timers.pop(timer_id),
+                         'decisionTaskCompletedEventId': completed_event_id})
+
+    def _decide_record_marker(self, execution, attributes, completed_event_id, unhandled):
+        self._add_event(execution, 'MarkerRecorded',
+                        self._attributes(markerName=attributes.get('markerName'),
+                                         details=attributes.get('details'),
+                                         decisionTaskCompletedEventId=completed_event_id))
+
+    def _decide_start_child_workflow_execution(self, execution, attributes, completed_event_id,
+                                               unhandled):
+        workflow_id = attributes.get('workflowId')
+        workflow_type = attributes.get('workflowType', {})
+        initiated_event_id = self._add_event(
+            execution, 'StartChildWorkflowExecutionInitiated',
+            dict(attributes, decisionTaskCompletedEventId=completed_event_id))
+
+        if len(execution.open_child_executions) >= self.MAX_OPEN_CHILD_WORKFLOW_EXECUTIONS:
+            configuration, cause = None, 'OPEN_CHILDREN_LIMIT_EXCEEDED'
+        else:
+            configuration, cause = self._resolve_execution_configuration(
+                execution.domain, workflow_id, workflow_type, attributes)
+        if cause:
+            self._decision_failed(execution, 'StartChildWorkflowExecutionFailed',
+                                  self._attributes(
+                                      workflowType=dict(workflow_type), workflowId=workflow_id,
+                                      cause=cause, initiatedEventId=initiated_event_id,
+                                      control=attributes.get('control'),
+                                      decisionTaskCompletedEventId=completed_event_id))
+            return
+
+        child = self._start_execution(execution.domain, workflow_id, workflow_type,
+                                      configuration, attributes.get('input'),
+                                      attributes.get('tagList'), parent=execution,
+                                      parent_initiated_event_id=initiated_event_id)
+        execution.open_child_executions[child.run_id] = initiated_event_id
+        child.parent_started_event_id = self._add_event(
+            execution, 'ChildWorkflowExecutionStarted',
+            {'workflowExecution': child.execution_dict(),
+             'workflowType': dict(workflow_type),
+             'initiatedEventId': initiated_event_id})
+        self._schedule_decision_task(execution)
+
+    def _close_by_decision(self, execution, close_status, event_type, failed_event_type,
+                           attributes, completed_event_id, unhandled):
+        if unhandled:
+            self._decision_failed(execution, failed_event_type,
+                                  {'cause': 'UNHANDLED_DECISION',
+                                   'decisionTaskCompletedEventId': completed_event_id})
+            return
+        attributes = dict(attributes, decisionTaskCompletedEventId=completed_event_id)
+        self._close_execution(execution, close_status, event_type, attributes)
+
+    def _decide_complete_workflow_execution(self, execution, attributes, completed_event_id,
+                                            unhandled):
+        self._close_by_decision(execution, 'COMPLETED', 'WorkflowExecutionCompleted',
+                                'CompleteWorkflowExecutionFailed',
+                                self._attributes(result=attributes.get('result')),
+                                completed_event_id, unhandled)
+
+    def _decide_fail_workflow_execution(self, execution, attributes, completed_event_id,
+                                        unhandled):
+        self._close_by_decision(execution, 'FAILED', 'WorkflowExecutionFailed',
+                                'FailWorkflowExecutionFailed',
+                                self._attributes(reason=attributes.get('reason'),
+                                                 details=attributes.get('details')),
+                                completed_event_id, unhandled)
+
+    def _decide_cancel_workflow_execution(self, execution, attributes, completed_event_id,
+                                          unhandled):
+        self._close_by_decision(execution, 'CANCELED', 'WorkflowExecutionCanceled',
+                                'CancelWorkflowExecutionFailed',
+                                self._attributes(details=attributes.get('details')),
+                                completed_event_id, unhandled)
+
+    #############################################################################################
+    #### Private: activity tasks and timers                                                 ###
+    #############################################################################################
+
+    def _next_activity_task(self, key):
+        queue = self._activity_queues.get(key)
+        while queue:
+            task = queue.popleft()
+            if task.is_open and task.started_event_id is None:
+                return task
+        return None
+
+    def _get_started_activity_task(self, operation, token):
+        task = self._activity_tokens.get(token)
+        if task is None or not task.is_open:
+            raise self._client_error(operation, 'UnknownResourceFault',
+                                     'Unknown activity task token')
+        return task
+
+    def _close_activity_task(self, task, event_type, attributes):
+        task.is_open = False
+        self._activity_tokens.pop(task.token, None)
+        execution = task.execution
+        execution.open_activity_tasks.pop(task.activity_id, None)
+        attributes = dict(attributes, scheduledEventId=task.scheduled_event_id)
+        if task.started_event_id is not None:
+            attributes['startedEventId'] = task.started_event_id
+        self._add_event(execution, event_type, attributes)
+        self._schedule_decision_task(execution)
+
+    def _time_out_activity_task(self, task, timeout_type, marker):
+        """Times out <task> unless it has been started, closed or sent a heartbeat since the
+        deadline was set. <marker> is the task token (START_TO_CLOSE) or the number of
+        heartbeats (HEARTBEAT)."""
+        if not task.is_open:
+            return
+        if timeout_type == 'SCHEDULE_TO_START' and task.started_event_id is not None:
+            return
+        if timeout_type == 'START_TO_CLOSE' and task.token != marker:
+            return
+        if timeout_type == 'HEARTBEAT' and task.heartbeats != marker:
+            return
+        self._close_activity_task(task, 'ActivityTaskTimedOut',
+                                  self._attributes(timeoutType=timeout_type,
+                                                   details=task.heartbeat_details))
+
+    def _fire_timer(self, execution, timer_id, started_event_id):
+        if not execution.is_open or execution.open_timers.get(timer_id) != started_event_id:
+            return
+        del execution.open_timers[timer_id]
+        self._add_event(execution, 'TimerFired',
+                        {'timerId': timer_id, 'startedEventId': started_event_id})
+        self._schedule_decision_task(execution)
+
+
+class Paginator:
+    """Paginator of the paginated operations of a SwfEmulator (or of its proxy), used like the
+    paginators of boto3 clients."""
+
+    def __init__(self, client, operation_name):
+        if operation_name not in SwfEmulator.PAGINATED_OPERATIONS:
+            raise botocore.exceptions.OperationNotPageableError(operation_name=operation_name)
+        self.client = client
+        self.operation_name = operation_name
+
+    def paginate(self, **kwargs):
+        config = kwargs.pop('PaginationConfig', {})
+        if config.get('PageSize'):
+            kwargs['maximumPageSize'] = config['PageSize']
+        operation = getattr(self.client, self.operation_name)
+        while True:
+            page = operation(**kwargs)
+            yield page
+            if not page.get('nextPageToken'):
+                return
+            kwargs['nextPageToken'] = page['nextPageToken']
+
+
+class _WorkflowExecution:
+    def __init__(self, domain, workflow_id, run_id, workflow_type, configuration, tag_list,
+                 parent):
+        self.domain = domain
+        self.workflow_id = workflow_id
+        self.run_id = run_id
+        self.workflow_type = workflow_type
+        self.configuration = configuration
+        self.tag_list = tag_list
+        self.parent = parent
+        self.parent_started_event_id = None
+
+        self.events = []
+        self.is_open = True
+        self.close_status = None
+        self.close_timestamp = None
+        self.cancel_requested = False
+        self.latest_execution_context = None
+        self.latest_activity_task_timestamp = None
+
+        self.decision_scheduled_event_id = None
+        self.decision_started_event_id = None
+        self.decision_token = None
+        # True if events arrived while a decision task was started
+        self.decision_pending = False
+        self.previous_started_event_id = 0
+
+        self.open_activity_tasks = {}
+        # timer id -> event id of TimerStarted
+        self.open_timers = {}
+        # run id -> event id of StartChildWorkflowExecutionInitiated
+        self.open_child_executions = {}
+
+    def execution_dict(self):
+        return {'workflowId': self.workflow_id, 'runId': self.run_id}
+
+
+class _ActivityTask:
+    def __init__(self, execution, activity_id, activity_type, input, timeouts,
+                 scheduled_event_id):
+        self.execution = execution
+        self.activity_id = activity_id
+        self.activity_type = activity_type
+        self.input = input
+        # Seconds, None if unlimited
+        self.timeouts = timeouts
+        self.scheduled_event_id = scheduled_event_id
+
+        self.is_open = True
+        self.started_event_id = None
+        self.token = None
+        self.heartbeats = 0
+        self.heartbeat_details = None
+        self.cancel_requested_event_id = None
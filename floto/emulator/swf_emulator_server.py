@@ -0,0 +1,97 @@
+import multiprocessing
+import multiprocessing.managers
+
+import floto.emulator
+from floto.emulator import SwfEmulator
+
+# The emulator of the server process
+_emulator = None
+
+
+def _init_emulator(clock, poll_timeout):
+    global _emulator
+    _emulator = floto.emulator.SwfEmulator(clock=clock, poll_timeout=poll_timeout)
+
+
+def _get_emulator():
+    return _emulator
+
+
+_SwfEmulatorProxyBase = multiprocessing.managers.MakeProxyType(
+    '_SwfEmulatorProxyBase',
+    [name for name in dir(SwfEmulator)
+     if not name.startswith('_') and name != 'get_paginator' and
+     callable(getattr(SwfEmulator, name))])
+
+
+class SwfEmulatorProxy(_SwfEmulatorProxyBase):
+    """Proxy of the SwfEmulator of a SwfEmulatorServer. Each thread uses its own connection,
+    hence long polls of several threads do not block each other."""
+
+    def get_paginator(self, operation_name):
+        return floto.emulator.swf_emulator.Paginator(self, operation_name)
+
+
+class SwfEmulatorManager(multiprocessing.managers.BaseManager):
+    pass
+
+
+SwfEmulatorManager.register('get_emulator', callable=_get_emulator, proxytype=SwfEmulatorProxy)
+
+
+class SwfEmulatorServer:
+    """Runs a floto.emulator.SwfEmulator in a server process, reachable over a local socket.
+    Deciders, daemons and activity workers in other processes share the emulator through
+    floto.emulator.EmulatorClientFactory.
+
+    Usage:
+    -----
+    server = floto.emulator.SwfEmulatorServer()
+    server.start()
+    floto.api.ClientFactory.set_default(server.client_factory())
+    # Processes forked from now on use the emulator as well
+    ...
+    server.stop()
+    """
+
+    def __init__(self, clock=None, poll_timeout=60, address=('127.0.0.1', 0), authkey=None):
+        """
+        Parameters
+        ----------
+        clock: floto.emulator.Clock
+            The clock of the emulator, see floto.emulator.SwfEmulator
+        poll_timeout: float
+        address: tuple
+            (host, port) of the server, port 0 picks a free port
+        authkey: bytes
+            Defaults to the authkey of the current process, which is inherited by its children
+        """
+        self.clock = clock
+        self.poll_timeout = poll_timeout
+        self.authkey = authkey or bytes(multiprocessing.current_process().authkey)
+        self.address = address
+        self._manager = None
+
+    def start(self):
+        """Starts the server process.
+
+        Returns
+        -------
+        tuple: The address of the server
+        """
+        self._manager = SwfEmulatorManager(address=self.address, authkey=self.authkey)
+        self._manager.start(_init_emulator, (self.clock, self.poll_timeout))
+        self.address = self._manager.address
+        return self.address
+
+    def stop(self):
+        if self._manager:
+            self._manager.shutdown()
+            self._manager = None
+
+    def client(self):
+        """A proxy of the emulator for this process."""
+        return self._manager.get_emulator()
+
+    def client_factory(self):
+        return floto.emulator.EmulatorClientFactory(address=self.address, authkey=self.authkey)
@@ -0,0 +1,34 @@
+import collections.abc
+
+
+class EventsView(collections.abc.Sequence):
+    """Read-only view of the events <events>[<start>:<stop>], without copying them. The view is
+    only valid until more events are read into the history it has been taken from.
+    """
+
+    def __init__(self, events, start=0, stop=None):
+        self._events = events
+        self._start = start
+        self._stop = len(events) if stop is None else stop
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._events[self._start + i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('EventsView index out of range')
+        return self._events[self._start + index]
+
+    def __len__(self):
+        return max(self._stop - self._start, 0)
+
+    def __iter__(self):
+        for i in range(self._start, self._start + len(self)):
+            yield self._events[i]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return 'EventsView({!r})'.format(list(self))
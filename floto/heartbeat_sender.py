@@ -8,7 +8,8 @@ import floto.api
 class HeartbeatSender:
     def __init__(self):
         self.swf = floto.api.Swf()
-        self.is_send_heartbeat = mp.Value(ctypes.c_bool, True)
+        # Without lock: the heartbeat process is terminated and must not hold a lock
+        self.is_send_heartbeat = mp.Value(ctypes.c_bool, True, lock=False)
         self.process = None
 
     def send_heartbeats(self, timeout, task_token):
@@ -17,7 +18,13 @@ class HeartbeatSender:
         self.process.start()
 
     def stop_heartbeats(self):
+        """Stops the heartbeat process. It is terminated instead of waiting up to <timeout>
+        seconds for its next heartbeat, so that no heartbeat process outlives its activity task."""
         self.is_send_heartbeat.value = False
+        if self.process:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
 
     def _send_heartbeat(self, timeout, task_token):
         while self.is_send_heartbeat.value:
@@ -1,11 +1,29 @@
+import pickle
+import time
+import zlib
+
 import floto.api
+from floto.decode_cache import DecodeCache
+from floto.events_view import EventsView
+from floto.history_page_prefetcher import HistoryPagePrefetcher
+from floto.task_state import TaskState
 
 
 class History:
     """History provides information based on the events recorded by SWF during the workflow
     execution"""
 
-    def __init__(self, domain, task_list, response):
+    ACTIVITY_ID_EVENT_TYPES = ['ActivityTaskCompleted',
+                               'ActivityTaskStarted',
+                               'ActivityTaskFailed',
+                               'ActivityTaskTimedOut',
+                               'ActivityTaskScheduled',
+                               'ActivityTaskCanceled',
+                               'TimerStarted',
+                               'TimerFired',
+                               'TimerCanceled']
+
+    def __init__(self, domain, task_list, response, prefetch_pages=0):
         """
         Parameters
         ----------
@@ -14,24 +32,176 @@ class History:
             Task list of the decider
         response: dict
             The response from 'poll_for_decision_task'
+        prefetch_pages: int
+            If > 0, the remaining pages of the history are fetched in a background thread as soon
+            as the history is created. At most <prefetch_pages> fetched pages are buffered.
         """
         self.domain = domain
         self.task_list = task_list
+        self.prefetch_pages = prefetch_pages
 
-        self.events_by_type = {}
-        self.events_by_id = {}
-        self.events_by_activity_id = {}
+        self.page_wait_seconds = 0.0
+        self._page_fetch_latencies = []
+        self._prefetcher = None
+        self.decode_cache = DecodeCache()
+        self._page_fetch_count_at_decision_start = 0
+        self._workflow_start_event = None
+
+        self._init_event_store()
 
         self.set_response_properties(response)
+        self._start_prefetcher()
         self.dt_previous_decision_task = None
         self._read_events_up_to_last_decision(response)
 
+    def _init_event_store(self):
+        self.events_by_type = {}
+        self.events_by_id = {}
+        self.events_by_activity_id = {}
+        self.task_states = {}
+        # Events by the id of their ActivityTaskScheduled event, if it has not been read yet
+        self._pending_by_scheduled_id = {}
+
     def set_response_properties(self, response):
         self.next_page_token = response['nextPageToken'] if ('nextPageToken' in response) else None
         self.highest_event_id = response['events'][0]['eventId']
         self.lowest_event_id = response['events'][-1]['eventId']
         self.decision_task_started_event_id = response['startedEventId']
         self.previous_decision_id = response['previousStartedEventId']
+        self.workflow_execution = response.get('workflowExecution')
+
+    def update(self, response):
+        """Updates the history with the response of a later decision task of the same workflow
+        execution. Only events newer than self.highest_event_id are read, paging stops as soon as
+        known events are reached.
+
+        Parameters
+        ----------
+        response: dict
+            The response from 'poll_for_decision_task'
+
+        Returns
+        -------
+        bool: False if the events of <response> do not continue the known events. The history is
+            not changed in this case.
+        """
+        if response['events'][0]['eventId'] <= self.highest_event_id:
+            return False
+        self.close()
+        page_fetch_count = self.page_fetch_count
+
+        new_events = []
+        page = response
+        next_page_token = response.get('nextPageToken')
+        while True:
+            new_events.extend(e for e in page['events'] if e['eventId'] > self.highest_event_id)
+            lowest_page_event_id = page['events'][-1]['eventId']
+            if lowest_page_event_id <= self.highest_event_id + 1 or not next_page_token:
+                break
+            page = self._poll_event_page(next_page_token)
+            next_page_token = page.get('nextPageToken')
+
+        if lowest_page_event_id > self.highest_event_id + 1:
+            return False
+
+        self.highest_event_id = new_events[0]['eventId']
+        self._read_newer_events(new_events)
+
+        self.lowest_event_id = min(self.lowest_event_id, lowest_page_event_id)
+        self.next_page_token = next_page_token if self.lowest_event_id > 1 else None
+        self.decision_task_started_event_id = response['startedEventId']
+        self.previous_decision_id = response['previousStartedEventId']
+        self.dt_previous_decision_task = self.get_datetime_previous_decision()
+        self._page_fetch_count_at_decision_start = page_fetch_count
+        self._start_prefetcher()
+        return True
+
+    @property
+    def page_fetch_count(self):
+        """Number of history pages fetched from SWF, including prefetched pages."""
+        return len(self.page_fetch_latencies)
+
+    @property
+    def page_fetch_seconds(self):
+        """Total time spent fetching history pages from SWF."""
+        return sum(self.page_fetch_latencies)
+
+    @property
+    def decision_page_fetch_count(self):
+        """Number of history pages fetched for the current decision task."""
+        return self.page_fetch_count - self._page_fetch_count_at_decision_start
+
+    @property
+    def page_fetch_latencies(self):
+        prefetched = self._prefetcher.fetch_latencies if self._prefetcher else []
+        return self._page_fetch_latencies + prefetched
+
+    def close(self):
+        """Stops prefetching history pages."""
+        if self._prefetcher:
+            self._page_fetch_latencies.extend(self._prefetcher.fetch_latencies)
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+    def __del__(self):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_prefetcher'] = None
+        state['_page_fetch_latencies'] = list(self.page_fetch_latencies)
+        state['decode_cache'] = DecodeCache(self.decode_cache.max_bytes)
+        return state
+
+    def dumps(self, compress=False):
+        """A binary snapshot of the history: the events and all indexes. Only load snapshots
+        from trusted sources, see History.loads.
+
+        Parameters
+        ----------
+        compress: bool
+            If True, the snapshot is zlib compressed
+
+        Returns
+        -------
+        bytes
+        """
+        data = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        return zlib.compress(data) if compress else data
+
+    @staticmethod
+    def loads(data):
+        """The history of a snapshot created by History.dumps (compressed or not). The snapshot
+        is unpickled, hence it must come from a trusted source."""
+        # Pickles of protocol >= 2 start with the PROTO opcode, zlib streams never do
+        if data[:1] != pickle.PROTO:
+            data = zlib.decompress(data)
+        return pickle.loads(data)
+
+    def load_events_for_decision(self):
+        """Reads the pages which contain the events needed for the current decision: the events
+        since the previous decision and the ActivityTaskScheduled events they refer to. Pages
+        below the lowest needed event are not read.
+
+        Returns
+        -------
+        set: int
+            The ids of the needed events
+        """
+        first_event_id = max(self.previous_decision_id, 1)
+        self._read_pages_down_to(first_event_id)
+
+        event_ids = set(range(first_event_id, self.decision_task_started_event_id + 1))
+        scheduled_event_ids = set()
+        for event_id in event_ids:
+            event = self.events_by_id.get(event_id)
+            if event and event['eventType'] in TaskState.EVENT_TYPES and \
+                    event['eventType'] not in ('ActivityTaskScheduled', 'TimerStarted',
+                                               'TimerFired'):
+                scheduled_event_ids.add(self.get_event_attributes(event)['scheduledEventId'])
+        if scheduled_event_ids:
+            self._read_pages_down_to(min(scheduled_event_ids))
+        return event_ids | scheduled_event_ids
 
     def get_event(self, event_id=None, allow_read_next_event_page=True):
         if not event_id:
@@ -53,10 +223,27 @@ class History:
         return self.get_events_up_to_datetime(event_type, self.dt_previous_decision_task)
 
     def get_events_up_to_datetime(self, event_type, dt):
-        events = []
-        if event_type in self.events_by_type:
-            events = [e for e in self.events_by_type[event_type] if e['eventTimestamp'] >= dt]
-        return events
+        """The events of <event_type> recorded at or after <dt>, latest first.
+
+        Returns
+        -------
+        floto.events_view.EventsView
+        """
+        events = self.get_events_by_type(event_type)
+        return EventsView(events, 0, self._index_below(events, 'eventTimestamp', dt))
+
+    def get_events_in_range(self, event_type, first_event_id, last_event_id):
+        """The read events of <event_type> with first_event_id <= eventId <= last_event_id,
+        latest first.
+
+        Returns
+        -------
+        floto.events_view.EventsView
+        """
+        events = self.get_events_by_type(event_type)
+        return EventsView(events,
+                          self._index_below(events, 'eventId', last_event_id + 1),
+                          self._index_below(events, 'eventId', first_event_id))
 
     def get_events_by_task_id_and_type(self, id_, event_type):
         """Returns the events by the id of the activity task or timer
@@ -87,11 +274,14 @@ class History:
         types_faulty = ['ActivityTaskFailed', 'ActivityTaskTimedOut']
         types_completed = ['ActivityTaskCompleted', 'TimerFired']
         types_decision_failed = ['DecisionTaskTimedOut']
-        events = [self.get_event(i) for i in range(first_event_id, last_event_id + 1)]
+        self._read_pages_down_to(first_event_id)
         decider_events = {}
-        decider_events['faulty'] = self._filter_events_by_type(events, types_faulty)
-        decider_events['completed'] = self._filter_events_by_type(events, types_completed)
-        decision_failed_events = self._filter_events_by_type(events, types_decision_failed)
+        decider_events['faulty'] = self._get_events_in_range_by_types(
+            types_faulty, first_event_id, last_event_id)
+        decider_events['completed'] = self._get_events_in_range_by_types(
+            types_completed, first_event_id, last_event_id)
+        decision_failed_events = self._get_events_in_range_by_types(
+            types_decision_failed, first_event_id, last_event_id)
         decider_events['decision_failed'] = decision_failed_events
         return decider_events
 
@@ -118,9 +308,12 @@ class History:
         types = {'ActivityTaskFailed': self.get_id_activity_task_event,
                  'ActivityTaskTimedOut': self.get_id_activity_task_event,
                  'ActivityTaskCompleted': self.get_id_activity_task_event,
+                 'ActivityTaskStarted': self.get_id_activity_task_event,
+                 'ActivityTaskCanceled': self.get_id_activity_task_event,
                  'ActivityTaskScheduled': self.get_id_activity_task_scheduled,
                  'TimerStarted': self.get_id_timer_fired_event,
-                 'TimerFired': self.get_id_timer_fired_event}
+                 'TimerFired': self.get_id_timer_fired_event,
+                 'TimerCanceled': self.get_id_timer_fired_event}
 
         if not event['eventType'] in types:
             raise ValueError('Do not know how to retrieve id of {}'.format(event['eventType']))
@@ -158,18 +351,48 @@ class History:
     def get_id_activity_task_scheduled(self, event, allow_read_next_event_page=True):
         return event['activityTaskScheduledEventAttributes']['activityId']
 
-    def get_number_activity_task_failures(self, activity_id):
-        """Number of failed executions of activity task"""
-        dt = self.get_datetime_activity_task_completed(activity_id)
-        failures = 0
+    def get_task_state(self, id_, required=None):
+        """The floto.TaskState of the activity task or timer <id_>, None if no event of the task
+        has been read.
 
-        failed = self.get_events_by_task_id_and_type(activity_id, 'ActivityTaskFailed')
-        timed_out = self.get_events_by_task_id_and_type(activity_id, 'ActivityTaskTimedOut')
+        Parameters
+        ----------
+        id_: str
+            The activity or timer id
+        required: str
+            Name of a TaskState event id attribute, e.g. 'completed_event_id'. If set, pages are
+            read until the attribute is set or all pages have been read.
+        """
+        state = self.task_states.get(id_)
+        while required and (state is None or getattr(state, required) is None) and \
+                self._has_next_event_page():
+            self._read_next_event_page()
+            state = self.task_states.get(id_)
+        return state
 
-        failed_since_completion = len([e for e in failed if e['eventTimestamp'] > dt])
-        timed_out_since_completion = len([e for e in timed_out if e['eventTimestamp'] > dt])
+    def get_open_task_counts(self):
+        """The number of open activity tasks and timers, as in the 'openCounts' of
+        DescribeWorkflowExecution. All pages of the history are read.
 
-        return failed_since_completion + timed_out_since_completion
+        Returns
+        -------
+        dict: {'openActivityTasks': int, 'openTimers': int}
+        """
+        self._read_pages_down_to(1)
+        open_activity_tasks = 0
+        open_timers = 0
+        for state in self.task_states.values():
+            if state.is_open:
+                if state.is_timer:
+                    open_timers += 1
+                else:
+                    open_activity_tasks += 1
+        return {'openActivityTasks': open_activity_tasks, 'openTimers': open_timers}
+
+    def get_number_activity_task_failures(self, activity_id):
+        """Number of failed executions of activity task"""
+        state = self.get_task_state(activity_id, required='completed_event_id')
+        return state.failures if state else 0
 
     def get_datetime_previous_decision(self):
         """The datetime of the previous decision. If there has not been a previous decision task,
@@ -191,52 +414,79 @@ class History:
                 self._read_next_event_page()
                 dt = self.get_datetime_previous_decision()
         else:
-            dt = self.get_event(1)['eventTimestamp']
+            dt = self.get_workflow_start_event()['eventTimestamp']
         return dt
 
     def get_datetime_activity_task_completed(self, activity_id):
         """Datetime of last successful execution of activity. If not found, the datetime of the 
         workflow start is returned.
         """
-        events = self.get_events_by_task_id_and_type(activity_id, 'ActivityTaskCompleted')
-        if events:
-            return events[0]['eventTimestamp']
-        elif self._has_next_event_page():
-            self._read_next_event_page()
-            return self.get_datetime_activity_task_completed(activity_id)
-        return self.get_event(1)['eventTimestamp']
+        state = self.get_task_state(activity_id, required='completed_event_id')
+        if state and state.completed_event_id:
+            return self.events_by_id[state.completed_event_id]['eventTimestamp']
+        return self.get_workflow_start_event()['eventTimestamp']
 
-    def get_workflow_input(self):
+    def get_workflow_input(self, raw=False):
         """Returns workflow input
 
+        Parameters
+        ----------
+        raw: bool
+            If True, the input string is returned without decoding it
+
         Returns
         -------
         dict: Workflow input, {} if no input is given
         """
         input = {}
-        workflow_start = self.get_events_by_type('WorkflowExecutionStarted')
+        workflow_start = self.get_workflow_start_event()
         if workflow_start:
-            attributes = self.get_event_attributes(workflow_start[0])
+            attributes = self.get_event_attributes(workflow_start)
 
             if 'input' in attributes:
-                input = floto.specs.JSONEncoder.load_string(attributes['input'])
-        elif self._has_next_event_page():
-            self._read_next_event_page()
-            input = self.get_workflow_input()
+                input = self._decode_payload(workflow_start, attributes['input'], raw)
         return input
 
-    def get_result_completed_activity(self, task):
+    def get_workflow_start_event(self):
+        """The WorkflowExecutionStarted event, None if it does not exist. If the event is not
+        part of the pages read so far, it is fetched on its own (first event of the history in
+        ascending order) instead of paging through the whole history. The event is kept for the
+        lifetime of the history."""
+        if self._workflow_start_event is None:
+            started = self.get_events_by_type('WorkflowExecutionStarted')
+            if started:
+                self._workflow_start_event = started[0]
+            elif 1 in self.events_by_id:
+                self._workflow_start_event = self.events_by_id[1]
+            elif self._has_next_event_page():
+                if self.workflow_execution:
+                    self._workflow_start_event = self._fetch_workflow_start_event()
+                else:
+                    self._read_next_event_page()
+                    return self.get_workflow_start_event()
+        return self._workflow_start_event
+
+    def get_result_completed_activity(self, task, raw=False):
+        """The result of the latest execution of activity task <task>, None if it has not
+        completed or has no result. Decoded results are cached, see self.decode_cache.
+
+        Parameters
+        ----------
+        task: floto.specs.ActivityTask
+        raw: bool
+            If True, the result string is returned without decoding it
+        """
         if isinstance(task, floto.specs.ActivityTask):
             c = self.get_events_by_task_id_and_type(task.id_, 'ActivityTaskCompleted')
             if c:
                 attributes = self.get_event_attributes(c[0])
                 if attributes['result']:
-                    return floto.specs.JSONEncoder.load_string(attributes['result'])
+                    return self._decode_payload(c[0], attributes['result'], raw)
                 else:
                     return None
             elif self._has_next_event_page():
                 self._read_next_event_page()
-                return self.get_result_completed_activity(task)
+                return self.get_result_completed_activity(task, raw)
         return None
 
     # TODO: Adapt for StartAsNewWorkflow event
@@ -260,28 +510,18 @@ class History:
 
     def is_timer_task_completed(self, timer_id):
         """Returns whether timer with <timer_id> has completed or not."""
-        timer_started = self.get_events_by_task_id_and_type(timer_id, 'TimerStarted')
-        if timer_started:
-            timer_fired = self.get_events_by_task_id_and_type(timer_id, 'TimerFired')
-            if timer_fired:
-                if timer_fired[0]['eventTimestamp'] > timer_started[0]['eventTimestamp']:
-                    return True
-        elif self._has_next_event_page():
-            self._read_next_event_page()
-            return self.is_timer_task_completed(timer_id)
-        return False
+        state = self.get_task_state(timer_id, required='scheduled_event_id')
+        return bool(state and state.is_completed)
 
     def is_activity_task_completed(self, activity_id):
         """Returns whether activity task with <activity_id> has completed or not."""
-        scheduled = self.get_events_by_task_id_and_type(activity_id, 'ActivityTaskScheduled')
-        if scheduled:
-            completed = self.get_events_by_task_id_and_type(activity_id, 'ActivityTaskCompleted')
-            if completed and completed[0]['eventTimestamp'] > scheduled[0]['eventTimestamp']:
-                return True
-        elif self._has_next_event_page():
-            self._read_next_event_page()
-            return self.is_activity_task_completed(activity_id)
-        return False
+        state = self.get_task_state(activity_id, required='scheduled_event_id')
+        return bool(state and state.is_completed)
+
+    def _decode_payload(self, event, payload, raw=False):
+        if raw:
+            return payload
+        return self.decode_cache.decode(event['eventId'], payload)
 
     def _read_events_up_to_last_decision(self, response):
         self._read_event_page(response['events'])
@@ -289,68 +529,146 @@ class History:
 
     def _read_event_page(self, events):
         for event in events:
-            self.events_by_id[event['eventId']] = event
-
-            event_type = event['eventType']
-            if not event_type in self.events_by_type:
-                self.events_by_type[event_type] = [event]
+            if event['eventId'] not in self.events_by_id:
+                self._add_event(event)
+
+    def _read_newer_events(self, events):
+        """Reads <events> (in reverse order) which are newer than all known events."""
+        # Ascending order: scheduled events are known before the events referring to them
+        for event in reversed(events):
+            self._add_event(event)
+
+    def _add_event(self, event):
+        self.events_by_id[event['eventId']] = event
+        self._insert_event(self.events_by_type.setdefault(event['eventType'], []), event)
+        self._index_event_by_activity_id(event)
+
+    def _index_event_by_activity_id(self, event):
+        """Adds <event> to self.events_by_activity_id. Events which refer to an
+        ActivityTaskScheduled event that has not been read yet are parked in
+        self._pending_by_scheduled_id until the scheduled event arrives."""
+        event_type = event['eventType']
+        if event_type not in self.ACTIVITY_ID_EVENT_TYPES:
+            return
+
+        if event_type == 'ActivityTaskScheduled':
+            activity_id = self.get_id_activity_task_scheduled(event)
+            self._add_event_by_activity_id(activity_id, event)
+            for pending in self._pending_by_scheduled_id.pop(event['eventId'], []):
+                self._add_event_by_activity_id(activity_id, pending)
+        elif event_type in ('TimerStarted', 'TimerFired', 'TimerCanceled'):
+            self._add_event_by_activity_id(self.get_id_timer_fired_event(event), event)
+        else:
+            scheduled_event_id = self.get_event_attributes(event)['scheduledEventId']
+            scheduled_event = self.events_by_id.get(scheduled_event_id)
+            if scheduled_event:
+                activity_id = self.get_id_activity_task_scheduled(scheduled_event)
+                self._add_event_by_activity_id(activity_id, event)
             else:
-                self.events_by_type[event_type].append(event)
-
-        self._fill_events_by_activity_id_for_types(max_event_id=events[0]['eventId'])
-
-    def _fill_events_by_activity_id_for_types(self, max_event_id):
-        types = ['ActivityTaskCompleted',
-                 'ActivityTaskFailed',
-                 'ActivityTaskTimedOut',
-                 'ActivityTaskScheduled',
-                 'TimerStarted',
-                 'TimerFired']
-        for t in types:
-            events = self._collect_new_events_for_fill_by_activity_id(t, max_event_id)
-            self._fill_events_by_activity_id(events)
-
-    def _collect_new_events_for_fill_by_activity_id(self, event_type, max_event_id):
-        events = []
-        if 'none' in self.events_by_activity_id:
-            if event_type in self.events_by_activity_id['none']:
-                events = list(self.events_by_activity_id['none'][event_type])
-                self.events_by_activity_id['none'][event_type] = []
-
-        new_events = []
-        for e in reversed(self.get_events_by_type(event_type)):
-            if e['eventId'] <= max_event_id:
-                new_events.append(e)
+                self._pending_by_scheduled_id.setdefault(scheduled_event_id, []).append(event)
+
+    def _add_event_by_activity_id(self, activity_id, event):
+        events_by_type = self.events_by_activity_id.setdefault(activity_id, {})
+        self._insert_event(events_by_type.setdefault(event['eventType'], []), event)
+        self._update_task_state(activity_id, event['eventType'], event['eventId'])
+
+    def _update_task_state(self, id_, event_type, event_id):
+        state = self.task_states.get(id_)
+        if state is None:
+            state = self.task_states[id_] = TaskState()
+        state.add_event(event_type, event_id)
+
+    @staticmethod
+    def _insert_event(events, event):
+        """Inserts <event> into <events>, which is sorted by descending event id."""
+        event_id = event['eventId']
+        if not events or events[-1]['eventId'] > event_id:
+            events.append(event)
+        elif events[0]['eventId'] < event_id:
+            events.insert(0, event)
+        else:
+            events.insert(History._index_below(events, 'eventId', event_id + 1), event)
+
+    @staticmethod
+    def _index_below(events, key, value):
+        """Index of the first event in <events> whose <key> is lower than <value>, len(events) if
+        there is none. <events> are sorted by descending event id, hence by descending eventId and
+        eventTimestamp."""
+        lo, hi = 0, len(events)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if events[mid][key] >= value:
+                lo = mid + 1
             else:
-                break
-        new_events.reverse()
-        events.extend(new_events)
-        return events
-
-    def _fill_events_by_activity_id(self, events):
-        for event in events:
-            activity_id = self.get_id_task_event(event, False) or 'none'
-            if not activity_id in self.events_by_activity_id:
-                self.events_by_activity_id[activity_id] = {}
+                hi = mid
+        return lo
 
-            if not event['eventType'] in self.events_by_activity_id[activity_id]:
-                self.events_by_activity_id[activity_id][event['eventType']] = [event]
-            else:
-                self.events_by_activity_id[activity_id][event['eventType']].append(event)
+    def _get_events_in_range_by_types(self, event_types, first_event_id, last_event_id):
+        """The events of <event_types> in the range of ids, in ascending order."""
+        events = []
+        for event_type in event_types:
+            events.extend(self.get_events_in_range(event_type, first_event_id, last_event_id))
+        return sorted(events, key=lambda e: e['eventId'])
 
     def _read_next_event_page(self):
         if not self.next_page_token:
             raise ValueError('floto.History._read_next_event_page(): No page token!')
 
-        swf = floto.api.Swf()
-        poll_args = {'domain': self.domain,
-                     'task_list': self.task_list,
-                     'page_token': self.next_page_token}
-        next = swf.poll_for_decision_task_page(**poll_args)
+        if self._prefetcher:
+            start = time.monotonic()
+            next = self._prefetcher.next_page()
+            self.page_wait_seconds += time.monotonic() - start
+        else:
+            next = self._poll_event_page(self.next_page_token)
 
         self._read_event_page(next['events'])
         self.next_page_token = next['nextPageToken'] if ('nextPageToken' in next) else None
-        self.lowest_event_id = next['events'][-1]['eventId']
+        self.lowest_event_id = min(self.lowest_event_id, next['events'][-1]['eventId'])
+
+    def _read_pages_down_to(self, event_id):
+        while self.lowest_event_id > event_id and self._has_next_event_page():
+            self._read_next_event_page()
+
+    def _fetch_workflow_start_event(self):
+        start = time.monotonic()
+        swf = floto.api.Swf()
+        page = swf.get_workflow_execution_history(domain=self.domain,
+                                                  run_id=self.workflow_execution['runId'],
+                                                  workflow_id=self.workflow_execution['workflowId'],
+                                                  reverse_order=False,
+                                                  page_size=1)
+        latency = time.monotonic() - start
+        self._page_fetch_latencies.append(latency)
+        self.page_wait_seconds += latency
+        return page['events'][0]
+
+    def _poll_event_page(self, page_token):
+        start = time.monotonic()
+        page = self._poll_page(self.domain, self.task_list, page_token)
+        latency = time.monotonic() - start
+        self._page_fetch_latencies.append(latency)
+        self.page_wait_seconds += latency
+        return page
+
+    @staticmethod
+    def _poll_page(domain, task_list, page_token):
+        swf = floto.api.Swf()
+        poll_args = {'domain': domain,
+                     'task_list': task_list,
+                     'page_token': page_token}
+        return swf.poll_for_decision_task_page(**poll_args)
+
+    def _start_prefetcher(self):
+        if not (self.prefetch_pages and self.next_page_token):
+            return
+        # The prefetcher must not hold a reference to the history (see __del__)
+        domain, task_list = self.domain, self.task_list
+
+        def fetch_page(page_token):
+            return History._poll_page(domain, task_list, page_token)
+
+        self._prefetcher = HistoryPagePrefetcher(fetch_page, self.next_page_token,
+                                                 max_pages=self.prefetch_pages)
 
     def _has_next_event_page(self):
         next_page = True
@@ -0,0 +1,79 @@
+import collections
+import threading
+import time
+
+
+class HistoryCache:
+    """Keeps the History of workflow executions between decision tasks, keyed by runId. When the
+    next decision task of a cached execution is polled, only the new events are read (see
+    floto.History.update). Least recently used histories are evicted if the cache exceeds
+    <max_size> entries, histories which have not been used for <max_age_in_seconds> are dropped.
+    The cache can be shared by threads (see floto.decider.ConcurrentDecider).
+
+    Usage:
+    -----
+    decider = floto.decider.Decider(decider_spec=spec)
+    decider.history_cache = floto.HistoryCache(max_size=500)
+    decider.run()
+    """
+
+    def __init__(self, max_size=100, max_age_in_seconds=3600):
+        """
+        Parameters
+        ----------
+        max_size: int
+            Maximal number of cached histories
+        max_age_in_seconds: int
+            Histories which have not been accessed for <max_age_in_seconds> are evicted. If None,
+            histories do not expire.
+        """
+        self.max_size = max_size
+        self.max_age_in_seconds = max_age_in_seconds
+        self._histories = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, run_id):
+        """The cached history of <run_id>, None if there is none."""
+        with self._lock:
+            self._evict_expired()
+            if run_id not in self._histories:
+                return None
+            _, history = self._histories.pop(run_id)
+            self._histories[run_id] = (self._now(), history)
+            return history
+
+    def put(self, run_id, history):
+        with self._lock:
+            self._histories.pop(run_id, None)
+            self._histories[run_id] = (self._now(), history)
+            self._evict_expired()
+            while len(self._histories) > self.max_size:
+                self._histories.popitem(last=False)
+
+    def remove(self, run_id):
+        with self._lock:
+            self._histories.pop(run_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._histories.clear()
+
+    def __contains__(self, run_id):
+        return run_id in self._histories
+
+    def __len__(self):
+        return len(self._histories)
+
+    def _evict_expired(self):
+        if self.max_age_in_seconds is None:
+            return
+        now = self._now()
+        while self._histories:
+            run_id, (last_access, _) = next(iter(self._histories.items()))
+            if now - last_access <= self.max_age_in_seconds:
+                break
+            del self._histories[run_id]
+
+    @staticmethod
+    def _now():
+        return time.monotonic()
@@ -0,0 +1,62 @@
+import queue
+import threading
+import time
+
+
+class HistoryPagePrefetcher:
+    """Fetches the pages of a decision task's history in a background thread. The pages are kept
+    in a bounded queue from which floto.History reads them in order, blocking only if the next
+    page has not arrived yet.
+    """
+
+    def __init__(self, fetch_page, page_token, max_pages=10):
+        """
+        Parameters
+        ----------
+        fetch_page: callable
+            fetch_page(page_token) returns the page of <page_token>
+        page_token: str
+            The token of the first page to be fetched
+        max_pages: int
+            Maximal number of fetched pages which have not been read yet
+        """
+        self.fetch_latencies = []
+        self._fetch_page = fetch_page
+        self._pages = queue.Queue(maxsize=max_pages)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._fetch_pages, args=(page_token,), daemon=True)
+        self._thread.start()
+
+    @property
+    def fetch_count(self):
+        return len(self.fetch_latencies)
+
+    def next_page(self):
+        """The next page of the history. Errors raised while fetching the page are re-raised."""
+        page = self._pages.get()
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+    def stop(self):
+        self._stopped.set()
+
+    def _fetch_pages(self, page_token):
+        while page_token and not self._stopped.is_set():
+            start = time.monotonic()
+            try:
+                page = self._fetch_page(page_token)
+            except Exception as e:
+                self._put(e)
+                return
+            self.fetch_latencies.append(time.monotonic() - start)
+            self._put(page)
+            page_token = page.get('nextPageToken')
+
+    def _put(self, page):
+        while not self._stopped.is_set():
+            try:
+                self._pages.put(page, timeout=0.1)
+                return
+            except queue.Full:
+                pass
@@ -0,0 +1,114 @@
+import logging
+import os
+import tempfile
+import urllib.parse
+
+import floto
+
+logger = logging.getLogger(__name__)
+
+
+class HistorySnapshotStore:
+    """Keeps snapshots of histories (see floto.History.dumps) in a local directory, keyed by
+    runId and the id of the last event of the history (<directory>/<runId>/<last event id>).
+    After a restart, a decider resumes from the snapshot and only reads the events which are
+    newer than the snapshot.
+
+    Usage:
+    -----
+    decider = floto.decider.Decider(decider_spec=spec)
+    decider.history_snapshot_store = floto.HistorySnapshotStore('/var/lib/floto/histories')
+    decider.run()
+    """
+
+    SUFFIX = '.history'
+    COMPRESSED_SUFFIX = '.history.z'
+
+    def __init__(self, directory, compress=True):
+        """
+        Parameters
+        ----------
+        directory: str
+            The directory of the snapshots. It is created if it does not exist.
+        compress: bool
+            If True, the snapshots are zlib compressed
+        """
+        self.directory = directory
+        self.compress = compress
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, run_id, history):
+        """Stores a snapshot of <history> and removes the older snapshots of <run_id>.
+
+        Returns
+        -------
+        str: The path of the snapshot
+        """
+        run_directory = self._run_directory(run_id)
+        os.makedirs(run_directory, exist_ok=True)
+        suffix = self.COMPRESSED_SUFFIX if self.compress else self.SUFFIX
+        path = os.path.join(run_directory, '{}{}'.format(history.highest_event_id, suffix))
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=run_directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'wb') as f:
+            f.write(history.dumps(compress=self.compress))
+        os.replace(tmp_path, path)
+
+        for _, other_path in self._snapshots(run_id):
+            if other_path != path:
+                os.remove(other_path)
+        return path
+
+    def load(self, run_id, last_event_id=None):
+        """The history of the latest snapshot of <run_id>, None if there is none.
+
+        Parameters
+        ----------
+        run_id: str
+        last_event_id: int
+            If given, the snapshot whose last event has <last_event_id>
+        """
+        snapshots = self._snapshots(run_id)
+        if last_event_id is not None:
+            snapshots = [s for s in snapshots if s[0] == last_event_id]
+        if not snapshots:
+            return None
+
+        _, path = max(snapshots)
+        try:
+            with open(path, 'rb') as f:
+                return floto.History.loads(f.read())
+        except Exception as e:
+            logger.warning('Could not load history snapshot {}: {}'.format(path, e))
+            return None
+
+    def remove(self, run_id):
+        for _, path in self._snapshots(run_id):
+            os.remove(path)
+        try:
+            os.rmdir(self._run_directory(run_id))
+        except OSError:
+            pass
+
+    def last_event_ids(self, run_id):
+        """The last event ids of the snapshots of <run_id>."""
+        return sorted(last_event_id for last_event_id, _ in self._snapshots(run_id))
+
+    def _snapshots(self, run_id):
+        """List of (last_event_id, path) of the snapshots of <run_id>."""
+        run_directory = self._run_directory(run_id)
+        if not os.path.isdir(run_directory):
+            return []
+        snapshots = []
+        for file_name in os.listdir(run_directory):
+            for suffix in (self.COMPRESSED_SUFFIX, self.SUFFIX):
+                if file_name.endswith(suffix):
+                    last_event_id = file_name[:-len(suffix)]
+                    if last_event_id.isdigit():
+                        snapshots.append((int(last_event_id),
+                                          os.path.join(run_directory, file_name)))
+                    break
+        return snapshots
+
+    def _run_directory(self, run_id):
+        # runIds may contain '/' and '+'
+        return os.path.join(self.directory, urllib.parse.quote(run_id, safe=''))
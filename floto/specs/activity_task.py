@@ -5,7 +5,7 @@ from floto.specs import Task
 
 class ActivityTask(Task):
     def __init__(self, name=None, version=None, activity_id=None, requires=None, input=None,
-                 retry_strategy=None):
+                 retry_strategy=None, estimated_duration=None):
         """Defines an activity task which is used in decider specs.
 
         Parameters
@@ -18,6 +18,9 @@ class ActivityTask(Task):
             List of activity tasks this activity task depends on
         input: dict
         retry_strategy: floto.specs.Strategy
+        estimated_duration: int
+            Estimated execution time in seconds, used for critical paths (see
+            floto.decider.GraphMetadata)
         """
         super().__init__(requires=requires)
 
@@ -26,6 +29,7 @@ class ActivityTask(Task):
         self.input = input
         self.id_ = activity_id or self._default_activity_id()
         self.retry_strategy = retry_strategy
+        self.estimated_duration = estimated_duration
 
     def _default_activity_id(self):
         input_hash = hash(json.dumps(self.input, sort_keys=True))
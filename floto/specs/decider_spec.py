@@ -5,7 +5,12 @@ import floto.specs
 
 class DeciderSpec:
     """Specification of a decider. Objects of this class define the execution logics of 
-    floto.decider.Deciders"""
+    floto.decider.Deciders
+
+    In JSON, the activity tasks reference the tasks they require by id, e.g.
+    {"activity_tasks": [{"id_": "a", ...}, {"id_": "b", "requires": ["a"], ...}], ...}
+    Specs whose "requires" contain the required tasks themselves are read as well.
+    """
 
     def __init__(self, domain=None, task_list=None, activity_tasks=None, activity_task_list=None,
                  repeat_workflow=False):
@@ -28,9 +33,33 @@ class DeciderSpec:
         self.activity_task_list = activity_task_list
         self.repeat_workflow = repeat_workflow
 
+    def resolve_requires(self):
+        """Replaces the task ids and task copies in the "requires" of the activity tasks by the
+        activity tasks of this spec.
+
+        Raises
+        ------
+        ValueError
+            If a required task id does not belong to an activity task of this spec
+        """
+        tasks = [t for t in self.activity_tasks or [] if isinstance(t, floto.specs.Task)]
+        tasks_by_id = {t.id_: t for t in tasks}
+        for task in tasks:
+            if task.requires:
+                task.requires = [self._resolve_required_task(r, tasks_by_id)
+                                 for r in task.requires]
+
     def to_json(self):
         return json.dumps(self, cls=floto.specs.JSONEncoder, sort_keys=True)
 
     @staticmethod
     def from_json(json_str):
         return json.loads(json_str, object_hook=floto.specs.JSONEncoder.object_hook)
+
+    @staticmethod
+    def _resolve_required_task(required, tasks_by_id):
+        if isinstance(required, str):
+            if required not in tasks_by_id:
+                raise ValueError('Required task {} is not part of the decider spec'.format(required))
+            return tasks_by_id[required]
+        return tasks_by_id.get(required.id_, required)
@@ -1,4 +1,4 @@
-import collections
+import collections.abc
 import datetime as dt
 import json
 import sys
@@ -10,8 +10,10 @@ import floto.specs.retry_strategy
 
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj):
+        if isinstance(obj, floto.specs.DeciderSpec):
+            return self.default_decider_spec(obj)
+
         if isinstance(obj, (floto.specs.ActivityTask,
-                            floto.specs.DeciderSpec,
                             floto.specs.retry_strategy.Strategy,
                             floto.specs.Timer)):
             return self.default_from_namespace(obj)
@@ -28,6 +30,23 @@ class JSONEncoder(json.JSONEncoder):
         d['type'] = module_name + '.' + obj.__class__.__name__
         return d
 
+    def default_decider_spec(self, decider_spec):
+        """The activity tasks of decider specs reference the tasks they require by id. See
+        floto.specs.DeciderSpec.resolve_requires."""
+        d = self.default_from_namespace(decider_spec)
+        if decider_spec.activity_tasks:
+            d['activity_tasks'] = [self.default_task_with_references(t)
+                                   if isinstance(t, floto.specs.Task) else t
+                                   for t in decider_spec.activity_tasks]
+        return d
+
+    def default_task_with_references(self, task):
+        d = self.default_from_namespace(task)
+        if d.get('requires'):
+            d['requires'] = [r.id_ if isinstance(r, floto.specs.Task) else r
+                             for r in d['requires']]
+        return d
+
     @staticmethod
     def filter_none(dictionary):
         return {k: v for k, v in dictionary.items() if v is not None}
@@ -46,6 +65,8 @@ class JSONEncoder(json.JSONEncoder):
         class_name = class_path[-1]
         obj = getattr(sys.modules[module_name], class_name)()
         floto.specs.JSONEncoder.update_namespace(obj, dct)
+        if isinstance(obj, floto.specs.DeciderSpec):
+            obj.resolve_requires()
         return obj
 
     @staticmethod
@@ -55,7 +76,7 @@ class JSONEncoder(json.JSONEncoder):
     @staticmethod
     def update_dict(old_dict, update):
         for k, v in update.items():
-            if isinstance(v, collections.Mapping):
+            if isinstance(v, collections.abc.Mapping):
                 old_dict[k] = floto.specs.JSONEncoder.update_dict(old_dict.get(k, {}), v)
             else:
                 if not old_dict:
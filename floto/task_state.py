@@ -0,0 +1,82 @@
+class TaskState:
+    """State of an activity task or timer, maintained by floto.History while it reads the events
+    of the task. Events can be read in any order: the latest event of each kind wins.
+    """
+
+    # Event type -> attribute holding the id of the latest event of that type
+    EVENT_TYPES = {'ActivityTaskScheduled': 'scheduled_event_id',
+                   'TimerStarted': 'scheduled_event_id',
+                   'ActivityTaskStarted': 'started_event_id',
+                   'ActivityTaskCompleted': 'completed_event_id',
+                   'TimerFired': 'completed_event_id',
+                   'ActivityTaskFailed': 'failed_event_id',
+                   'ActivityTaskTimedOut': 'timed_out_event_id',
+                   'ActivityTaskCanceled': 'canceled_event_id',
+                   'TimerCanceled': 'canceled_event_id'}
+
+    FAILURE_EVENT_TYPES = ('ActivityTaskFailed', 'ActivityTaskTimedOut')
+
+    CLOSE_ATTRIBUTES = ('completed_event_id', 'failed_event_id', 'timed_out_event_id',
+                        'canceled_event_id')
+
+    __slots__ = ('scheduled_event_id', 'started_event_id', 'completed_event_id',
+                 'failed_event_id', 'timed_out_event_id', 'canceled_event_id', 'is_timer',
+                 '_failure_ids')
+
+    def __init__(self):
+        self.scheduled_event_id = None
+        self.started_event_id = None
+        self.completed_event_id = None
+        self.failed_event_id = None
+        self.timed_out_event_id = None
+        self.canceled_event_id = None
+        self.is_timer = False
+        # Ids of the failed and timed out events since the latest completion
+        self._failure_ids = []
+
+    def add_event(self, event_type, event_id):
+        """Records the event with <event_id> of type <event_type>."""
+        attribute = self.EVENT_TYPES[event_type]
+        if event_type.startswith('Timer'):
+            self.is_timer = True
+        latest = getattr(self, attribute)
+        if latest is None or event_id > latest:
+            setattr(self, attribute, event_id)
+
+        if attribute == 'completed_event_id' and event_id == self.completed_event_id:
+            self._failure_ids = [i for i in self._failure_ids if i > event_id]
+        elif event_type in self.FAILURE_EVENT_TYPES:
+            if self.completed_event_id is None or event_id > self.completed_event_id:
+                self._failure_ids.append(event_id)
+
+    @property
+    def failures(self):
+        """Number of failed or timed out executions since the latest completion."""
+        return len(self._failure_ids)
+
+    @property
+    def is_completed(self):
+        """True if the task has completed (timer: fired) after it has last been scheduled
+        (timer: started)."""
+        if self.scheduled_event_id is None or self.completed_event_id is None:
+            return False
+        return self.completed_event_id > self.scheduled_event_id
+
+    @property
+    def is_open(self):
+        """True if the task has been scheduled (timer: started) and has not been closed since."""
+        if self.scheduled_event_id is None:
+            return False
+        closed_ids = [getattr(self, a) for a in self.CLOSE_ATTRIBUTES if getattr(self, a)]
+        return not closed_ids or max(closed_ids) < self.scheduled_event_id
+
+    @property
+    def state(self):
+        """The type of the latest event of the task: 'scheduled', 'started', 'completed',
+        'failed', 'timed_out', 'canceled' or None if no event has been read."""
+        latest_id, latest_state = None, None
+        for attribute in ('scheduled_event_id', 'started_event_id') + self.CLOSE_ATTRIBUTES:
+            event_id = getattr(self, attribute)
+            if event_id is not None and (latest_id is None or event_id > latest_id):
+                latest_id, latest_state = event_id, attribute[:-len('_event_id')]
+        return latest_state
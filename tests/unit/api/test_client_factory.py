@@ -0,0 +1,70 @@
+from unittest.mock import Mock
+
+import pytest
+
+import floto.api
+
+
+@pytest.fixture
+def factory(mocker):
+    factory = floto.api.ClientFactory()
+    mocker.patch.object(factory, '_create_client', side_effect=lambda *args: Mock())
+    return factory
+
+
+class TestClientFactory(object):
+    def test_init(self):
+        factory = floto.api.ClientFactory(max_pool_connections=50)
+        assert factory.max_pool_connections == 50
+        assert factory.long_poll_max_pool_connections == 10
+        assert len(factory) == 0
+
+    def test_client_is_shared(self, factory):
+        assert factory.client(region_name='r') is factory.client(region_name='r')
+        factory._create_client.assert_called_once_with('r', None, False)
+
+    def test_client_per_region_and_profile(self, factory):
+        assert factory.client(region_name='r1') is not factory.client(region_name='r2')
+        assert factory.client(region_name='r1') is not factory.client(region_name='r1',
+                                                                      profile_name='p')
+        assert len(factory) == 3
+
+    def test_long_poll_client_is_separate(self, factory):
+        client = factory.client(region_name='r')
+        long_poll_client = factory.client(region_name='r', long_poll=True)
+        assert client is not long_poll_client
+        assert long_poll_client is factory.client(region_name='r', long_poll=True)
+
+    def test_clients_are_created_again_after_fork(self, factory):
+        client = factory.client()
+        factory._pid = -1
+        assert factory.client() is not client
+        assert factory._pid > 0
+
+    def test_clear(self, factory):
+        client = factory.client()
+        factory.clear()
+        assert len(factory) == 0
+        assert factory.client() is not client
+
+    def test_create_client(self):
+        factory = floto.api.ClientFactory(max_pool_connections=20,
+                                          long_poll_max_pool_connections=5)
+        client = factory.client(region_name='us-east-1')
+        long_poll_client = factory.client(region_name='us-east-1', long_poll=True)
+        assert type(client).__name__ == 'SWF'
+        assert client.meta.config.max_pool_connections == 20
+        assert long_poll_client.meta.config.max_pool_connections == 5
+        assert long_poll_client.meta.config.read_timeout == 70
+
+    def test_default(self):
+        assert floto.api.ClientFactory.default() is floto.api.ClientFactory.default()
+
+    def test_set_default(self):
+        default = floto.api.ClientFactory.default()
+        factory = floto.api.ClientFactory()
+        try:
+            floto.api.ClientFactory.set_default(factory)
+            assert floto.api.ClientFactory.default() is factory
+        finally:
+            floto.api.ClientFactory.set_default(default)
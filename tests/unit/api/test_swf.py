@@ -34,6 +34,36 @@ class TestSwf(object):
 
         swf.open_session.assert_called_once_with(client_params)
 
+    def test_swf_objects_share_clients(self):
+        assert floto.api.Swf().client is floto.api.Swf().client
+
+    def test_client_factory(self):
+        factory = Mock()
+        swf = floto.api.Swf(region_name='r', client_factory=factory)
+        factory.client.assert_called_once_with(region_name='r')
+        assert swf.client is factory.client.return_value
+
+    def test_long_poll_client(self):
+        factory = Mock()
+        factory.client.side_effect = lambda **kwargs: kwargs
+        swf = floto.api.Swf(region_name='r', client_factory=factory)
+        assert swf.long_poll_client == {'region_name':'r', 'long_poll':True}
+        assert swf.client == {'region_name':'r'}
+
+    def test_long_poll_client_of_replaced_client(self, mocker):
+        client_mock = Mock()
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=client_mock)
+        assert floto.api.Swf().long_poll_client is client_mock
+
+    def test_client_after_fork(self):
+        factory = Mock()
+        factory.client.side_effect = [Mock(), Mock()]
+        swf = floto.api.Swf(client_factory=factory)
+        client = swf.client
+        swf._pid = -1
+        assert swf.client is not client
+        assert factory.client.call_count == 2
+
     @pytest.mark.parametrize("args, api_args",[
         ({}, {}),
         ({'page_token':123}, {'nextPageToken':123}),
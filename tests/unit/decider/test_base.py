@@ -57,6 +57,93 @@ class TestBase:
         assert d.run_id == 'val_run_id'
         assert d.workflow_id == 'val_workflow_id'
 
+    def test_poll_for_decisions_with_history_cache(self, mocker, init_response):
+        mocker.patch('floto.api.Swf.poll_for_decision_task_page', return_value=init_response)
+        cache = floto.HistoryCache()
+        d = floto.decider.Base(history_cache=cache)
+        d.poll_for_decision()
+        assert cache.get('val_run_id') == d.history
+
+    def test_poll_for_decisions_updates_cached_history(self, mocker, init_response):
+        mocker.patch('floto.api.Swf.poll_for_decision_task_page', return_value=init_response)
+        history = Mock()
+        history.update.return_value = True
+        cache = floto.HistoryCache()
+        cache.put('val_run_id', history)
+        d = floto.decider.Base(history_cache=cache)
+        d.poll_for_decision()
+        history.update.assert_called_once_with(init_response)
+        assert d.history == history
+
+    def test_poll_for_decisions_loads_events_for_decision(self, mocker, init_response):
+        mocker.patch('floto.api.Swf.poll_for_decision_task_page', return_value=init_response)
+        load = mocker.patch('floto.History.load_events_for_decision')
+        d = floto.decider.Base()
+        d.poll_for_decision()
+        load.assert_called_once_with()
+
+        load.reset_mock()
+        d.load_history_for_decision = False
+        d.poll_for_decision()
+        assert not load.called
+
+    def test_poll_for_decisions_resumes_from_snapshot(self, mocker, init_response):
+        mocker.patch('floto.api.Swf.poll_for_decision_task_page', return_value=init_response)
+        history = Mock()
+        history.update.return_value = True
+        store = Mock()
+        store.load.return_value = history
+        d = floto.decider.Base(history_snapshot_store=store)
+        d.poll_for_decision()
+        store.load.assert_called_once_with('val_run_id')
+        history.update.assert_called_once_with(init_response)
+        assert d.history == history
+
+    def test_poll_for_decisions_snapshot_not_continued(self, mocker, init_response):
+        mocker.patch('floto.api.Swf.poll_for_decision_task_page', return_value=init_response)
+        history = Mock()
+        history.update.return_value = False
+        store = Mock()
+        store.load.return_value = history
+        d = floto.decider.Base(history_snapshot_store=store)
+        d.poll_for_decision()
+        assert isinstance(d.history, floto.History)
+
+    def test_complete_saves_history_snapshot(self, mocker):
+        client_mock = type("ClientMock", (object,), {'respond_decision_task_completed':Mock()})
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=client_mock())
+        store = Mock()
+        d = floto.decider.Base(history_snapshot_store=store)
+        d.run_id = 'rid'
+        d.history = Mock()
+        d.complete()
+        store.save.assert_called_once_with('rid', d.history)
+
+        d.terminate_workflow = True
+        d.complete()
+        store.remove.assert_called_once_with('rid')
+        assert store.save.call_count == 1
+
+    def test_complete_snapshot_error(self, mocker):
+        client_mock = type("ClientMock", (object,), {'respond_decision_task_completed':Mock()})
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=client_mock())
+        store = Mock()
+        store.save.side_effect = OSError('disk full')
+        d = floto.decider.Base(history_snapshot_store=store)
+        d.history = Mock()
+        d.complete()
+
+    def test_complete_removes_cached_history(self, mocker):
+        client_mock = type("ClientMock", (object,), {'respond_decision_task_completed':Mock()})
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=client_mock())
+        cache = floto.HistoryCache()
+        cache.put('rid', 'history')
+        d = floto.decider.Base(history_cache=cache)
+        d.run_id = 'rid'
+        d.terminate_workflow = True
+        d.complete()
+        assert 'rid' not in cache
+
     def test_poll_for_decisions_with_empty_response(self, mocker):
         mocker.patch('floto.api.Swf.poll_for_decision_task_page', return_value={})
         d = floto.decider.Base()
@@ -107,4 +194,15 @@ class TestBase:
 
         
 
-
+    def test_copy_for_decision_task(self):
+        d = floto.decider.Base(swf='swf')
+        d.history_cache = floto.HistoryCache()
+        d.task_token = 'token'
+        d.decisions = ['d']
+        copy = d.copy_for_decision_task()
+        assert copy.swf == 'swf'
+        assert copy.history_cache is d.history_cache
+        assert copy.task_token is None
+        assert copy.decisions == []
+        copy.decisions.append('d2')
+        assert d.decisions == ['d']
@@ -0,0 +1,101 @@
+import datetime
+import queue
+from unittest.mock import Mock
+
+import pytest
+
+import floto.decider
+from floto.specs import ActivityTask, DeciderSpec
+
+
+@pytest.fixture
+def json_spec():
+    return DeciderSpec(activity_tasks=[ActivityTask(name='a', version='v1',
+                                                    activity_id='a')]).to_json()
+
+
+@pytest.fixture
+def pool():
+    pool = floto.decider.ChildDeciderPool(domain='d', number_workers=2, max_children=3)
+    pool._inboxes = [queue.Queue(), queue.Queue()]
+    return pool
+
+
+def decision_task(workflow_id):
+    return {'taskToken': 'token_' + workflow_id,
+            'workflowExecution': {'runId': 'r', 'workflowId': workflow_id},
+            'workflowType': {'name': 'child_workflow', 'version': 'v1'},
+            'startedEventId': 3,
+            'previousStartedEventId': 0,
+            'events': [{'eventId': 1, 'eventType': 'WorkflowExecutionStarted',
+                        'eventTimestamp': datetime.datetime(2016, 1, 1),
+                        'workflowExecutionStartedEventAttributes': {}}]}
+
+
+class TestChildDeciderPool(object):
+    def test_submit(self, pool, json_spec):
+        assert pool.submit('wf1', json_spec) == 'floto_children_0'
+        assert pool.submit('wf2', json_spec) == 'floto_children_1'
+        assert pool.submit('wf3', json_spec) == 'floto_children_0'
+        assert pool._inboxes[1].get_nowait() == ('register', 'wf2', json_spec)
+        assert pool.metrics['active_children'] == 3
+        assert pool.metrics['children_per_worker'] == [2, 1]
+
+    def test_submit_raises_if_full(self, pool, json_spec):
+        for i in range(3):
+            pool.submit('wf{}'.format(i), json_spec)
+        assert pool.is_full
+        with pytest.raises(RuntimeError):
+            pool.submit('wf4', json_spec)
+
+    def test_release(self, pool, json_spec):
+        pool.submit('wf1', json_spec)
+        pool.release('wf1')
+        pool.release('unknown')
+        assert pool.metrics['active_children'] == 0
+        pool._inboxes[0].get_nowait()
+        assert pool._inboxes[0].get_nowait() == ('unregister', 'wf1')
+
+    def test_queue(self, pool, json_spec):
+        for i in range(3):
+            pool.submit('wf{}'.format(i), json_spec)
+        pool.enqueue(json_spec, 'decision')
+        assert pool.metrics['queued_children'] == 1
+        assert pool.next_queued() is None
+        pool.release('wf0')
+        assert pool.next_queued() == (json_spec, 'decision')
+        assert pool.next_queued() is None
+
+    def test_reap(self, pool, json_spec, mocker):
+        pool.submit('wf1', json_spec)
+        pool._processes = [Mock(is_alive=Mock(return_value=False)),
+                           Mock(is_alive=Mock(return_value=True))]
+        start_worker = mocker.patch.object(pool, '_start_worker')
+        assert pool.reap() == 1
+        start_worker.assert_called_once_with(0)
+        assert pool._inboxes[0].get_nowait() == ('register', 'wf1', json_spec)
+        assert pool._inboxes[0].get_nowait() == ('register', 'wf1', json_spec)
+
+    def test_run_worker(self, json_spec):
+        swf = Mock()
+        swf.poll_for_decision_task_page.side_effect = [decision_task('wf1'), {}]
+        inbox = queue.Queue()
+        inbox.put(('register', 'wf1', json_spec))
+        floto.decider.ChildDeciderPool.run_worker('d', 'tl', inbox, swf=swf, max_polls=2)
+        call = swf.client.respond_decision_task_completed.call_args
+        assert call[1]['taskToken'] == 'token_wf1'
+        assert call[1]['decisions'][0]['decisionType'] == 'ScheduleActivityTask'
+
+    def test_run_worker_unknown_workflow(self, mocker):
+        mocker.patch.object(floto.decider.ChildDeciderPool, 'REGISTRATION_TIMEOUT', 0.01)
+        swf = Mock()
+        swf.poll_for_decision_task_page.side_effect = [decision_task('wf1')]
+        floto.decider.ChildDeciderPool.run_worker('d', 'tl', queue.Queue(), swf=swf, max_polls=1)
+        assert not swf.client.respond_decision_task_completed.called
+
+    def test_run_worker_stop(self):
+        swf = Mock()
+        inbox = queue.Queue()
+        inbox.put(('stop',))
+        floto.decider.ChildDeciderPool.run_worker('d', 'tl', inbox, swf=swf, max_polls=1)
+        assert not swf.poll_for_decision_task_page.called
@@ -0,0 +1,109 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+import floto
+import floto.decider
+
+
+class SwfStub(object):
+    """Serves the decision tasks <run_ids>, then empty polls."""
+
+    def __init__(self, run_ids):
+        self.run_ids = list(run_ids)
+        self.completed = []
+        self.lock = threading.Lock()
+        self.client = self
+
+    def poll_for_decision_task_page(self, domain=None, task_list=None):
+        with self.lock:
+            if not self.run_ids:
+                return {}
+            run_id = self.run_ids.pop(0)
+        return {'taskToken': 'token_' + run_id,
+                'workflowExecution': {'runId': run_id, 'workflowId': 'wid'},
+                'startedEventId': 3,
+                'previousStartedEventId': 0,
+                'events': [{'eventId': 1, 'eventType': 'WorkflowExecutionStarted',
+                            'eventTimestamp': datetime.datetime(2016, 1, 1)}]}
+
+    def respond_decision_task_completed(self, taskToken=None, decisions=None):
+        with self.lock:
+            self.completed.append(taskToken)
+
+
+class RecordingDecider(floto.decider.Base):
+    def __init__(self, swf):
+        super().__init__(swf=swf)
+        self.domain = 'd'
+        self.task_list = 'tl'
+        self.decided_runs = []
+        self.blocking_run = None
+        self.unblock = threading.Event()
+
+    def get_decisions(self):
+        if self.run_id == self.blocking_run:
+            assert self.unblock.wait(timeout=5)
+        self.decided_runs.append((self.run_id, self.history.decision_task_started_event_id))
+
+
+@pytest.fixture
+def swf():
+    return SwfStub(['r{}'.format(i) for i in range(10)])
+
+
+class TestConcurrentDecider(object):
+    def test_run(self, swf):
+        decider = RecordingDecider(swf)
+        concurrent = floto.decider.ConcurrentDecider(decider, number_pollers=2, number_workers=3)
+        concurrent.max_polls = 12
+        concurrent.run()
+
+        assert sorted(swf.completed) == sorted('token_r{}'.format(i) for i in range(10))
+        assert sorted(decider.decided_runs) == sorted(('r{}'.format(i), 3) for i in range(10))
+        assert concurrent.number_polls == 12
+        assert concurrent.number_decision_tasks == 10
+
+    def test_phase_timings(self, swf):
+        concurrent = floto.decider.ConcurrentDecider(RecordingDecider(swf), number_workers=1)
+        concurrent.max_polls = 10
+        concurrent.run()
+        timings = concurrent.phase_timings
+        assert timings['poll']['count'] == 10
+        for phase in ['queue', 'history', 'decide', 'complete']:
+            assert timings[phase]['count'] == 10
+            assert timings[phase]['max_seconds'] >= timings[phase]['mean_seconds'] >= 0
+
+    def test_slow_decision_task_does_not_block_others(self, swf):
+        decider = RecordingDecider(swf)
+        decider.blocking_run = 'r0'
+        concurrent = floto.decider.ConcurrentDecider(decider, number_pollers=1, number_workers=2)
+        concurrent.max_polls = 10
+        concurrent.start()
+        for poller in concurrent._pollers:
+            poller.join()
+        deadline = time.time() + 5
+        while concurrent.number_decision_tasks < 9 and time.time() < deadline:
+            time.sleep(0.01)
+        assert 'token_r0' not in swf.completed
+        decider.unblock.set()
+        concurrent.join()
+        assert 'token_r0' in swf.completed
+
+    def test_errors_are_counted(self, swf, mocker):
+        decider = RecordingDecider(swf)
+        mocker.patch.object(RecordingDecider, 'get_decisions', side_effect=Exception('e'))
+        concurrent = floto.decider.ConcurrentDecider(decider, number_workers=2)
+        concurrent.max_polls = 10
+        concurrent.run()
+        assert concurrent.number_errors == 10
+        assert concurrent.number_decision_tasks == 0
+
+    def test_stop(self, swf):
+        concurrent = floto.decider.ConcurrentDecider(RecordingDecider(swf))
+        concurrent.start()
+        concurrent.stop()
+        concurrent.join()
+        assert not any(t.is_alive() for t in concurrent._pollers + concurrent._workers)
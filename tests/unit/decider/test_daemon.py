@@ -63,6 +63,54 @@ class TestDaemon():
         assert spec.domain == 'd'
         assert spec.activity_tasks[0].name == 'at'
 
+    def test_get_decider_spec_uses_cache(self, json_decider_spec, daemon):
+        spec1 = daemon.get_decider_spec(json_decider_spec, 'tl1', 'd')
+        spec2 = daemon.get_decider_spec(json_decider_spec, 'tl2', 'd')
+        assert (spec1.task_list, spec2.task_list) == ('tl1', 'tl2')
+        assert spec1.activity_tasks is spec2.activity_tasks
+        assert daemon.decider_spec_cache.hits == 1
 
+    def test_start_child_decider_uses_cached_graph(self, json_decider_spec, daemon, mocker):
+        mocker.patch('floto.decider.Decider.run')
+        decider_init = mocker.spy(floto.decider.Decider, '__init__')
+        spec = daemon.get_decider_spec(json_decider_spec, 'tl1', 'd')
+        daemon.start_child_decider(spec)
+        decider_init.assert_called_once_with(mocker.ANY, decider_spec=spec,
+                                             spec_cache=daemon.decider_spec_cache)
 
+    def test_get_decision_child_workflow_with_pool(self, daemon, json_decider_spec, mocker):
+        daemon.child_decider_pool = floto.decider.ChildDeciderPool(domain='d', max_children=1)
+        start_child_decider = mocker.patch('floto.decider.Daemon.start_child_decider')
+        signal_event = {'eventType':'WorkflowExecutionSignaled',
+                        'workflowExecutionSignaledEventAttributes':{
+                            'signalName':'startChildWorkflowExecution',
+                            'input':{'decider_spec':json_decider_spec}}}
+        decision = daemon.get_decision_child_workflow(signal_event)
+        assert decision.task_list == {'name': 'floto_children_0'}
+        assert decision.workflow_id in daemon.child_decider_pool.active
+        assert not start_child_decider.called
+
+        assert daemon.get_decision_child_workflow(signal_event) is None
+        assert daemon.child_decider_pool.metrics['queued_children'] == 1
+
+        daemon.child_decider_pool.release(decision.workflow_id)
+        decisions = daemon.get_decisions_queued_child_workflows()
+        assert len(decisions) == 1
+        assert decisions[0].task_list == {'name': 'floto_children_0'}
 
+    def test_release_closed_child_workflows(self, daemon, mocker):
+        daemon.child_decider_pool = floto.decider.ChildDeciderPool(domain='d')
+        completed = {'eventType': 'ChildWorkflowExecutionCompleted',
+                     'childWorkflowExecutionCompletedEventAttributes': {
+                         'workflowExecution': {'workflowId': 'wf1', 'runId': 'r'}}}
+        failed = {'eventType': 'StartChildWorkflowExecutionFailed',
+                  'startChildWorkflowExecutionFailedEventAttributes': {'workflowId': 'wf2'}}
+        events = {'ChildWorkflowExecutionCompleted': [completed],
+                  'StartChildWorkflowExecutionFailed': [failed]}
+        mocker.patch('floto.History.get_events_up_to_last_decision',
+                     side_effect=lambda event_type: events.get(event_type, []))
+        release = mocker.patch('floto.decider.ChildDeciderPool.release')
+        reap = mocker.patch('floto.decider.ChildDeciderPool.reap')
+        daemon.release_closed_child_workflows()
+        assert [c[0][0] for c in release.call_args_list] == ['wf1', 'wf2']
+        assert reap.called
@@ -71,13 +71,34 @@ class TestDecider():
         d =  floto.decider.Decider(decider_spec=decider_spec_json)
         assert isinstance(d.decision_builder.execution_graph, floto.decider.ExecutionGraph)
 
+    def test_init_with_spec_cache(self, decider_spec_json):
+        cache = floto.decider.DeciderSpecCache()
+        d1 = floto.decider.Decider(decider_spec=decider_spec_json, spec_cache=cache)
+        d2 = floto.decider.Decider(decider_spec=decider_spec_json, spec_cache=cache)
+        assert d1.decider_spec is d2.decider_spec
+        assert d1.decision_builder.execution_graph is d2.decision_builder.execution_graph
+
+    def test_copy_for_decision_task(self, decider):
+        copy = decider.copy_for_decision_task()
+        assert copy.decision_builder is not decider.decision_builder
+        assert copy.decision_builder.execution_graph is decider.decision_builder.execution_graph
+
     def test_get_decisions(self, decider, mocker):
         mocker.patch('floto.decider.DecisionBuilder.get_decisions', return_value=['d'])
         mocker.patch('floto.decider.DecisionBuilder.is_terminate_workflow', return_value=True)
-        mocker.patch('floto.decider.Base.get_workflow_execution_description', return_value='desc')
+        describe = mocker.patch('floto.decider.Base.get_workflow_execution_description')
         decider.get_decisions()
         assert decider.decisions == ['d']
         assert decider.terminate_workflow == True
+        assert decider.decision_builder.current_workflow_execution_description == None
+        assert not describe.called
+
+    def test_get_decisions_verify_open_counts(self, decider, mocker):
+        mocker.patch('floto.decider.DecisionBuilder.get_decisions', return_value=['d'])
+        mocker.patch('floto.decider.DecisionBuilder.is_terminate_workflow', return_value=True)
+        mocker.patch('floto.decider.Base.get_workflow_execution_description', return_value='desc')
+        decider.verify_open_counts = True
+        decider.get_decisions()
         assert decider.decision_builder.current_workflow_execution_description == 'desc'
 
     def test_tear_down_do_not_repeat(self, decider):
@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+import floto.decider
+from floto.specs import ActivityTask, DeciderSpec
+
+
+@pytest.fixture
+def json_spec():
+    t1 = ActivityTask(name='t1', version='v1', activity_id='t1')
+    t2 = ActivityTask(name='t2', version='v1', activity_id='t2', requires=[t1])
+    return DeciderSpec(domain='d', task_list='tl', activity_tasks=[t1, t2]).to_json()
+
+
+class TestDeciderSpecCache(object):
+    def test_key_is_canonical(self, json_spec):
+        reformatted = json.dumps(json.loads(json_spec), indent=4)
+        assert floto.decider.DeciderSpecCache.key(reformatted) == \
+            floto.decider.DeciderSpecCache.key(json_spec)
+
+    def test_get(self, json_spec):
+        cache = floto.decider.DeciderSpecCache()
+        spec = cache.get(json_spec)
+        assert [t.id_ for t in spec.activity_tasks] == ['t1', 't2']
+        assert cache.get(json.dumps(json.loads(json_spec), indent=2)) is spec
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_get_decider_spec_object(self, json_spec):
+        cache = floto.decider.DeciderSpecCache()
+        spec = cache.get(json_spec)
+        assert cache.get(DeciderSpec.from_json(json_spec)) is spec
+
+    def test_execution_graph(self, json_spec):
+        cache = floto.decider.DeciderSpecCache()
+        spec = cache.get(json_spec)
+        graph = cache.execution_graph(spec.activity_tasks)
+        assert graph.successors == [[1], []]
+        assert cache.execution_graph(spec.activity_tasks) is graph
+        assert cache.execution_graph(list(spec.activity_tasks)) is not graph
+
+    def test_lru_eviction(self, json_spec):
+        cache = floto.decider.DeciderSpecCache(max_size=1)
+        spec = cache.get(json_spec)
+        cache.get(DeciderSpec(domain='d', task_list='other', activity_tasks=[]).to_json())
+        assert len(cache) == 1
+        assert cache.get(json_spec) is not spec
+
+    def test_compile_raises_for_invalid_spec(self):
+        t1 = ActivityTask(name='t1', version='v1', activity_id='t1')
+        t2 = ActivityTask(name='t2', version='v1', activity_id='t1')
+        json_spec = DeciderSpec(activity_tasks=[t1, t2]).to_json()
+        cache = floto.decider.DeciderSpecCache()
+        with pytest.raises(ValueError):
+            cache.get(json_spec)
+        assert not len(cache)
+
+    def test_directory(self, json_spec, tmpdir):
+        directory = str(tmpdir.join('specs'))
+        floto.decider.DeciderSpecCache(directory=directory).get(json_spec)
+        key = floto.decider.DeciderSpecCache.key(json_spec)
+        assert os.listdir(directory) == [key + '.pickle']
+
+        cache = floto.decider.DeciderSpecCache(directory=directory)
+        spec = cache.get(json_spec)
+        assert cache.disk_hits == 1
+        assert cache.execution_graph(spec.activity_tasks).ids == ['t1', 't2']
+
+    def test_directory_with_corrupt_file(self, json_spec, tmpdir):
+        key = floto.decider.DeciderSpecCache.key(json_spec)
+        tmpdir.join(key + '.pickle').write('corrupt')
+        cache = floto.decider.DeciderSpecCache(directory=str(tmpdir))
+        assert cache.get(json_spec).task_list == 'tl'
+        assert cache.disk_hits == 0
@@ -329,6 +329,24 @@ class TestDecisionBuilder(object):
         builder.current_workflow_execution_description = None
         assert not builder.open_task_counts()
 
+    @pytest.mark.parametrize('counts,assertion', [
+        ({'openActivityTasks':0, 'openTimers':0}, False),
+        ({'openActivityTasks':2, 'openTimers':0}, True),
+        ({'openActivityTasks':0, 'openTimers':1}, True)])
+    def test_open_task_counts_from_history(self, mocker, builder, counts, assertion):
+        mocker.patch('floto.History.get_open_task_counts', return_value=counts)
+        builder.current_workflow_execution_description = None
+        assert builder.open_task_counts() == assertion
+
+    def test_open_task_counts_description_differs(self, mocker, builder):
+        mocker.patch('floto.History.get_open_task_counts',
+                     return_value={'openActivityTasks':1, 'openTimers':0})
+        logger = mocker.patch('floto.decider.decision_builder.logger')
+        builder.current_workflow_execution_description = {'openCounts':{'openActivityTasks':0,
+                                                                        'openTimers':0}}
+        assert not builder.open_task_counts()
+        assert logger.warning.called
+
     def test_get_task_to_be_scheduled(self, builder):
         a = floto.specs.ActivityTask(name='a', version='v', activity_id='a')
         b = floto.specs.ActivityTask(name='b', version='v', activity_id='b')
@@ -365,6 +383,44 @@ class TestDecisionBuilder(object):
         assert d.get_tasks_to_be_scheduled_single_id('a') == [c]
         assert [t.id_ for t in d.get_tasks_to_be_scheduled_single_id('b')] == ['c', 'd']
 
+    def test_get_task_to_be_scheduled_keeps_scheduler(self, builder, empty_history):
+        a = floto.specs.ActivityTask(name='a', version='v', activity_id='a')
+        b = floto.specs.ActivityTask(name='b', version='v', activity_id='b', requires=[a])
+        builder.execution_graph = floto.decider.ExecutionGraph(activity_tasks=[a, b])
+        builder.history = empty_history
+        builder.history.is_task_completed = lambda x: True
+        assert builder.get_tasks_to_be_scheduled(['a']) == [b]
+
+        builder.history.is_task_completed = lambda x: False
+        assert builder.get_tasks_to_be_scheduled(['a']) == [b]
+
+    def test_get_decisions_keeps_scheduler(self, mocker, builder, empty_history):
+        mocker.patch('floto.decider.DecisionBuilder._collect_decisions',
+                     side_effect=lambda *args: builder.scheduler and [])
+        empty_history.previous_decision_id = 5
+        empty_history.decision_task_started_event_id = 9
+        builder.get_decisions(empty_history)
+        scheduler = builder.scheduler
+        assert scheduler.decision_id == 9
+
+        empty_history.previous_decision_id = 9
+        empty_history.decision_task_started_event_id = 12
+        builder.get_decisions(empty_history)
+        assert builder.scheduler is scheduler
+
+    def test_get_decisions_rebuilds_outdated_scheduler(self, mocker, builder, empty_history):
+        mocker.patch('floto.decider.DecisionBuilder._collect_decisions',
+                     side_effect=lambda *args: builder.scheduler and [])
+        empty_history.previous_decision_id = 5
+        empty_history.decision_task_started_event_id = 9
+        builder.get_decisions(empty_history)
+        scheduler = builder.scheduler
+
+        empty_history.previous_decision_id = 12
+        empty_history.decision_task_started_event_id = 15
+        builder.get_decisions(empty_history)
+        assert builder.scheduler is not scheduler
+
     def test_uniqify_activity_tasks_single_tasks(self, builder):
         t1 = floto.specs.ActivityTask(name='t1', version='v', activity_id='t1')
         tasks = builder.uniqify_activity_tasks([t1])
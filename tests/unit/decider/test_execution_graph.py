@@ -109,3 +109,50 @@ class TestExecutionGraph():
         assert set([e.id_ for e in outgoing]) == set(['t3:1', 't4:1'])
 
 
+    def test_transitive_reduction_diamond(self):
+        a = ActivityTask(activity_id='a', name='a', version='1')
+        b = ActivityTask(activity_id='b', name='b', version='1', requires=[a])
+        c = ActivityTask(activity_id='c', name='c', version='1', requires=[a])
+        d = ActivityTask(activity_id='d', name='d', version='1', requires=[a, b, c])
+        e = ActivityTask(activity_id='e', name='e', version='1', requires=[d, a, b])
+        g = floto.decider.ExecutionGraph(activity_tasks=[e, d, c, b, a])
+        assert [t.id_ for t in g.get_depending_tasks('a')] == ['c', 'b']
+        assert [t.id_ for t in g.get_depending_tasks('b')] == ['d']
+        assert [t.id_ for t in g.get_depending_tasks('d')] == ['e']
+        assert g.get_depending_tasks('e') == []
+
+    def test_topological_order(self):
+        t1 = ActivityTask(activity_id='t1', name='t1', version='1')
+        t2 = ActivityTask(activity_id='t2', name='t2', version='1', requires=[t1])
+        t3 = ActivityTask(activity_id='t3', name='t3', version='1', requires=[t2])
+        g = floto.decider.ExecutionGraph(activity_tasks=[t3, t1, t2])
+        assert [g.idx_to_id[idx] for idx in g.topological_order()] == ['t1', 't2', 't3']
+
+    def test_topological_order_raises_for_cycles(self):
+        t1 = ActivityTask(activity_id='t1', name='t1', version='1')
+        t2 = ActivityTask(activity_id='t2', name='t2', version='1', requires=[t1])
+        t1.requires = [t2]
+        g = floto.decider.ExecutionGraph(activity_tasks=[t1, t2])
+        with pytest.raises(ValueError):
+            g.topological_order()
+
+    def test_has_depending_tasks(self):
+        t1 = ActivityTask(activity_id='t1', name='t1', version='1')
+        t2 = ActivityTask(activity_id='t2', name='t2', version='1', requires=[t1, t1])
+        g = floto.decider.ExecutionGraph(activity_tasks=[t1, t2])
+        assert g.has_depending_tasks('t1')
+        assert not g.has_depending_tasks('t2')
+        assert g.predecessors == [[], [0]]
+
+    def test_first_and_outgoing_vertices_are_cached(self, mocker):
+        t1 = ActivityTask(activity_id='t1', name='t1', version='1')
+        t2 = ActivityTask(activity_id='t2', name='t2', version='1', requires=[t1])
+        g = floto.decider.ExecutionGraph(activity_tasks=[t1, t2])
+        assert g.get_first_tasks() == [t1]
+        assert g.outgoing_vertices() == [t2]
+        mocker.patch('floto.decider.ExecutionGraph.generate_adjacency_lists')
+        g.get_first_tasks().append(t2)
+        assert g.get_first_tasks() == [t1]
+        assert g.outgoing_vertices() == [t2]
+        assert not g.generate_adjacency_lists.called
+
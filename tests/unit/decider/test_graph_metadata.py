@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import floto.decider
+from floto.specs import ActivityTask, Timer
+
+
+@pytest.fixture
+def graph():
+    a = ActivityTask(activity_id='a', name='a', version='1', estimated_duration=10)
+    b = ActivityTask(activity_id='b', name='b', version='1', requires=[a], estimated_duration=5)
+    c = ActivityTask(activity_id='c', name='c', version='1', requires=[a], estimated_duration=1)
+    t = Timer(id_='t', requires=[c], delay_in_seconds=30)
+    d = ActivityTask(activity_id='d', name='d', version='1', requires=[b, t])
+    e = ActivityTask(activity_id='e', name='e', version='1')
+    return floto.decider.ExecutionGraph(activity_tasks=[d, t, c, b, a, e])
+
+
+class TestGraphMetadata(object):
+    def test_order(self, graph):
+        order = graph.metadata.order
+        assert sorted(order) == ['a', 'b', 'c', 'd', 'e', 't']
+        for task in graph.tasks:
+            for required in task.requires or []:
+                assert order.index(required.id_) < order.index(task.id_)
+
+    def test_levels(self, graph):
+        metadata = graph.metadata
+        assert metadata.levels == {'a': 0, 'e': 0, 'b': 1, 'c': 1, 't': 2, 'd': 3}
+        assert metadata.level('t') == 2
+        assert metadata.level_widths == [2, 2, 1, 1]
+        assert metadata.max_width == 2
+
+    def test_heights(self, graph):
+        assert graph.metadata.heights == {'a': 4, 'b': 2, 'c': 3, 't': 2, 'd': 1, 'e': 1}
+        assert graph.metadata.priority('c') > graph.metadata.priority('b')
+
+    def test_longest_path(self, graph):
+        assert graph.metadata.longest_path == ['a', 'c', 't', 'd']
+        assert graph.metadata.longest_path_length == 4
+
+    def test_critical_path(self, graph):
+        metadata = graph.metadata
+        assert metadata.critical_path == ['a', 'c', 't', 'd']
+        assert metadata.critical_path_duration == 41
+        assert metadata.earliest_finish['b'] == 15
+
+    def test_critical_path_without_durations(self):
+        a = ActivityTask(activity_id='a', name='a', version='1')
+        metadata = floto.decider.ExecutionGraph(activity_tasks=[a]).metadata
+        assert metadata.critical_path is None
+        assert metadata.critical_path_duration is None
+
+    def test_metadata_is_cached(self, graph):
+        assert graph.metadata is graph.metadata
+
+    def test_to_json(self, graph):
+        d = json.loads(graph.metadata.to_json())
+        assert d['number_tasks'] == 6
+        assert d['number_edges'] == 5
+        assert d['max_width'] == 2
+        assert d['critical_path'] == ['a', 'c', 't', 'd']
@@ -0,0 +1,63 @@
+import pytest
+
+import floto.decider
+from floto.specs import ActivityTask
+
+
+@pytest.fixture
+def tasks():
+    a = ActivityTask(name='a', version='v', activity_id='a')
+    b = ActivityTask(name='b', version='v', activity_id='b')
+    c = ActivityTask(name='c', version='v', activity_id='c', requires=[a, b])
+    d = ActivityTask(name='d', version='v', activity_id='d', requires=[b])
+    e = ActivityTask(name='e', version='v', activity_id='e', requires=[c, d])
+    return {t.id_: t for t in [a, b, c, d, e]}
+
+
+@pytest.fixture
+def scheduler(tasks):
+    graph = floto.decider.ExecutionGraph(activity_tasks=list(tasks.values()))
+    scheduler = floto.decider.ReadySetScheduler(graph)
+    scheduler.build(lambda t: False)
+    return scheduler
+
+
+class TestReadySetScheduler(object):
+    def test_build(self, scheduler):
+        assert scheduler.remaining_dependencies('a') == 0
+        assert scheduler.remaining_dependencies('c') == 2
+        assert scheduler.remaining_dependencies('e') == 2
+        assert scheduler.ready == {'a', 'b'}
+
+    def test_build_from_completed_tasks(self, scheduler):
+        scheduler.build(lambda t: t.id_ in ['a', 'b'])
+        assert scheduler.remaining_dependencies('c') == 0
+        assert scheduler.remaining_dependencies('e') == 2
+        assert scheduler.is_completed('a')
+        assert scheduler.ready == {'c', 'd'}
+
+    def test_build_only_looks_up_required_tasks(self, scheduler):
+        looked_up = []
+        scheduler.build(lambda t: looked_up.append(t.id_))
+        assert sorted(looked_up) == ['a', 'b', 'c', 'd']
+
+    def test_complete(self, scheduler, tasks):
+        assert scheduler.complete('a') == []
+        assert scheduler.complete('b') == [tasks['c'], tasks['d']]
+        assert scheduler.ready == {'c', 'd'}
+        assert scheduler.complete('c') == []
+        assert scheduler.complete('d') == [tasks['e']]
+        assert scheduler.ready == {'e'}
+
+    def test_complete_twice(self, scheduler, tasks):
+        scheduler.complete('b')
+        assert scheduler.complete('b') == [tasks['d']]
+        assert scheduler.remaining_dependencies('c') == 1
+
+    def test_complete_after_build(self, scheduler, tasks):
+        scheduler.build(lambda t: t.id_ in ['a', 'b'])
+        assert scheduler.complete('a') == [tasks['c']]
+
+    def test_complete_unknown_task(self, scheduler):
+        with pytest.raises(KeyError):
+            scheduler.complete('x')
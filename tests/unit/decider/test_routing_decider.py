@@ -0,0 +1,117 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+import floto
+import floto.decider
+from floto.specs import ActivityTask, DeciderSpec
+
+
+@pytest.fixture
+def spec_a():
+    return DeciderSpec(activity_tasks=[ActivityTask(name='a', version='v1', activity_id='a')])
+
+
+@pytest.fixture
+def spec_b():
+    return DeciderSpec(activity_tasks=[ActivityTask(name='b', version='v1', activity_id='b')])
+
+
+@pytest.fixture
+def router(spec_a, spec_b):
+    router = floto.decider.RoutingDecider(domain='d', task_list='tl', swf=Mock())
+    router.register(spec_a, workflow_type_name='wf_a', workflow_type_version='v1')
+    router.register(spec_b, workflow_type_name='wf_b')
+    return router
+
+
+@pytest.fixture
+def history(init_response):
+    return floto.History(domain='d', task_list='tl', response=init_response)
+
+
+def workflow_type(name, version):
+    return {'workflowType': {'name': name, 'version': version}}
+
+
+class TestRoutingDecider(object):
+    def test_register(self, router, spec_a):
+        decider = router.register(spec_a, workflow_type_name='wf')
+        assert decider.swf is router.swf
+        assert (decider.domain, decider.task_list) == ('d', 'tl')
+        assert spec_a.domain is None
+        assert decider.decider_spec.activity_tasks is spec_a.activity_tasks
+
+    def test_register_json_with_spec_cache(self, spec_a):
+        router = floto.decider.RoutingDecider(domain='d', task_list='tl', swf=Mock(),
+                                              spec_cache=floto.decider.DeciderSpecCache())
+        d1 = router.register(spec_a.to_json(), workflow_type_name='wf1')
+        d2 = router.register(spec_a.to_json(), workflow_type_name='wf2')
+        assert d1.decision_builder.execution_graph is d2.decision_builder.execution_graph
+
+    def test_register_raises_without_key(self, router, spec_a):
+        with pytest.raises(ValueError):
+            router.register(spec_a)
+
+    def test_get_decider_by_workflow_type(self, router, history):
+        decider_a = router.get_decider(workflow_type('wf_a', 'v1'), history)
+        assert decider_a.decider_spec.activity_tasks[0].id_ == 'a'
+        assert router.get_decider(workflow_type('wf_a', 'v2'), history) is None
+        decider_b = router.get_decider(workflow_type('wf_b', 'v7'), history)
+        assert decider_b.decider_spec.activity_tasks[0].id_ == 'b'
+
+    def test_get_decider_by_spec_id(self, router, history, spec_a, mocker):
+        decider = router.register(spec_a, spec_id='spec_a')
+        mocker.patch('floto.History.get_workflow_input', return_value={'decider_spec_id':
+                                                                          'spec_a'})
+        assert router.get_decider(workflow_type('wf_b', 'v1'), history) is decider
+
+    def test_get_decisions(self, router, history, init_response):
+        router.last_response = dict(init_response, **workflow_type('wf_b', 'v1'))
+        router.history = history
+        router.run_id = 'val_run_id'
+        router.get_decisions()
+        assert [d.activity_id for d in router.decisions] == ['b']
+        assert not router.terminate_workflow
+
+    def test_unknown_workflow_type_is_not_completed(self, router, history, init_response):
+        router.last_response = dict(init_response, **workflow_type('unknown', 'v1'))
+        router.history = history
+        router.get_decisions()
+        router.complete()
+        assert not router.swf.client.respond_decision_task_completed.called
+
+    def test_complete(self, router, history, init_response):
+        router.last_response = dict(init_response, **workflow_type('wf_a', 'v1'))
+        router.task_token = 'token'
+        router.history = history
+        router.get_decisions()
+        router.complete()
+        call = router.swf.client.respond_decision_task_completed.call_args
+        assert call[1]['taskToken'] == 'token'
+        assert len(call[1]['decisions']) == 1
+
+    def test_tear_down_keeps_router_running(self, router, history, init_response, mocker):
+        router.last_response = dict(init_response, **workflow_type('wf_a', 'v1'))
+        router.history = history
+        router.get_decisions()
+        router.terminate_workflow = True
+        router.complete()
+        assert not router.terminate_decider
+
+    def test_route_by_workflow_id(self, router, history, init_response, spec_b):
+        decider = router.register(spec_b, workflow_id='val_workflow_id')
+        assert router.get_decider(init_response, history) is decider
+        router.unregister('val_workflow_id')
+        assert router.get_decider(init_response, history) is None
+
+    def test_terminated_workflow_is_unregistered(self, router, history, init_response, spec_b):
+        router.register(spec_b, workflow_id='val_workflow_id')
+        router.last_response = init_response
+        router.history = history
+        router.workflow_id = 'val_workflow_id'
+        router.get_decisions()
+        router.terminate_workflow = True
+        router.complete()
+        assert router.number_workflow_id_routes == 0
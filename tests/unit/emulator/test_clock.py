@@ -0,0 +1,30 @@
+import datetime as dt
+
+import pytest
+
+import floto.emulator
+
+
+class TestClock(object):
+    def test_real_time_clock(self):
+        clock = floto.emulator.Clock()
+        now = dt.datetime.now(dt.timezone.utc)
+        assert abs((clock.now() - now).total_seconds()) < 1
+
+    def test_real_time_clock_advance(self):
+        clock = floto.emulator.Clock()
+        clock.advance(3600)
+        now = dt.datetime.now(dt.timezone.utc)
+        assert abs((clock.now() - now).total_seconds() - 3600) < 1
+
+    def test_manual_clock(self):
+        start = dt.datetime(2016, 1, 1, tzinfo=dt.timezone.utc)
+        clock = floto.emulator.Clock(manual=True, start=start)
+        assert clock.now() == start
+        clock.advance(60)
+        assert clock.now() == start + dt.timedelta(seconds=60)
+        assert clock.time() == start.timestamp() + 60
+
+    def test_advance_raises(self):
+        with pytest.raises(ValueError):
+            floto.emulator.Clock().advance(-1)
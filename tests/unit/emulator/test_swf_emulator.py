@@ -0,0 +1,663 @@
+import datetime as dt
+import threading
+
+import botocore.exceptions
+import pytest
+
+import floto
+import floto.api
+import floto.decider
+import floto.emulator
+from floto.specs import ActivityTask, DeciderSpec
+
+START = dt.datetime(2016, 1, 1, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def emulator():
+    clock = floto.emulator.Clock(manual=True, start=START)
+    emulator = floto.emulator.SwfEmulator(clock=clock, poll_timeout=0.01)
+    emulator.register_domain(name='d', workflowExecutionRetentionPeriodInDays='1')
+    emulator.register_workflow_type(domain='d', name='wf', version='v1',
+                                    defaultTaskList={'name': 'dtl'},
+                                    defaultTaskStartToCloseTimeout='10',
+                                    defaultExecutionStartToCloseTimeout='100',
+                                    defaultChildPolicy='TERMINATE')
+    emulator.register_activity_type(domain='d', name='act', version='v1',
+                                    defaultTaskList={'name': 'atl'},
+                                    defaultTaskStartToCloseTimeout='20',
+                                    defaultTaskHeartbeatTimeout='5',
+                                    defaultTaskScheduleToStartTimeout='30',
+                                    defaultTaskScheduleToCloseTimeout='60')
+    return emulator
+
+
+@pytest.fixture
+def default_client_factory(emulator):
+    factory = floto.emulator.EmulatorClientFactory(emulator=emulator)
+    floto.api.ClientFactory.set_default(factory)
+    yield factory
+    floto.api.ClientFactory.set_default(None)
+
+
+def start(emulator, workflow_id='wid', **kwargs):
+    return emulator.start_workflow_execution(domain='d', workflowId=workflow_id,
+                                             workflowType={'name': 'wf', 'version': 'v1'},
+                                             **kwargs)['runId']
+
+
+def poll_decision_task(emulator, **kwargs):
+    return emulator.poll_for_decision_task(domain='d', taskList={'name': 'dtl'}, **kwargs)
+
+
+def decide(emulator, *decisions):
+    task = poll_decision_task(emulator)
+    emulator.respond_decision_task_completed(taskToken=task['taskToken'],
+                                             decisions=list(decisions))
+    return task
+
+
+def poll_activity_task(emulator):
+    return emulator.poll_for_activity_task(domain='d', taskList={'name': 'atl'})
+
+
+def schedule_activity_task(activity_id='a1', **attributes):
+    attributes.update(activityType={'name': 'act', 'version': 'v1'}, activityId=activity_id)
+    return {'decisionType': 'ScheduleActivityTask',
+            'scheduleActivityTaskDecisionAttributes': attributes}
+
+
+def start_timer(timer_id='t1', seconds=30):
+    return {'decisionType': 'StartTimer',
+            'startTimerDecisionAttributes': {'timerId': timer_id,
+                                             'startToFireTimeout': str(seconds)}}
+
+
+def complete_workflow_execution(result=None):
+    decision = {'decisionType': 'CompleteWorkflowExecution'}
+    if result:
+        decision['completeWorkflowExecutionDecisionAttributes'] = {'result': result}
+    return decision
+
+
+def events(emulator, run_id, workflow_id='wid'):
+    return emulator.get_workflow_execution_history(
+        domain='d', execution={'workflowId': workflow_id, 'runId': run_id})['events']
+
+
+def event_types(emulator, run_id, workflow_id='wid'):
+    return [e['eventType'] for e in events(emulator, run_id, workflow_id)]
+
+
+def last_event(emulator, run_id, workflow_id='wid'):
+    event = events(emulator, run_id, workflow_id)[-1]
+    attributes_key = event['eventType'][:1].lower() + event['eventType'][1:] + 'EventAttributes'
+    return event['eventType'], event[attributes_key]
+
+
+def error_code(error_info):
+    return error_info.value.response['Error']['Code']
+
+
+class TestDomainsAndTypes(object):
+    def test_register_domain(self, emulator):
+        assert emulator.describe_domain(name='d')['domainInfo'] == {'name': 'd',
+                                                                    'status': 'REGISTERED'}
+
+    def test_register_domain_raises_if_domain_exists(self, emulator):
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.register_domain(name='d', workflowExecutionRetentionPeriodInDays='1')
+        assert error_code(e) == 'DomainAlreadyExistsFault'
+
+    def test_deprecate_domain(self, emulator):
+        emulator.deprecate_domain(name='d')
+        assert emulator.list_domains(registrationStatus='REGISTERED')['domainInfos'] == []
+        assert emulator.list_domains(registrationStatus='DEPRECATED')['domainInfos'][0][
+            'name'] == 'd'
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            start(emulator)
+        assert error_code(e) == 'DomainDeprecatedFault'
+
+    def test_unknown_domain(self, emulator):
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.poll_for_decision_task(domain='unknown', taskList={'name': 'dtl'})
+        assert error_code(e) == 'UnknownResourceFault'
+
+    def test_list_domains_paginator(self, emulator):
+        for name in ['d1', 'd2', 'd3']:
+            emulator.register_domain(name=name, workflowExecutionRetentionPeriodInDays='1')
+        paginator = emulator.get_paginator('list_domains')
+        pages = list(paginator.paginate(registrationStatus='REGISTERED',
+                                        PaginationConfig={'PageSize': 3}))
+        assert [[d['name'] for d in p['domainInfos']] for p in pages] == [['d', 'd1', 'd2'],
+                                                                          ['d3']]
+
+    def test_get_paginator_raises(self, emulator):
+        with pytest.raises(botocore.exceptions.OperationNotPageableError):
+            emulator.get_paginator('respond_decision_task_completed')
+
+    def test_floto_domains(self, emulator):
+        factory = floto.emulator.EmulatorClientFactory(emulator=emulator)
+        swf = floto.api.Swf(client_factory=factory)
+        swf.domains.register_domain('floto_domain')
+        assert swf.domains.domain_exists('floto_domain')
+
+    def test_floto_types(self, emulator):
+        swf = floto.api.Swf(client_factory=floto.emulator.EmulatorClientFactory(emulator=emulator))
+        swf.register_activity_type(floto.api.ActivityType(domain='d', name='a', version='v1'))
+        described = emulator.describe_activity_type(domain='d',
+                                                    activityType={'name': 'a', 'version': 'v1'})
+        assert described['configuration']['defaultTaskList'] == {'name': 'default'}
+        assert described['typeInfo']['status'] == 'REGISTERED'
+
+    def test_register_type_raises_if_type_exists(self, emulator):
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.register_workflow_type(domain='d', name='wf', version='v1')
+        assert error_code(e) == 'TypeAlreadyExistsFault'
+
+    def test_deprecated_workflow_type(self, emulator):
+        emulator.deprecate_workflow_type(domain='d', workflowType={'name': 'wf', 'version': 'v1'})
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            start(emulator)
+        assert error_code(e) == 'TypeDeprecatedFault'
+
+
+class TestWorkflowExecutions(object):
+    def test_start_workflow_execution(self, emulator):
+        run_id = start(emulator, input='in')
+        history = events(emulator, run_id)
+        assert [e['eventType'] for e in history] == ['WorkflowExecutionStarted',
+                                                     'DecisionTaskScheduled']
+        attributes = history[0]['workflowExecutionStartedEventAttributes']
+        assert attributes['input'] == 'in'
+        assert attributes['taskList'] == {'name': 'dtl'}
+        assert attributes['childPolicy'] == 'TERMINATE'
+        assert history[0]['eventTimestamp'] == START
+
+    def test_start_workflow_execution_raises_if_running(self, emulator):
+        start(emulator)
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            start(emulator)
+        assert error_code(e) == 'WorkflowExecutionAlreadyStartedFault'
+
+    def test_start_workflow_execution_raises_without_default(self, emulator):
+        emulator.register_workflow_type(domain='d', name='wf', version='v2')
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.start_workflow_execution(domain='d', workflowId='wid',
+                                              workflowType={'name': 'wf', 'version': 'v2'})
+        assert error_code(e) == 'DefaultUndefinedFault'
+
+    def test_start_workflow_execution_input_limit(self, emulator):
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            start(emulator, input='x' * 32769)
+        assert error_code(e) == 'ValidationException'
+        assert "'input'" in e.value.response['Error']['Message']
+
+    def test_floto_start_workflow_execution(self, emulator):
+        swf = floto.api.Swf(client_factory=floto.emulator.EmulatorClientFactory(emulator=emulator))
+        response = swf.start_workflow_execution(domain='d', workflow_type_name='wf',
+                                                workflow_type_version='v1', input={'foo': 'bar'})
+        history = events(emulator, response['runId'], workflow_id='wf_v1')
+        assert history[0]['workflowExecutionStartedEventAttributes']['input'] == \
+            '{"foo": "bar"}'
+
+    def test_signal_workflow_execution(self, emulator):
+        run_id = start(emulator)
+        decide(emulator)
+        emulator.signal_workflow_execution(domain='d', workflowId='wid', signalName='s',
+                                           input='i')
+        assert event_types(emulator, run_id)[-2:] == ['WorkflowExecutionSignaled',
+                                                      'DecisionTaskScheduled']
+
+    def test_signal_raises_for_unknown_execution(self, emulator):
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.signal_workflow_execution(domain='d', workflowId='wid', signalName='s')
+        assert error_code(e) == 'UnknownResourceFault'
+
+    def test_terminate_workflow_execution(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task())
+        task = poll_activity_task(emulator)
+        emulator.terminate_workflow_execution(domain='d', workflowId='wid', reason='r')
+
+        assert last_event(emulator, run_id) == ('WorkflowExecutionTerminated',
+                                                {'reason': 'r', 'childPolicy': 'TERMINATE',
+                                                 'cause': 'OPERATOR_INITIATED'})
+        info = emulator.describe_workflow_execution(
+            domain='d', execution={'workflowId': 'wid', 'runId': run_id})['executionInfo']
+        assert info['executionStatus'] == 'CLOSED'
+        assert info['closeStatus'] == 'TERMINATED'
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.respond_activity_task_completed(taskToken=task['taskToken'])
+        assert error_code(e) == 'UnknownResourceFault'
+
+    def test_request_cancel_workflow_execution(self, emulator):
+        run_id = start(emulator)
+        decide(emulator)
+        emulator.request_cancel_workflow_execution(domain='d', workflowId='wid')
+        decide(emulator, {'decisionType': 'CancelWorkflowExecution'})
+        assert last_event(emulator, run_id)[0] == 'WorkflowExecutionCanceled'
+
+    def test_execution_timeout(self, emulator):
+        run_id = start(emulator)
+        emulator.advance_clock(100)
+        assert last_event(emulator, run_id) == ('WorkflowExecutionTimedOut',
+                                                {'timeoutType': 'START_TO_CLOSE',
+                                                 'childPolicy': 'TERMINATE'})
+
+    def test_describe_workflow_execution(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task(), start_timer())
+        description = emulator.describe_workflow_execution(
+            domain='d', execution={'workflowId': 'wid', 'runId': run_id})
+        assert description['executionInfo']['executionStatus'] == 'OPEN'
+        assert description['executionInfo']['startTimestamp'] == START
+        assert description['executionConfiguration']['taskStartToCloseTimeout'] == '10'
+        assert description['openCounts'] == {'openActivityTasks': 1,
+                                             'openDecisionTasks': 0,
+                                             'openTimers': 1,
+                                             'openChildWorkflowExecutions': 0,
+                                             'openLambdaFunctions': 0}
+
+    def test_count_workflow_executions(self, emulator):
+        start(emulator, workflow_id='w1')
+        start(emulator, workflow_id='w2')
+        emulator.terminate_workflow_execution(domain='d', workflowId='w1')
+        start_time_filter = {'oldestDate': START}
+        assert emulator.count_open_workflow_executions(
+            domain='d', startTimeFilter=start_time_filter)['count'] == 1
+        assert emulator.count_closed_workflow_executions(
+            domain='d', startTimeFilter=start_time_filter,
+            closeStatusFilter={'status': 'TERMINATED'})['count'] == 1
+        assert emulator.count_closed_workflow_executions(
+            domain='d', closeStatusFilter={'status': 'COMPLETED'})['count'] == 0
+
+    def test_history_pages(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, start_timer())
+        execution = {'workflowId': 'wid', 'runId': run_id}
+        page = emulator.get_workflow_execution_history(domain='d', execution=execution,
+                                                       maximumPageSize=3, reverseOrder=True)
+        assert [e['eventId'] for e in page['events']] == [5, 4, 3]
+        page = emulator.get_workflow_execution_history(domain='d', execution=execution,
+                                                       maximumPageSize=3, reverseOrder=True,
+                                                       nextPageToken=page['nextPageToken'])
+        assert [e['eventId'] for e in page['events']] == [2, 1]
+        assert 'nextPageToken' not in page
+
+    def test_history_page_size_limit(self, emulator):
+        run_id = start(emulator)
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.get_workflow_execution_history(
+                domain='d', execution={'workflowId': 'wid', 'runId': run_id},
+                maximumPageSize=1001)
+        assert error_code(e) == 'ValidationException'
+
+    def test_history_event_limit(self, emulator):
+        emulator.MAX_HISTORY_EVENTS = 6
+        run_id = start(emulator)
+        decide(emulator, start_timer('t1'), start_timer('t2'))
+        assert last_event(emulator, run_id)[1]['cause'] == 'EVENT_LIMIT_EXCEEDED'
+        assert len(events(emulator, run_id)) == 7
+
+
+class TestDecisionTasks(object):
+    def test_poll_without_decision_task(self, emulator):
+        assert 'taskToken' not in poll_decision_task(emulator)
+
+    def test_poll_for_decision_task(self, emulator):
+        run_id = start(emulator)
+        task = poll_decision_task(emulator, reverseOrder=True)
+        assert task['startedEventId'] == 3
+        assert task['previousStartedEventId'] == 0
+        assert task['workflowExecution'] == {'workflowId': 'wid', 'runId': run_id}
+        assert task['workflowType'] == {'name': 'wf', 'version': 'v1'}
+        assert [e['eventId'] for e in task['events']] == [3, 2, 1]
+        assert 'taskToken' not in poll_decision_task(emulator)
+
+    def test_decision_task_pages(self, emulator):
+        start(emulator)
+        task = poll_decision_task(emulator, reverseOrder=True, maximumPageSize=2)
+        assert [e['eventId'] for e in task['events']] == [3, 2]
+        page = poll_decision_task(emulator, nextPageToken=task['nextPageToken'],
+                                  maximumPageSize=2)
+        assert [e['eventId'] for e in page['events']] == [1]
+        assert page['taskToken'] == task['taskToken']
+        assert page['startedEventId'] == 3
+
+    def test_floto_history_pages(self, emulator, default_client_factory):
+        swf = floto.api.Swf(client_factory=floto.emulator.EmulatorClientFactory(emulator=emulator))
+        start(emulator)
+        decide(emulator, start_timer())
+        emulator.advance_clock(30)
+        response = swf.poll_for_decision_task_page(domain='d', task_list='dtl', page_size=2)
+        history = floto.History(domain='d', task_list='dtl', response=response)
+        assert history.get_workflow_start_event()['eventId'] == 1
+        assert history.is_timer_task_completed('t1')
+
+    def test_respond_decision_task_completed(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, complete_workflow_execution(result='r'))
+        assert event_types(emulator, run_id)[-2:] == ['DecisionTaskCompleted',
+                                                      'WorkflowExecutionCompleted']
+        assert last_event(emulator, run_id)[1] == {'result': 'r',
+                                                   'decisionTaskCompletedEventId': 4}
+
+    def test_respond_raises_for_unknown_token(self, emulator):
+        start(emulator)
+        task = decide(emulator)
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.respond_decision_task_completed(taskToken=task['taskToken'])
+        assert error_code(e) == 'UnknownResourceFault'
+
+    def test_respond_raises_for_payload_limit(self, emulator):
+        run_id = start(emulator)
+        task = poll_decision_task(emulator)
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.respond_decision_task_completed(
+                taskToken=task['taskToken'],
+                decisions=[start_timer(), schedule_activity_task(input='x' * 32769)])
+        message = e.value.response['Error']['Message']
+        assert 'decisions.2.member.scheduleActivityTaskDecisionAttributes.input' in message
+        assert event_types(emulator, run_id)[-1] == 'DecisionTaskStarted'
+
+    def test_respond_raises_for_unsupported_decision(self, emulator):
+        start(emulator)
+        task = poll_decision_task(emulator)
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.respond_decision_task_completed(taskToken=task['taskToken'],
+                                                     decisions=[{'decisionType': 'Unknown'}])
+        assert error_code(e) == 'ValidationException'
+
+    def test_previous_started_event_id(self, emulator):
+        start(emulator)
+        decide(emulator, start_timer(seconds=1))
+        emulator.advance_clock(1)
+        task = poll_decision_task(emulator)
+        assert task['previousStartedEventId'] == 3
+        assert task['startedEventId'] == 8
+
+    def test_events_during_decision_task(self, emulator):
+        run_id = start(emulator)
+        task = poll_decision_task(emulator)
+        emulator.signal_workflow_execution(domain='d', workflowId='wid', signalName='s')
+        emulator.respond_decision_task_completed(taskToken=task['taskToken'],
+                                                 decisions=[complete_workflow_execution()])
+        assert event_types(emulator, run_id)[-4:] == ['WorkflowExecutionSignaled',
+                                                      'DecisionTaskCompleted',
+                                                      'CompleteWorkflowExecutionFailed',
+                                                      'DecisionTaskScheduled']
+        decide(emulator, complete_workflow_execution())
+        assert last_event(emulator, run_id)[0] == 'WorkflowExecutionCompleted'
+
+    def test_decision_task_timeout(self, emulator):
+        run_id = start(emulator)
+        task = poll_decision_task(emulator)
+        emulator.advance_clock(10)
+        assert event_types(emulator, run_id)[-2:] == ['DecisionTaskTimedOut',
+                                                      'DecisionTaskScheduled']
+        with pytest.raises(botocore.exceptions.ClientError):
+            emulator.respond_decision_task_completed(taskToken=task['taskToken'])
+        assert poll_decision_task(emulator)['previousStartedEventId'] == 0
+
+    def test_schedule_activity_task_failed(self, emulator):
+        run_id = start(emulator)
+        decision = schedule_activity_task()
+        decision['scheduleActivityTaskDecisionAttributes']['activityType']['version'] = 'v9'
+        decide(emulator, decision)
+        assert event_types(emulator, run_id)[-2:] == ['ScheduleActivityTaskFailed',
+                                                      'DecisionTaskScheduled']
+        assert events(emulator, run_id)[-2]['scheduleActivityTaskFailedEventAttributes'][
+            'cause'] == 'ACTIVITY_TYPE_DOES_NOT_EXIST'
+
+    def test_schedule_activity_task_id_in_use(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task('a'), schedule_activity_task('a'))
+        assert events(emulator, run_id)[-2]['scheduleActivityTaskFailedEventAttributes'][
+            'cause'] == 'ACTIVITY_ID_ALREADY_IN_USE'
+
+    def test_long_poll(self, emulator):
+        emulator.poll_timeout = 5
+        responses = []
+        poller = threading.Thread(target=lambda: responses.append(poll_decision_task(emulator)))
+        poller.start()
+        start(emulator)
+        poller.join()
+        assert 'taskToken' in responses[0]
+
+
+class TestActivityTasks(object):
+    def test_activity_task(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task(input='in'))
+        task = poll_activity_task(emulator)
+        assert task['activityId'] == 'a1'
+        assert task['input'] == 'in'
+        assert task['activityType'] == {'name': 'act', 'version': 'v1'}
+        assert task['workflowExecution'] == {'workflowId': 'wid', 'runId': run_id}
+
+        emulator.respond_activity_task_completed(taskToken=task['taskToken'], result='r')
+        assert event_types(emulator, run_id)[-4:] == ['ActivityTaskScheduled',
+                                                      'ActivityTaskStarted',
+                                                      'ActivityTaskCompleted',
+                                                      'DecisionTaskScheduled']
+        assert events(emulator, run_id)[-2]['activityTaskCompletedEventAttributes'] == {
+            'result': 'r', 'scheduledEventId': 5, 'startedEventId': 6}
+
+    def test_activity_task_defaults(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task(startToCloseTimeout='7'))
+        attributes = events(emulator, run_id)[-1]['activityTaskScheduledEventAttributes']
+        assert attributes['taskList'] == {'name': 'atl'}
+        assert attributes['startToCloseTimeout'] == '7'
+        assert attributes['heartbeatTimeout'] == '5'
+        assert attributes['decisionTaskCompletedEventId'] == 4
+
+    def test_activity_task_failed(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task())
+        task = poll_activity_task(emulator)
+        emulator.respond_activity_task_failed(taskToken=task['taskToken'], reason='r',
+                                              details='d')
+        assert events(emulator, run_id)[-2]['activityTaskFailedEventAttributes'] == {
+            'reason': 'r', 'details': 'd', 'scheduledEventId': 5, 'startedEventId': 6}
+
+    def test_heartbeat_timeout(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task())
+        task = poll_activity_task(emulator)
+        emulator.advance_clock(4)
+        emulator.record_activity_task_heartbeat(taskToken=task['taskToken'], details='50%')
+        emulator.advance_clock(4)
+        assert event_types(emulator, run_id)[-1] == 'ActivityTaskStarted'
+        emulator.advance_clock(1)
+        assert events(emulator, run_id)[-2]['activityTaskTimedOutEventAttributes'] == {
+            'timeoutType': 'HEARTBEAT', 'details': '50%', 'scheduledEventId': 5,
+            'startedEventId': 6}
+
+    def test_schedule_to_start_timeout(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task())
+        emulator.advance_clock(30)
+        attributes = events(emulator, run_id)[-2]['activityTaskTimedOutEventAttributes']
+        assert attributes['timeoutType'] == 'SCHEDULE_TO_START'
+        assert 'taskToken' not in poll_activity_task(emulator)
+
+    def test_start_to_close_timeout(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task(heartbeatTimeout='NONE'))
+        poll_activity_task(emulator)
+        emulator.advance_clock(20)
+        attributes = events(emulator, run_id)[-2]['activityTaskTimedOutEventAttributes']
+        assert attributes['timeoutType'] == 'START_TO_CLOSE'
+
+    def test_cancel_scheduled_activity_task(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task())
+        emulator.signal_workflow_execution(domain='d', workflowId='wid', signalName='s')
+        decide(emulator, {'decisionType': 'RequestCancelActivityTask',
+                          'requestCancelActivityTaskDecisionAttributes': {'activityId': 'a1'}})
+        assert event_types(emulator, run_id)[-3:] == ['ActivityTaskCancelRequested',
+                                                      'ActivityTaskCanceled',
+                                                      'DecisionTaskScheduled']
+        assert 'taskToken' not in poll_activity_task(emulator)
+
+    def test_cancel_started_activity_task(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, schedule_activity_task())
+        task = poll_activity_task(emulator)
+        assert not emulator.record_activity_task_heartbeat(
+            taskToken=task['taskToken'])['cancelRequested']
+        emulator.signal_workflow_execution(domain='d', workflowId='wid', signalName='s')
+        decide(emulator, {'decisionType': 'RequestCancelActivityTask',
+                          'requestCancelActivityTaskDecisionAttributes': {'activityId': 'a1'}})
+        assert emulator.record_activity_task_heartbeat(
+            taskToken=task['taskToken'])['cancelRequested']
+        emulator.respond_activity_task_canceled(taskToken=task['taskToken'])
+        assert event_types(emulator, run_id)[-2] == 'ActivityTaskCanceled'
+
+    def test_result_limit(self, emulator):
+        start(emulator)
+        decide(emulator, schedule_activity_task())
+        task = poll_activity_task(emulator)
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            emulator.respond_activity_task_completed(taskToken=task['taskToken'],
+                                                     result='x' * 32769)
+        assert error_code(e) == 'ValidationException'
+
+
+class TestTimers(object):
+    def test_timer_fires(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, start_timer(seconds=30))
+        emulator.advance_clock(29)
+        assert event_types(emulator, run_id)[-1] == 'TimerStarted'
+        emulator.advance_clock(1)
+        assert event_types(emulator, run_id)[-2:] == ['TimerFired', 'DecisionTaskScheduled']
+        assert events(emulator, run_id)[-2]['eventTimestamp'] == START + dt.timedelta(
+            seconds=30)
+
+    def test_cancel_timer(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, start_timer())
+        emulator.signal_workflow_execution(domain='d', workflowId='wid', signalName='s')
+        decide(emulator, {'decisionType': 'CancelTimer',
+                          'cancelTimerDecisionAttributes': {'timerId': 't1'}})
+        emulator.advance_clock(30)
+        assert event_types(emulator, run_id)[-1] == 'TimerCanceled'
+
+    def test_timer_id_in_use(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, start_timer(), start_timer())
+        assert events(emulator, run_id)[-2]['startTimerFailedEventAttributes'][
+            'cause'] == 'TIMER_ID_ALREADY_IN_USE'
+
+    def test_timer_fires_during_long_poll(self, emulator):
+        start(emulator)
+        decide(emulator, start_timer(seconds=30))
+        emulator.poll_timeout = 5
+        responses = []
+        poller = threading.Thread(target=lambda: responses.append(poll_decision_task(emulator)))
+        poller.start()
+        emulator.advance_clock(30)
+        poller.join()
+        assert responses[0]['events'][-1]['eventType'] == 'DecisionTaskStarted'
+        assert 'TimerFired' in [e['eventType'] for e in responses[0]['events']]
+
+    def test_timer_of_real_time_clock(self):
+        emulator = floto.emulator.SwfEmulator(poll_timeout=5)
+        emulator.register_domain(name='d', workflowExecutionRetentionPeriodInDays='1')
+        emulator.register_workflow_type(domain='d', name='wf', version='v1',
+                                        defaultTaskList={'name': 'dtl'},
+                                        defaultTaskStartToCloseTimeout='10',
+                                        defaultExecutionStartToCloseTimeout='100',
+                                        defaultChildPolicy='TERMINATE')
+        start(emulator)
+        decide(emulator, start_timer(seconds=1))
+        emulator.clock.advance(0.9)
+        assert 'TimerFired' in [e['eventType'] for e in poll_decision_task(emulator)['events']]
+
+
+class TestChildWorkflowExecutions(object):
+    def start_child(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, {'decisionType': 'StartChildWorkflowExecution',
+                          'startChildWorkflowExecutionDecisionAttributes': {
+                              'workflowId': 'child',
+                              'workflowType': {'name': 'wf', 'version': 'v1'},
+                              'taskList': {'name': 'ctl'},
+                              'input': 'ci'}})
+        task = emulator.poll_for_decision_task(domain='d', taskList={'name': 'ctl'})
+        return run_id, task
+
+    def test_start_child_workflow_execution(self, emulator):
+        run_id, task = self.start_child(emulator)
+        assert event_types(emulator, run_id)[-3:] == ['StartChildWorkflowExecutionInitiated',
+                                                      'ChildWorkflowExecutionStarted',
+                                                      'DecisionTaskScheduled']
+        started = task['events'][0]['workflowExecutionStartedEventAttributes']
+        assert started['input'] == 'ci'
+        assert started['parentWorkflowExecution'] == {'workflowId': 'wid', 'runId': run_id}
+        assert started['parentInitiatedEventId'] == 5
+
+    def test_child_workflow_execution_completed(self, emulator):
+        run_id, task = self.start_child(emulator)
+        emulator.respond_decision_task_completed(taskToken=task['taskToken'],
+                                                 decisions=[complete_workflow_execution('r')])
+        event_type, attributes = last_event(emulator, run_id)
+        assert event_type == 'ChildWorkflowExecutionCompleted'
+        assert attributes['result'] == 'r'
+        assert attributes['workflowExecution']['workflowId'] == 'child'
+        assert attributes['initiatedEventId'] == 5
+        assert attributes['startedEventId'] == 6
+
+    def test_child_policy_terminate(self, emulator):
+        _, task = self.start_child(emulator)
+        emulator.terminate_workflow_execution(domain='d', workflowId='wid')
+        assert last_event(emulator, task['workflowExecution']['runId'], 'child')[1] == {
+            'childPolicy': 'TERMINATE', 'cause': 'CHILD_POLICY_APPLIED'}
+
+    def test_start_child_workflow_execution_failed(self, emulator):
+        run_id = start(emulator)
+        decide(emulator, {'decisionType': 'StartChildWorkflowExecution',
+                          'startChildWorkflowExecutionDecisionAttributes': {
+                              'workflowId': 'wid',
+                              'workflowType': {'name': 'wf', 'version': 'v1'}}})
+        attributes = events(emulator, run_id)[-2][
+            'startChildWorkflowExecutionFailedEventAttributes']
+        assert attributes['cause'] == 'WORKFLOW_ALREADY_RUNNING'
+        assert attributes['initiatedEventId'] == 5
+
+
+@floto.activity(name='emulator_activity', version='v1')
+def emulator_activity(context):
+    return {'input': context.get('activity_task')}
+
+
+class TestFloto(object):
+    def test_decider_and_activity_worker(self, emulator):
+        swf = floto.api.Swf(client_factory=floto.emulator.EmulatorClientFactory(emulator=emulator))
+        swf.register_activity_type(floto.api.ActivityType(domain='d', name='emulator_activity',
+                                                          version='v1'))
+        a1 = ActivityTask(name='emulator_activity', version='v1', activity_id='a1',
+                          input={'i': 1})
+        a2 = ActivityTask(name='emulator_activity', version='v1', activity_id='a2',
+                          requires=[a1])
+        decider_spec = DeciderSpec(domain='d', task_list='dtl', activity_tasks=[a1, a2],
+                                   activity_task_list='atl')
+        decider = floto.decider.Decider(decider_spec=decider_spec, swf=swf)
+        decider.max_polls = 3
+        worker = floto.ActivityWorker(swf=swf, domain='d', task_list='atl',
+                                      task_heartbeat_in_seconds=0)
+        worker.max_polls = 2
+        run_id = start(emulator, input='{"foo": "bar"}')
+
+        emulator.poll_timeout = 5
+        worker_thread = threading.Thread(target=worker.run)
+        worker_thread.start()
+        decider.run()
+        worker_thread.join()
+
+        event_type, attributes = last_event(emulator, run_id)
+        assert event_type == 'WorkflowExecutionCompleted'
+        assert 'a2' in attributes['result']
@@ -0,0 +1,93 @@
+import multiprocessing
+
+import botocore.exceptions
+import pytest
+
+import floto.api
+import floto.emulator
+
+
+@pytest.fixture
+def server():
+    server = floto.emulator.SwfEmulatorServer(clock=floto.emulator.Clock(manual=True),
+                                              poll_timeout=0.01)
+    server.start()
+    client = server.client()
+    client.register_domain(name='d', workflowExecutionRetentionPeriodInDays='1')
+    client.register_workflow_type(domain='d', name='wf', version='v1',
+                                  defaultTaskList={'name': 'dtl'},
+                                  defaultTaskStartToCloseTimeout='10',
+                                  defaultExecutionStartToCloseTimeout='100',
+                                  defaultChildPolicy='TERMINATE')
+    yield server
+    server.stop()
+
+
+def start_workflow_execution(client_factory, workflow_id):
+    swf = floto.api.Swf(client_factory=client_factory)
+    swf.start_workflow_execution(domain='d', workflow_type_name='wf', workflow_type_version='v1',
+                                 workflow_id=workflow_id)
+
+
+class TestSwfEmulatorServer(object):
+    def test_start(self, server):
+        assert server.address[0] == '127.0.0.1'
+        assert server.address[1] > 0
+        assert server.client().describe_domain(name='d')['domainInfo']['status'] == 'REGISTERED'
+
+    def test_client_error(self, server):
+        with pytest.raises(botocore.exceptions.ClientError) as e:
+            server.client().describe_domain(name='unknown')
+        assert e.value.response['Error']['Code'] == 'UnknownResourceFault'
+
+    def test_paginator(self, server):
+        paginator = server.client().get_paginator('list_domains')
+        pages = list(paginator.paginate(registrationStatus='REGISTERED'))
+        assert pages[0]['domainInfos'][0]['name'] == 'd'
+
+    def test_clock(self, server):
+        client = server.client()
+        before = client.now()
+        client.advance_clock(60)
+        assert (client.now() - before).total_seconds() == 60
+
+    def test_child_process(self, server):
+        process = multiprocessing.Process(target=start_workflow_execution,
+                                          args=(server.client_factory(), 'wid'))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        task = server.client().poll_for_decision_task(domain='d', taskList={'name': 'dtl'})
+        assert task['workflowExecution']['workflowId'] == 'wid'
+
+
+class TestEmulatorClientFactory(object):
+    def test_init_raises(self):
+        with pytest.raises(ValueError):
+            floto.emulator.EmulatorClientFactory()
+        with pytest.raises(ValueError):
+            floto.emulator.EmulatorClientFactory(emulator=floto.emulator.SwfEmulator(),
+                                                 address=('127.0.0.1', 1))
+
+    def test_client_of_emulator(self):
+        emulator = floto.emulator.SwfEmulator()
+        factory = floto.emulator.EmulatorClientFactory(emulator=emulator)
+        assert factory.client() is emulator
+        assert factory.client(region_name='eu-west-1', long_poll=True) is emulator
+
+    def test_client_of_server(self, server):
+        factory = server.client_factory()
+        client = factory.client()
+        assert isinstance(client, floto.emulator.SwfEmulatorProxy)
+        assert factory.client(long_poll=True) is client
+
+    def test_client_after_fork(self, server):
+        factory = server.client_factory()
+        client = factory.client()
+        factory._pid = -1
+        assert factory.client() is not client
+
+    def test_swf(self, server):
+        start_workflow_execution(server.client_factory(), 'wid')
+        assert server.client().count_open_workflow_executions(
+            domain='d', startTimeFilter={'oldestDate': server.client().now()})['count'] == 1
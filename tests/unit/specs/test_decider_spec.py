@@ -56,3 +56,40 @@ class TestDeciderSpec():
         assert set([t.name for t in d.activity_tasks]) == set(['name1', 'name2'])
         assert set([t.activity_id for t in d.activity_tasks]) == set(['id1', 'id2'])
         assert d.activity_tasks[0].retry_strategy.is_task_resubmitted(2)
+
+    def test_to_json_references_required_tasks(self):
+        t1 = floto.specs.ActivityTask(name='t1', activity_id='t1')
+        t2 = floto.specs.ActivityTask(name='t2', activity_id='t2', requires=[t1])
+        d = floto.specs.DeciderSpec(activity_tasks=[t1, t2])
+        j = json.loads(d.to_json())
+        assert j['activity_tasks'][1]['requires'] == ['t1']
+
+    def test_from_json_resolves_required_tasks(self):
+        t1 = floto.specs.ActivityTask(name='t1', activity_id='t1')
+        t2 = floto.specs.ActivityTask(name='t2', activity_id='t2', requires=[t1])
+        t3 = floto.specs.Timer(id_='t3', requires=[t1, t2], delay_in_seconds=1)
+        d = floto.specs.DeciderSpec.from_json(
+                floto.specs.DeciderSpec(activity_tasks=[t3, t2, t1]).to_json())
+        t3, t2, t1 = d.activity_tasks
+        assert t2.requires[0] is t1
+        assert t3.requires == [t1, t2]
+
+    def test_from_json_old_format(self):
+        t1 = floto.specs.ActivityTask(name='t1', activity_id='t1')
+        t2 = floto.specs.ActivityTask(name='t2', activity_id='t2', requires=[t1])
+        t3 = floto.specs.ActivityTask(name='t3', activity_id='t3', requires=[t2])
+        nested = [json.loads(json.dumps(t, cls=floto.specs.JSONEncoder)) for t in [t1, t2, t3]]
+        json_str = json.dumps({'type': 'floto.specs.DeciderSpec', 'activity_tasks': nested})
+        assert json_str.count('"name": "t1"') == 3
+
+        d = floto.specs.DeciderSpec.from_json(json_str)
+        t1, t2, t3 = d.activity_tasks
+        assert t3.requires[0] is t2
+        assert t2.requires[0] is t1
+
+    def test_from_json_unknown_required_task(self):
+        json_str = json.dumps({'type': 'floto.specs.DeciderSpec',
+                               'activity_tasks': [{'type': 'floto.specs.ActivityTask',
+                                                   'id_': 't2', 'requires': ['t1']}]})
+        with pytest.raises(ValueError):
+            floto.specs.DeciderSpec.from_json(json_str)
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+import time
+
+import floto
+from floto.activity_worker import ActivityWorker
+
+running = {'asyncio_activity_limited': 0, 'max': 0}
+
+
+@floto.activity(name='asyncio_activity', version='v1')
+async def asyncio_activity(context):
+    await asyncio.sleep(0.2)
+    return {'n': context['activity_task']['n']}
+
+
+@floto.activity(name='asyncio_activity_sync', version='v1')
+def asyncio_activity_sync():
+    return {'thread': threading.current_thread().name}
+
+
+@floto.activity(name='asyncio_activity_fails', version='v1')
+async def asyncio_activity_fails():
+    raise ValueError('Activity failed')
+
+
+@floto.activity(name='asyncio_activity_limited', version='v1')
+async def asyncio_activity_limited():
+    running['asyncio_activity_limited'] += 1
+    running['max'] = max(running['max'], running['asyncio_activity_limited'])
+    await asyncio.sleep(0.02)
+    running['asyncio_activity_limited'] -= 1
+    return 'done'
+
+
+@floto.activity(name='asyncio_activity_sleeps', version='v1')
+async def asyncio_activity_sleeps():
+    await asyncio.sleep(0.1)
+    return 'slept'
+
+
+class SwfStub(object):
+    """Serves the activity tasks <activities> (name, input), then empty polls."""
+
+    def __init__(self, activities):
+        self.activities = list(activities)
+        self.completed = {}
+        self.failed = {}
+        self.heartbeats = []
+        self.polls = 0
+        self.lock = threading.Lock()
+        self.client = self
+
+    def poll_for_activity_task(self, domain=None, task_list=None):
+        with self.lock:
+            self.polls += 1
+            if not self.activities:
+                time.sleep(0.01)
+                return {}
+            name, input_ = self.activities.pop(0)
+            token = 'token_{}'.format(self.polls)
+        response = {'taskToken': token, 'activityId': name,
+                    'activityType': {'name': name, 'version': 'v1'}}
+        if input_:
+            response['input'] = json.dumps({'activity_task': input_})
+        return response
+
+    def respond_activity_task_completed(self, taskToken=None, result=None):
+        with self.lock:
+            self.completed[taskToken] = result
+
+    def respond_activity_task_failed(self, taskToken=None, details=None):
+        with self.lock:
+            self.failed[taskToken] = details
+
+    def record_activity_task_heartbeat(self, task_token=None, details=None):
+        with self.lock:
+            self.heartbeats.append(task_token)
+
+
+def create_worker(swf, **args):
+    return floto.AsyncioActivityWorker(swf=swf, domain='d', task_list='tl',
+                                       task_heartbeat_in_seconds=0, **args)
+
+
+class TestAsyncioActivityWorker(object):
+    def test_run_concurrently(self):
+        swf = SwfStub([('asyncio_activity', {'n': i}) for i in range(200)])
+        worker = create_worker(swf, number_pollers=4)
+        worker.max_polls = 200
+        start = time.time()
+        worker.run()
+        # 200 activities sleeping 0.2s each
+        assert time.time() - start < 5
+        assert worker.number_completed == 200
+        assert sorted(json.loads(r)['n'] for r in swf.completed.values()) == list(range(200))
+        assert worker.number_in_flight == 0
+
+    def test_sync_activity(self):
+        swf = SwfStub([('asyncio_activity_sync', None)])
+        worker = create_worker(swf, number_pollers=1)
+        worker.max_polls = 1
+        worker.run()
+        assert json.loads(swf.completed['token_1'])['thread'] != threading.current_thread().name
+
+    def test_failed_activity(self):
+        swf = SwfStub([('asyncio_activity_fails', None), ('unknown', None)])
+        worker = create_worker(swf, number_pollers=1)
+        worker.max_polls = 2
+        worker.run()
+        assert worker.number_failed == 2
+        assert swf.failed == {'token_1': 'Activity failed',
+                              'token_2': 'No activity with id unknown:v1 registered'}
+
+    def test_activity_limits(self):
+        running['max'] = 0
+        swf = SwfStub([('asyncio_activity_limited', None)] * 10)
+        worker = create_worker(swf, activity_limits={'asyncio_activity_limited:v1': 2})
+        worker.max_polls = 10
+        worker.run()
+        assert worker.number_completed == 10
+        assert running['max'] == 2
+
+    def test_max_in_flight(self):
+        swf = SwfStub([('asyncio_activity_sleeps', None)] * 3)
+        worker = create_worker(swf, number_pollers=2, max_in_flight=2)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        time.sleep(0.05)
+        assert worker.number_in_flight == 2
+        assert swf.polls == 2
+        worker.stop()
+        thread.join()
+        assert list(swf.completed.values()) == ['slept'] * 2
+        assert len(swf.activities) == 1
+
+    def test_heartbeats(self):
+        swf = SwfStub([('asyncio_activity_sleeps', None)])
+        worker = create_worker(swf, number_pollers=1)
+        worker.task_heartbeat_in_seconds = 0.02
+        worker.max_polls = 1
+        worker.run()
+        assert set(swf.heartbeats) == {'token_1'}
+        assert not worker._heartbeats
+
+    def test_stop(self):
+        worker = create_worker(SwfStub([]), number_pollers=2)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        worker.stop()
+        thread.join()
+        assert worker.number_completed == 0
+
+
+class TestAsyncActivity(object):
+    def test_activity_worker(self):
+        swf = SwfStub([('asyncio_activity', {'n': 3})])
+        worker = ActivityWorker(swf=swf, task_list='tl', domain='d', task_heartbeat_in_seconds=0)
+        worker.max_polls = 1
+        worker.run()
+        assert json.loads(swf.completed['token_1']) == {'n': 3}
+
+    def test_run_activity(self):
+        context = {'activity_task': {'n': 4}}
+        assert floto.decorators.run_activity('asyncio_activity:v1', context) == {'n': 4}
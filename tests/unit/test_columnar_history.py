@@ -0,0 +1,162 @@
+import pytest
+from unittest.mock import PropertyMock
+import datetime
+
+import floto
+from floto.columnar_history import ColumnarEvent
+
+
+class SwfMock:
+    def __init__(self):
+        self.pages = {}
+
+    def poll_for_decision_task(self, **args):
+        return self.pages[args['nextPageToken']]
+
+
+def dt(hour):
+    return datetime.datetime(2016, 1, 12, hour=hour, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def page1_events():
+    return [{'eventId': 7,
+             'eventType': 'ActivityTaskCompleted',
+             'eventTimestamp': dt(7),
+             'activityTaskCompletedEventAttributes': {'scheduledEventId': 6,
+                                                      'result': '{"foo": "bar"}'}},
+            {'eventId': 6,
+             'eventType': 'ActivityTaskScheduled',
+             'eventTimestamp': dt(6),
+             'activityTaskScheduledEventAttributes': {'activityId': 'A'}},
+            {'eventId': 5,
+             'eventType': 'ActivityTaskFailed',
+             'eventTimestamp': dt(5),
+             'activityTaskFailedEventAttributes': {'scheduledEventId': 3}},
+            {'eventId': 4,
+             'eventType': 'DecisionTaskStarted',
+             'eventTimestamp': dt(4)}]
+
+
+@pytest.fixture
+def page2_events():
+    return [{'eventId': 3,
+             'eventType': 'ActivityTaskScheduled',
+             'eventTimestamp': dt(3),
+             'activityTaskScheduledEventAttributes': {'activityId': 'B'}},
+            {'eventId': 2,
+             'eventType': 'DecisionTaskStarted',
+             'eventTimestamp': dt(2)},
+            {'eventId': 1,
+             'eventType': 'WorkflowExecutionStarted',
+             'eventTimestamp': dt(1),
+             'workflowExecutionStartedEventAttributes': {'input': '{"wf": "input"}'}}]
+
+
+@pytest.fixture
+def histories(mocker, page1_response, page2_response, page1_events, page2_events):
+    page1_response['events'] = page1_events
+    page1_response['previousStartedEventId'] = 4
+    page1_response['startedEventId'] = 7
+    page2_response['events'] = page2_events
+    page2_response.pop('nextPageToken')
+
+    swf_mock = SwfMock()
+    swf_mock.pages['page2'] = page2_response
+    mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+    return [cls(domain='d', task_list='tl', response=dict(page1_response))
+            for cls in (floto.History, floto.ColumnarHistory)]
+
+
+class TestColumnarHistory(object):
+    def test_get_event(self, histories):
+        history, columnar = histories
+        assert columnar.get_event(6) == history.get_event(6)
+        assert columnar.get_event(1) == history.get_event(1)
+        assert columnar.lowest_event_id == 1
+
+    def test_events_by_type(self, histories):
+        history, columnar = histories
+        for event_type in history.events_by_type:
+            assert columnar.get_events_by_type(event_type) == history.get_events_by_type(event_type)
+        assert columnar.get_events_by_type('foo') == []
+
+    def test_events_by_activity_id(self, histories):
+        history, columnar = histories
+        assert columnar.events_by_activity_id['A']['ActivityTaskCompleted'][0]['eventId'] == 7
+        assert columnar._pending_by_scheduled_id
+        columnar._read_next_event_page()
+        history._read_next_event_page()
+        assert columnar.events_by_activity_id['B']['ActivityTaskFailed'][0]['eventId'] == 5
+        assert not columnar._pending_by_scheduled_id
+
+    def test_queries(self, histories):
+        history, columnar = histories
+        task = floto.specs.ActivityTask(activity_id='A')
+        for h in (history, columnar):
+            assert h.is_activity_task_completed('A')
+            assert not h.is_activity_task_completed('B')
+            assert h.get_number_activity_task_failures('B') == 1
+            assert h.get_result_completed_activity(task) == {'foo': 'bar'}
+            assert h.get_workflow_input() == {'wf': 'input'}
+            assert h.get_id_previous_started(h.get_event(4)) == 2
+            assert h.get_datetime_previous_decision() == dt(4)
+        assert columnar.get_events_for_decision(4, 7) == history.get_events_for_decision(4, 7)
+        assert columnar.get_events_up_to_last_decision('ActivityTaskScheduled') == \
+            history.get_events_up_to_last_decision('ActivityTaskScheduled')
+
+    def test_task_states(self, histories):
+        history, columnar = histories
+        for h in (history, columnar):
+            h._read_next_event_page()
+        assert columnar.task_states.keys() == history.task_states.keys()
+        for id_, state in history.task_states.items():
+            assert columnar.task_states[id_].state == state.state
+            assert columnar.task_states[id_].failures == state.failures
+
+    def test_update(self, histories):
+        response = {'events': [{'eventId': 9,
+                                'eventType': 'DecisionTaskStarted',
+                                'eventTimestamp': dt(9)},
+                               {'eventId': 8,
+                                'eventType': 'ActivityTaskScheduled',
+                                'eventTimestamp': dt(8),
+                                'activityTaskScheduledEventAttributes': {'activityId': 'A'}}],
+                    'previousStartedEventId': 4,
+                    'startedEventId': 9}
+        history, columnar = histories
+        for h in (history, columnar):
+            assert h.update(dict(response))
+            assert not h.is_activity_task_completed('A')
+            assert h.get_events_by_type('DecisionTaskStarted')[0]['eventId'] == 9
+        assert columnar.get_event_task_scheduled('A') == history.get_event_task_scheduled('A')
+
+
+    def test_dumps_loads(self, histories):
+        _, columnar = histories
+        columnar.get_event(6)
+        loaded = floto.History.loads(columnar.dumps(compress=True))
+        assert isinstance(loaded, floto.ColumnarHistory)
+        assert not loaded._decoded_events
+        assert loaded.get_event(6) == columnar.get_event(6)
+        assert loaded.events_by_activity_id['A']['ActivityTaskCompleted'][0]['eventId'] == 7
+
+
+class TestColumnarEvent(object):
+    def test_lazy_attributes(self):
+        history = floto.ColumnarHistory.__new__(floto.ColumnarHistory)
+        history._prefetcher = None
+        history._init_event_store()
+        history._store_event({'eventId': 1, 'eventType': 'TimerStarted',
+                              'timerStartedEventAttributes': {'timerId': 't'}})
+        event = history.decode_event(1)
+        assert isinstance(event, ColumnarEvent)
+        assert event._payload
+        assert event['timerStartedEventAttributes'] == {'timerId': 't'}
+        assert not event._payload
+        assert event == {'eventId': 1, 'eventType': 'TimerStarted',
+                         'timerStartedEventAttributes': {'timerId': 't'}}
+
+    def test_timestamp(self):
+        micros = floto.ColumnarHistory._encode_timestamp(dt(3))
+        assert floto.ColumnarHistory._decode_timestamp(micros) == dt(3)
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import floto
+
+running = threading.Event()
+unblock = threading.Event()
+
+
+@floto.activity(name='concurrent_activity', version='v1')
+def concurrent_activity(context):
+    return {'n': context['activity_task']['n']}
+
+
+@floto.activity(name='concurrent_activity_pid', version='v1', executor='process')
+def concurrent_activity_pid():
+    return {'pid': os.getpid()}
+
+
+@floto.activity(name='concurrent_activity_fails', version='v1')
+def concurrent_activity_fails():
+    raise ValueError('Activity failed')
+
+
+@floto.activity(name='concurrent_activity_blocks', version='v1')
+def concurrent_activity_blocks():
+    running.set()
+    assert unblock.wait(timeout=5)
+    return 'unblocked'
+
+
+class SwfStub(object):
+    """Serves the activity tasks <activities> (name, input), then empty polls."""
+
+    def __init__(self, activities):
+        self.activities = list(activities)
+        self.completed = {}
+        self.failed = {}
+        self.heartbeats = []
+        self.polls = 0
+        self.lock = threading.Lock()
+        self.client = self
+
+    def poll_for_activity_task(self, domain=None, task_list=None):
+        with self.lock:
+            self.polls += 1
+            if not self.activities:
+                time.sleep(0.01)
+                return {}
+            name, input_ = self.activities.pop(0)
+            token = 'token_{}'.format(self.polls)
+        response = {'taskToken': token, 'activityId': name,
+                    'activityType': {'name': name, 'version': 'v1'}}
+        if input_:
+            response['input'] = json.dumps({'activity_task': input_})
+        return response
+
+    def respond_activity_task_completed(self, taskToken=None, result=None):
+        with self.lock:
+            self.completed[taskToken] = result
+
+    def respond_activity_task_failed(self, taskToken=None, details=None):
+        with self.lock:
+            self.failed[taskToken] = details
+
+    def record_activity_task_heartbeat(self, task_token=None, details=None):
+        with self.lock:
+            self.heartbeats.append(task_token)
+
+
+def create_worker(swf, **args):
+    args.setdefault('number_processes', 0)
+    return floto.ConcurrentActivityWorker(swf=swf, domain='d', task_list='tl',
+                                          task_heartbeat_in_seconds=0, **args)
+
+
+class TestConcurrentActivityWorker(object):
+    def test_init(self):
+        worker = create_worker(SwfStub([]), number_threads=4, number_processes=2, queue_size=3)
+        assert worker.max_in_flight == 9
+        assert create_worker(SwfStub([]), max_in_flight=2).max_in_flight == 2
+
+    def test_run(self):
+        swf = SwfStub([('concurrent_activity', {'n': i}) for i in range(10)])
+        worker = create_worker(swf, number_pollers=2, number_threads=4)
+        worker.max_polls = 12
+        worker.run()
+        assert worker.number_polls == 12
+        assert worker.number_completed == 10
+        assert sorted(json.loads(r)['n'] for r in swf.completed.values()) == list(range(10))
+        assert worker.number_in_flight == 0
+
+    def test_failed_activity(self):
+        swf = SwfStub([('concurrent_activity_fails', None), ('unknown', None)])
+        worker = create_worker(swf, number_pollers=1)
+        worker.max_polls = 2
+        worker.run()
+        assert worker.number_failed == 2
+        assert swf.failed == {'token_1': 'Activity failed',
+                              'token_2': 'No activity with id unknown:v1 registered'}
+
+    def test_process_activity(self):
+        swf = SwfStub([('concurrent_activity_pid', None), ('concurrent_activity', {'n': 1})])
+        worker = create_worker(swf, number_pollers=1, number_processes=1)
+        worker.max_polls = 2
+        worker.run()
+        assert json.loads(swf.completed['token_1'])['pid'] != os.getpid()
+        assert json.loads(swf.completed['token_2']) == {'n': 1}
+
+    def test_process_activity_without_process_pool(self):
+        swf = SwfStub([('concurrent_activity_pid', None)])
+        worker = create_worker(swf, number_pollers=1)
+        worker.max_polls = 1
+        worker.run()
+        assert json.loads(swf.completed['token_1'])['pid'] == os.getpid()
+
+    def test_max_in_flight(self):
+        running.clear()
+        unblock.clear()
+        swf = SwfStub([('concurrent_activity_blocks', None)] * 3)
+        worker = create_worker(swf, number_pollers=2, number_threads=4, max_in_flight=2)
+        worker.start()
+        assert running.wait(timeout=5)
+        time.sleep(0.1)
+        assert worker.number_in_flight == 2
+        assert swf.polls == 2
+
+        worker.stop()
+        unblock.set()
+        worker.join()
+        assert list(swf.completed.values()) == ['unblocked'] * 2
+        assert len(swf.activities) == 1
+
+    def test_heartbeats(self):
+        running.clear()
+        unblock.clear()
+        swf = SwfStub([('concurrent_activity_blocks', None)])
+        worker = create_worker(swf, number_pollers=1)
+        worker.task_heartbeat_in_seconds = 0.01
+        worker.max_polls = 1
+        worker.start()
+        assert running.wait(timeout=5)
+        time.sleep(0.1)
+        unblock.set()
+        worker.join()
+        assert set(swf.heartbeats) == {'token_1'}
+
+    def test_stop(self):
+        worker = create_worker(SwfStub([]), number_pollers=2)
+        worker.start()
+        worker.stop()
+        worker.join()
+        assert worker.number_completed == 0
+
+
+class TestActivityExecutor(object):
+    def test_executor(self):
+        assert floto.ACTIVITY_EXECUTORS['concurrent_activity:v1'] == 'thread'
+        assert floto.ACTIVITY_EXECUTORS['concurrent_activity_pid:v1'] == 'process'
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError):
+            floto.activity(name='a', version='v1', executor='fiber')
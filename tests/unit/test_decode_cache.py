@@ -0,0 +1,46 @@
+import floto
+
+
+class TestDecodeCache(object):
+    def test_decode(self):
+        cache = floto.DecodeCache()
+        assert cache.decode(1, '{"foo": "bar"}') == {'foo': 'bar'}
+        assert 1 in cache
+        assert cache.size == 14
+
+    def test_decode_once(self, mocker):
+        cache = floto.DecodeCache()
+        load_string = mocker.patch('floto.specs.JSONEncoder.load_string',
+                                   return_value={'foo': 'bar'})
+        first = cache.decode(1, '{"foo": "bar"}')
+        assert cache.decode(1, '{"foo": "bar"}') is first
+        load_string.assert_called_once_with('{"foo": "bar"}')
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_decode_no_json(self):
+        cache = floto.DecodeCache()
+        assert cache.decode(1, 'foo') == 'foo'
+
+    def test_evict_least_recently_used(self):
+        cache = floto.DecodeCache(max_bytes=12)
+        cache.decode(1, '"1234"')
+        cache.decode(2, '"5678"')
+        cache.decode(1, '"1234"')
+        cache.decode(3, '"abcd"')
+        assert 1 in cache
+        assert 2 not in cache
+        assert cache.size == 12
+
+    def test_payload_larger_than_cache(self):
+        cache = floto.DecodeCache(max_bytes=4)
+        assert cache.decode(1, '"1234"') == '1234'
+        assert len(cache) == 0
+        assert cache.size == 0
+
+    def test_clear(self):
+        cache = floto.DecodeCache()
+        cache.decode(1, '"1234"')
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.size == 0
@@ -0,0 +1,27 @@
+import pytest
+
+from floto.events_view import EventsView
+
+
+class TestEventsView(object):
+    def test_view(self):
+        view = EventsView([1, 2, 3, 4], 1, 3)
+        assert len(view) == 2
+        assert list(view) == [2, 3]
+        assert view[0] == 2
+        assert view[-1] == 3
+        assert view[::-1] == [3, 2]
+        assert view == [2, 3]
+
+    def test_empty(self):
+        view = EventsView([1, 2], 2, 2)
+        assert not view
+        assert view == []
+
+    def test_defaults(self):
+        assert EventsView([1, 2]) == [1, 2]
+
+    def test_index_error(self):
+        view = EventsView([1, 2, 3], 0, 1)
+        with pytest.raises(IndexError):
+            view[1]
@@ -8,11 +8,18 @@ import datetime
 class SwfMock:
     def __init__(self):
         self.pages = {}
+        self.history_requests = []
 
     def poll_for_decision_task(self, **args):
         next_page_token =  args['nextPageToken']
         return self.pages[next_page_token]
 
+    def get_workflow_execution_history(self, **args):
+        self.history_requests.append(args)
+        events = sorted((e for p in self.pages.values() for e in p['events']),
+                        key=lambda e: e['eventId'], reverse=args['reverseOrder'])
+        return {'events': events[:args.get('maximumPageSize', len(events))]}
+
 @pytest.fixture
 def dt1():
     return datetime.datetime(2016, 1, 12, hour=1, tzinfo=datetime.timezone.utc)
@@ -75,6 +82,120 @@ class TestHistory():
         assert h.get_event(1, allow_read_next_event_page=False) == None
         assert h.lowest_event_id == 2
 
+    def test_update(self, history, dt3, dt4):
+        response = {'events': [{'eventId': 5,
+                                'eventTimestamp': dt4,
+                                'eventType': 'DecisionTaskStarted'},
+                               {'eventId': 4,
+                                'eventTimestamp': dt3,
+                                'eventType': 'DecisionTaskCompleted'}],
+                    'previousStartedEventId': 3,
+                    'startedEventId': 5}
+        assert history.update(response)
+        assert history.highest_event_id == 5
+        assert history.lowest_event_id == 1
+        assert history.previous_decision_id == 3
+        assert history.decision_task_started_event_id == 5
+        assert history.get_events_by_type('DecisionTaskStarted')[0]['eventId'] == 5
+        assert history.get_events_by_type('DecisionTaskStarted')[1]['eventId'] == 3
+        assert history.get_event(4)['eventType'] == 'DecisionTaskCompleted'
+
+    def test_update_stops_paging_at_known_events(self, mocker, history, dt3, dt4):
+        page2 = {'events': [{'eventId': 5,
+                             'eventTimestamp': dt3,
+                             'eventType': 'ActivityTaskScheduled',
+                             'activityTaskScheduledEventAttributes': {'activityId': 'a_id'}},
+                            {'eventId': 4,
+                             'eventTimestamp': dt3,
+                             'eventType': 'DecisionTaskCompleted'},
+                            {'eventId': 3,
+                             'eventTimestamp': dt3,
+                             'eventType': 'DecisionTaskStarted'}],
+                 'nextPageToken': 'page3'}
+        swf_mock = SwfMock()
+        swf_mock.pages['page2'] = page2
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+
+        response = {'events': [{'eventId': 6,
+                                'eventTimestamp': dt4,
+                                'eventType': 'ActivityTaskCompleted',
+                                'activityTaskCompletedEventAttributes': {'scheduledEventId': 5}}],
+                    'nextPageToken': 'page2',
+                    'previousStartedEventId': 3,
+                    'startedEventId': 7}
+        assert history.update(response)
+        assert history.lowest_event_id == 1
+        assert history.next_page_token == None
+        assert len(history.get_events_by_type('DecisionTaskStarted')) == 1
+        assert history.is_activity_task_completed('a_id')
+
+    def test_update_with_older_response(self, history, init_response):
+        assert not history.update(init_response)
+
+    def test_update_with_missing_events(self, history, dt4):
+        response = {'events': [{'eventId': 6,
+                                'eventTimestamp': dt4,
+                                'eventType': 'DecisionTaskStarted'}],
+                    'previousStartedEventId': 3,
+                    'startedEventId': 6}
+        assert not history.update(response)
+        assert history.highest_event_id == 3
+
+    def test_read_event_page_skips_known_events(self, history):
+        history._read_event_page([{'eventId': 1, 'eventType': 'WorkflowExecutionStarted'}])
+        assert len(history.get_events_by_type('WorkflowExecutionStarted')) == 1
+
+    def test_prefetch_pages(self, mocker, page1_response, page2_response):
+        page2_response.pop('nextPageToken')
+        swf_mock = SwfMock()
+        swf_mock.pages['page2'] = page2_response
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+        h = floto.History(domain='d', task_list='tl', response=page1_response, prefetch_pages=2)
+        assert h._prefetcher
+        assert h.get_event(1)['eventType'] == 'WorkflowExecutionStarted'
+        assert h.page_fetch_count == 1
+
+    def test_page_fetch_metrics(self, mocker, page1_response, page2_response):
+        swf_mock = SwfMock()
+        swf_mock.pages['page2'] = page2_response
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+        h = floto.History(domain='d', task_list='tl', response=page1_response)
+        assert h.page_fetch_count == 0
+        h._read_next_event_page()
+        assert h.page_fetch_count == 1
+        assert h.page_fetch_seconds >= 0
+
+    def test_close(self, mocker, page1_response):
+        h = floto.History(domain='d', task_list='tl', response=page1_response)
+        h._prefetcher = mocker.Mock(fetch_latencies=[0.1])
+        prefetcher = h._prefetcher
+        h.close()
+        prefetcher.stop.assert_called_once_with()
+        assert h.page_fetch_latencies == [0.1]
+
+    @pytest.mark.parametrize('compress', [False, True])
+    def test_dumps_loads(self, history, compress):
+        history.get_workflow_input()
+        data = history.dumps(compress=compress)
+        loaded = floto.History.loads(data)
+        assert loaded.events_by_id == history.events_by_id
+        assert loaded.events_by_type == history.events_by_type
+        assert loaded.highest_event_id == 3
+        assert loaded.decision_task_started_event_id == 3
+        assert len(loaded.decode_cache) == 0
+        assert loaded.get_workflow_input() == 'workflow_input'
+
+    def test_dumps_shares_events_between_indexes(self, history):
+        loaded = floto.History.loads(history.dumps())
+        assert loaded.events_by_type['DecisionTaskStarted'][0] is loaded.events_by_id[3]
+
+    def test_dumps_with_prefetcher(self, mocker, page1_response):
+        mocker.patch('floto.History._poll_page', return_value={'events':[{'eventId':1}]})
+        h = floto.History(domain='d', task_list='tl', response=page1_response, prefetch_pages=1)
+        loaded = floto.History.loads(h.dumps())
+        assert loaded._prefetcher == None
+        h.close()
+
     def test_get_events_by_type(self, history):
         assert history.get_events_by_type('WorkflowExecutionStarted')[0]['eventId'] == 1
         assert history.get_events_by_type('foo') == []
@@ -89,14 +210,49 @@ class TestHistory():
                       {'eventId':1, 'eventType':'ActivityTaskFailed'},
                       {'eventId':0, 'eventType':'ActivityTaskFailed'}]
 
-        history.events_by_id = {e['eventId']:e for e in raw_events}
+        history._init_event_store()
+        for e in raw_events:
+            history.events_by_id[e['eventId']] = e
+            history.events_by_type.setdefault(e['eventType'], []).append(e)
         history.highest_event_id = 7
         events = history.get_events_for_decision(1,6)
         assert len(events['faulty']) == 3
-        assert set([e['eventId'] for e in events['faulty']]) == set([1,2,3])
+        assert [e['eventId'] for e in events['faulty']] == [1,2,3]
         assert set([e['eventId'] for e in events['completed']]) == set([4,5])
         assert set([e['eventId'] for e in events['decision_failed']]) == set([6])
 
+    def test_get_events_for_decision_reads_pages(self, mocker, page1_response, page2_response,
+                                                 dt1):
+        page2_response['events'] = [{'eventId':1,
+                                     'eventType':'TimerFired',
+                                     'eventTimestamp':dt1,
+                                     'timerFiredEventAttributes':{'timerId':'t_id'}}]
+        swf_mock = SwfMock()
+        swf_mock.pages['page2'] = page2_response
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+        page1_response['previousStartedEventId'] = 0
+        h = floto.History(domain='d', task_list='tl', response=page1_response)
+        events = h.get_events_for_decision(1, 3)
+        assert [e['eventId'] for e in events['completed']] == [1]
+
+    def test_get_events_in_range(self, history):
+        events = history.get_events_in_range('DecisionTaskScheduled', 1, 3)
+        assert isinstance(events, floto.events_view.EventsView)
+        assert [e['eventId'] for e in events] == [2]
+        assert not history.get_events_in_range('DecisionTaskScheduled', 3, 3)
+        assert not history.get_events_in_range('foo', 1, 3)
+
+    def test_get_events_up_to_datetime(self, history, dt2):
+        events = history.get_events_up_to_datetime('DecisionTaskStarted', dt2)
+        assert [e['eventId'] for e in events] == [3]
+        assert events == [history.get_event(3)]
+        assert len(history.get_events_up_to_datetime('WorkflowExecutionStarted', dt2)) == 0
+
+    @pytest.mark.parametrize('value,index',[(7,0),(6,1),(5,1),(4,2),(3,2),(2,3),(1,3)])
+    def test_index_below(self, value, index):
+        events = [{'eventId':6}, {'eventId':4}, {'eventId':2}]
+        assert floto.History._index_below(events, 'eventId', value) == index
+
     def test_event_by_activity_id(self, dt1, dt2, empty_response):
         events = [{'eventId':2, 
                    'eventType':'ActivityTaskCompleted', 
@@ -121,7 +277,8 @@ class TestHistory():
         empty_response['events'] = events
         empty_response['previousStartedEventId'] = 2
         h = floto.History(domain='d', task_list='tl', response=empty_response)
-        assert h.events_by_activity_id['none']['ActivityTaskCompleted'][0]['eventId'] == 3
+        assert h._pending_by_scheduled_id[1][0]['eventId'] == 3
+        assert 'none' not in h.events_by_activity_id
 
     def test_event_by_activity_id_multi_page(self, dt1, dt2, dt3, dt4, dt5, page1_response, 
             page2_response, mocker):
@@ -163,8 +320,9 @@ class TestHistory():
         
         h = floto.History(domain='d', task_list='tl', response=page1_response)
         assert h.events_by_activity_id['A']['ActivityTaskCompleted'][0]['eventId'] == 7
-        assert h.events_by_activity_id['none']['ActivityTaskFailed'][0]['eventId'] == 5
+        assert h._pending_by_scheduled_id[3][0]['eventId'] == 5
         h._read_next_event_page()
+        assert h._pending_by_scheduled_id == {}
         assert h.events_by_activity_id['A']['ActivityTaskCompleted'][0]['eventId'] == 7
         assert h.events_by_activity_id['A']['ActivityTaskScheduled'][0]['eventId'] == 6
         assert h.events_by_activity_id['B']['ActivityTaskFailed'][0]['eventId'] == 5
@@ -232,10 +390,33 @@ class TestHistory():
                   {'eventId':3, 'eventType':'type2'}]
         history._read_event_page(events)
         assert history.events_by_id[3]['eventType'] == 'type2'
-        assert history.events_by_type['type1'][0]['eventId'] == 1
-        assert history.events_by_type['type1'][1]['eventId'] == 2
+        assert history.events_by_type['type1'][0]['eventId'] == 2
+        assert history.events_by_type['type1'][1]['eventId'] == 1
         assert history.events_by_type['type2'][0]['eventId'] == 3
 
+    def test_read_event_page_resolves_pending_events_once(self, history):
+        history._read_event_page([{'eventId':6,
+                                   'eventType':'ActivityTaskCompleted',
+                                   'activityTaskCompletedEventAttributes':{'scheduledEventId':4}},
+                                  {'eventId':5,
+                                   'eventType':'ActivityTaskFailed',
+                                   'activityTaskFailedEventAttributes':{'scheduledEventId':4}}])
+        assert [e['eventId'] for e in history._pending_by_scheduled_id[4]] == [6, 5]
+        history._read_event_page([{'eventId':4,
+                                   'eventType':'ActivityTaskScheduled',
+                                   'activityTaskScheduledEventAttributes':{'activityId':'a_id'}}])
+        events = history.events_by_activity_id['a_id']
+        assert events['ActivityTaskCompleted'][0]['eventId'] == 6
+        assert events['ActivityTaskFailed'][0]['eventId'] == 5
+        assert history._pending_by_scheduled_id == {}
+
+    def test_insert_event(self):
+        events = [{'eventId':5}, {'eventId':2}]
+        floto.History._insert_event(events, {'eventId':1})
+        floto.History._insert_event(events, {'eventId':7})
+        floto.History._insert_event(events, {'eventId':3})
+        assert [e['eventId'] for e in events] == [7, 5, 3, 2, 1]
+
     def test_read_next_event_page(self, mocker, page1_response, page2_response):
         swf_mock = SwfMock()
         swf_mock.pages['page2'] = page2_response
@@ -650,6 +831,92 @@ class TestHistory():
         h = floto.History(domain='d', task_list='tl', response=page1_response)
         assert h.get_number_activity_task_failures('a_id') == 2
 
+    def test_task_states(self, empty_response, dt1, dt2, dt3):
+        empty_response['events'] = [{'eventId':3,
+                                     'eventType':'ActivityTaskFailed',
+                                     'eventTimestamp':dt3,
+                                     'activityTaskFailedEventAttributes':{'scheduledEventId':1}},
+                                    {'eventId':2,
+                                     'eventType':'ActivityTaskStarted',
+                                     'eventTimestamp':dt2,
+                                     'activityTaskStartedEventAttributes':{'scheduledEventId':1}},
+                                    {'eventId':1,
+                                     'eventType':'ActivityTaskScheduled',
+                                     'eventTimestamp':dt1,
+                                     'activityTaskScheduledEventAttributes':{'activityId':'a_id'}}]
+        h = floto.History(domain='d', task_list='tl', response=empty_response)
+        state = h.get_task_state('a_id')
+        assert state.scheduled_event_id == 1
+        assert state.started_event_id == 2
+        assert state.failed_event_id == 3
+        assert state.failures == 1
+        assert state.state == 'failed'
+        assert h.get_task_state('unknown') == None
+
+    def test_get_task_state_reads_pages(self, mocker, page1_response, page2_response, dt1, dt2):
+        page1_response['events'] = [{'eventId':2,
+                                     'eventType':'ActivityTaskCompleted',
+                                     'eventTimestamp':dt2,
+                                     'activityTaskCompletedEventAttributes':{'scheduledEventId':1}}]
+        page2_response['events'] = [{'eventId':1,
+                                     'eventType':'ActivityTaskScheduled',
+                                     'eventTimestamp':dt1,
+                                     'activityTaskScheduledEventAttributes':{'activityId':'a_id'}}]
+        page2_response.pop('nextPageToken', None)
+
+        swf_mock = SwfMock()
+        swf_mock.pages['page2'] = page2_response
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+
+        h = floto.History(domain='d', task_list='tl', response=page1_response)
+        assert h.get_task_state('a_id') == None
+        state = h.get_task_state('a_id', required='scheduled_event_id')
+        assert state.scheduled_event_id == 1
+        assert state.is_completed
+
+    def test_get_open_task_counts(self, mocker, page1_response, page2_response, dt1, dt2, dt3):
+        page1_response['events'] = [{'eventId':5,
+                                     'eventType':'TimerStarted',
+                                     'eventTimestamp':dt3,
+                                     'timerStartedEventAttributes':{'timerId':'t_id'}},
+                                    {'eventId':4,
+                                     'eventType':'ActivityTaskCompleted',
+                                     'eventTimestamp':dt3,
+                                     'activityTaskCompletedEventAttributes':{'scheduledEventId':2}}]
+        page2_response['events'] = [{'eventId':3,
+                                     'eventType':'ActivityTaskScheduled',
+                                     'eventTimestamp':dt2,
+                                     'activityTaskScheduledEventAttributes':{'activityId':'b_id'}},
+                                    {'eventId':2,
+                                     'eventType':'ActivityTaskScheduled',
+                                     'eventTimestamp':dt2,
+                                     'activityTaskScheduledEventAttributes':{'activityId':'a_id'}},
+                                    {'eventId':1,
+                                     'eventType':'WorkflowExecutionStarted',
+                                     'eventTimestamp':dt1}]
+        page2_response.pop('nextPageToken')
+        swf_mock = SwfMock()
+        swf_mock.pages['page2'] = page2_response
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+
+        page1_response['previousStartedEventId'] = 0
+        h = floto.History(domain='d', task_list='tl', response=page1_response)
+        assert h.get_open_task_counts() == {'openActivityTasks':1, 'openTimers':1}
+        assert not h._has_next_event_page()
+
+    def test_timer_canceled_by_timer_id(self, init_response, dt1, dt2):
+        init_response['events'] = [{'eventId':2,
+                                    'eventType':'TimerCanceled',
+                                    'eventTimestamp':dt2,
+                                    'timerCanceledEventAttributes':{'timerId':'t_id'}},
+                                   {'eventId':1,
+                                    'eventType':'TimerStarted',
+                                    'eventTimestamp':dt1,
+                                    'timerStartedEventAttributes':{'timerId':'t_id'}}]
+        h = floto.History(domain='d', task_list='tl', response=init_response)
+        assert h.get_task_state('t_id').state == 'canceled'
+        assert h.get_open_task_counts() == {'openActivityTasks':0, 'openTimers':0}
+
     def test_get_workflow_input(self, history):
         assert history.get_workflow_input() == 'workflow_input' 
 
@@ -659,6 +926,58 @@ class TestHistory():
         mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
         h = floto.History(domain='d', task_list='tl', response=page1_response)
         assert h.get_workflow_input() == 'workflow_input' 
+        assert h.next_page_token == 'page2'
+        assert swf_mock.history_requests == [{'domain':'d',
+                                              'execution':{'runId':'val_run_id',
+                                                           'workflowId':'val_workflow_id'},
+                                              'reverseOrder':False,
+                                              'maximumPageSize':1}]
+        assert h.get_workflow_input() == 'workflow_input'
+        assert len(swf_mock.history_requests) == 1
+
+    def test_get_workflow_input_page2_without_execution(self, mocker, page1_response,
+                                                        page2_response):
+        swf_mock = SwfMock()
+        swf_mock.pages['page2'] = page2_response
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+        page1_response.pop('workflowExecution')
+        h = floto.History(domain='d', task_list='tl', response=page1_response)
+        assert h.get_workflow_input() == 'workflow_input'
+        assert h.next_page_token == 'page3'
+        assert not swf_mock.history_requests
+
+    def test_load_events_for_decision(self, mocker, dt1, dt2, dt3):
+        pages = [{'events':[{'eventId':6, 'eventType':'DecisionTaskStarted', 'eventTimestamp':dt3},
+                            {'eventId':5,
+                             'eventType':'ActivityTaskCompleted',
+                             'eventTimestamp':dt3,
+                             'activityTaskCompletedEventAttributes':{'scheduledEventId':2}}],
+                  'nextPageToken':'page2',
+                  'previousStartedEventId':4,
+                  'startedEventId':6},
+                 {'events':[{'eventId':4, 'eventType':'DecisionTaskStarted', 'eventTimestamp':dt2},
+                            {'eventId':3, 'eventType':'DecisionTaskScheduled',
+                             'eventTimestamp':dt2}],
+                  'nextPageToken':'page3'},
+                 {'events':[{'eventId':2,
+                             'eventType':'ActivityTaskScheduled',
+                             'eventTimestamp':dt1,
+                             'activityTaskScheduledEventAttributes':{'activityId':'a_id'}}],
+                  'nextPageToken':'page4'},
+                 {'events':[{'eventId':1, 'eventType':'WorkflowExecutionStarted',
+                             'eventTimestamp':dt1}]}]
+        swf_mock = SwfMock()
+        swf_mock.pages.update({'page2':pages[1], 'page3':pages[2], 'page4':pages[3]})
+        mocker.patch('floto.api.Swf.client', new_callable=PropertyMock, return_value=swf_mock)
+
+        h = floto.History(domain='d', task_list='tl', response=pages[0])
+        assert h.decision_page_fetch_count == 1
+        assert h.load_events_for_decision() == {2, 4, 5, 6}
+        assert h.lowest_event_id == 2
+        assert h.next_page_token == 'page4'
+        assert h.decision_page_fetch_count == 2
+        assert h.get_event_task_scheduled('a_id')['eventId'] == 2
+        assert h.next_page_token == 'page4'
 
     def test_get_workflow_input_without_input(self, empty_response, dt1):
         events = [{'eventId':1,
@@ -693,6 +1012,30 @@ class TestHistory():
         task = floto.specs.ActivityTask(activity_id='a_id')
         assert h.get_result_completed_activity(task) == {'foo':'bar'}
 
+    def test_get_result_completed_activity_decoded_once(self, dt1, dt2, empty_response, mocker):
+        empty_response['events'] = [{'eventId':2,
+                                     'eventType':'ActivityTaskCompleted',
+                                     'eventTimestamp':dt2,
+                                     'activityTaskCompletedEventAttributes':{
+                                         'scheduledEventId':1, 'result':'{"foo":"bar"}'}},
+                                    {'eventId':1,
+                                     'eventType':'ActivityTaskScheduled',
+                                     'eventTimestamp':dt1,
+                                     'activityTaskScheduledEventAttributes':{'activityId':'a_id'}}]
+        h = floto.History(domain='d', task_list='tl', response=empty_response)
+        task = floto.specs.ActivityTask(activity_id='a_id')
+        spy = mocker.spy(floto.specs.JSONEncoder, 'load_string')
+        for _ in range(3):
+            assert h.get_result_completed_activity(task) == {'foo':'bar'}
+        assert spy.call_count == 1
+        assert h.get_result_completed_activity(task, raw=True) == '{"foo":"bar"}'
+
+    def test_get_workflow_input_raw(self, history):
+        assert history.get_workflow_input(raw=True) == 'workflow_input'
+        assert 1 not in history.decode_cache
+        assert history.get_workflow_input() == 'workflow_input'
+        assert 1 in history.decode_cache
+
     def test_get_result_completed_activity_rescheduled(self, dt1, dt2, dt3, page1_response, 
             page2_response, mocker):
 
@@ -0,0 +1,43 @@
+import pytest
+
+import floto
+
+
+class TestHistoryCache(object):
+    def test_put_get(self):
+        cache = floto.HistoryCache()
+        cache.put('run_id', 'history')
+        assert cache.get('run_id') == 'history'
+        assert 'run_id' in cache
+
+    def test_get_unknown(self):
+        cache = floto.HistoryCache()
+        assert cache.get('run_id') == None
+
+    def test_remove(self):
+        cache = floto.HistoryCache()
+        cache.put('run_id', 'history')
+        cache.remove('run_id')
+        cache.remove('unknown_run_id')
+        assert len(cache) == 0
+
+    def test_evict_least_recently_used(self):
+        cache = floto.HistoryCache(max_size=2)
+        cache.put('r1', 'h1')
+        cache.put('r2', 'h2')
+        cache.get('r1')
+        cache.put('r3', 'h3')
+        assert 'r1' in cache
+        assert 'r2' not in cache
+        assert 'r3' in cache
+
+    def test_evict_expired(self, mocker):
+        now = mocker.patch('floto.HistoryCache._now', return_value=0)
+        cache = floto.HistoryCache(max_age_in_seconds=10)
+        cache.put('r1', 'h1')
+        now.return_value = 5
+        cache.put('r2', 'h2')
+        now.return_value = 11
+        assert cache.get('r1') == None
+        assert cache.get('r2') == 'h2'
+        assert len(cache) == 1
@@ -0,0 +1,29 @@
+import pytest
+
+from floto.history_page_prefetcher import HistoryPagePrefetcher
+
+
+class TestHistoryPagePrefetcher(object):
+    def test_next_page(self):
+        pages = {'p1': {'events': [2], 'nextPageToken': 'p2'},
+                 'p2': {'events': [1]}}
+        prefetcher = HistoryPagePrefetcher(lambda token: pages[token], 'p1', max_pages=1)
+        assert prefetcher.next_page()['events'] == [2]
+        assert prefetcher.next_page()['events'] == [1]
+        prefetcher._thread.join(1)
+        assert prefetcher.fetch_count == 2
+
+    def test_next_page_raises(self):
+        def fetch_page(token):
+            raise ValueError('page not available')
+
+        prefetcher = HistoryPagePrefetcher(fetch_page, 'p1')
+        with pytest.raises(ValueError):
+            prefetcher.next_page()
+
+    def test_stop(self):
+        prefetcher = HistoryPagePrefetcher(lambda token: {'nextPageToken': token}, 'p1',
+                                           max_pages=1)
+        prefetcher.stop()
+        prefetcher._thread.join(1)
+        assert not prefetcher._thread.is_alive()
@@ -0,0 +1,54 @@
+import os
+
+import floto
+
+
+class TestHistorySnapshotStore(object):
+    def test_save_load(self, tmpdir, init_response):
+        store = floto.HistorySnapshotStore(str(tmpdir))
+        history = floto.History(domain='d', task_list='tl', response=init_response)
+        path = store.save('run/id+', history)
+        assert path.endswith('3.history.z')
+        assert os.path.dirname(path) == os.path.join(str(tmpdir), 'run%2Fid%2B')
+
+        loaded = store.load('run/id+')
+        assert isinstance(loaded, floto.History)
+        assert loaded.events_by_id == history.events_by_id
+        assert loaded.get_workflow_input() == 'workflow_input'
+
+    def test_load_unknown(self, tmpdir):
+        store = floto.HistorySnapshotStore(str(tmpdir))
+        assert store.load('run_id') == None
+
+    def test_save_removes_older_snapshots(self, tmpdir, init_response):
+        store = floto.HistorySnapshotStore(str(tmpdir), compress=False)
+        history = floto.History(domain='d', task_list='tl', response=init_response)
+        history.highest_event_id = 2
+        store.save('run_id', history)
+        history.highest_event_id = 3
+        path = store.save('run_id', history)
+        assert path.endswith('3.history')
+        assert store.last_event_ids('run_id') == [3]
+
+    def test_load_last_event_id(self, tmpdir, init_response):
+        store = floto.HistorySnapshotStore(str(tmpdir))
+        history = floto.History(domain='d', task_list='tl', response=init_response)
+        store.save('run_id', history)
+        assert store.load('run_id', last_event_id=3)
+        assert store.load('run_id', last_event_id=4) == None
+
+    def test_load_corrupt_snapshot(self, tmpdir):
+        store = floto.HistorySnapshotStore(str(tmpdir))
+        os.makedirs(os.path.join(str(tmpdir), 'run_id'))
+        with open(os.path.join(str(tmpdir), 'run_id', '3.history.z'), 'wb') as f:
+            f.write(b'foo')
+        assert store.load('run_id') == None
+
+    def test_remove(self, tmpdir, init_response):
+        store = floto.HistorySnapshotStore(str(tmpdir))
+        history = floto.History(domain='d', task_list='tl', response=init_response)
+        store.save('run_id', history)
+        store.remove('run_id')
+        store.remove('unknown_run_id')
+        assert store.last_event_ids('run_id') == []
+        assert os.listdir(str(tmpdir)) == []
@@ -0,0 +1,86 @@
+import floto
+
+
+class TestTaskState(object):
+    def test_init(self):
+        state = floto.TaskState()
+        assert state.scheduled_event_id == None
+        assert state.failures == 0
+        assert not state.is_completed
+        assert state.state == None
+
+    def test_add_event(self):
+        state = floto.TaskState()
+        state.add_event('ActivityTaskScheduled', 1)
+        state.add_event('ActivityTaskStarted', 2)
+        assert state.state == 'started'
+        state.add_event('ActivityTaskCompleted', 3)
+        assert state.completed_event_id == 3
+        assert state.is_completed
+        assert state.state == 'completed'
+
+    def test_add_event_keeps_latest(self):
+        state = floto.TaskState()
+        state.add_event('ActivityTaskScheduled', 5)
+        state.add_event('ActivityTaskScheduled', 1)
+        assert state.scheduled_event_id == 5
+
+    def test_rescheduled_after_completion(self):
+        state = floto.TaskState()
+        for event_type, event_id in [('ActivityTaskScheduled', 1), ('ActivityTaskCompleted', 2),
+                                     ('ActivityTaskScheduled', 3)]:
+            state.add_event(event_type, event_id)
+        assert not state.is_completed
+        assert state.state == 'scheduled'
+
+    def test_failures_since_completion(self):
+        state = floto.TaskState()
+        for event_type, event_id in [('ActivityTaskTimedOut', 2), ('ActivityTaskCompleted', 3),
+                                     ('ActivityTaskFailed', 5), ('ActivityTaskTimedOut', 7)]:
+            state.add_event(event_type, event_id)
+        assert state.failures == 2
+        assert state.state == 'timed_out'
+
+    def test_failures_read_in_reverse_order(self):
+        state = floto.TaskState()
+        for event_type, event_id in [('ActivityTaskFailed', 7), ('ActivityTaskFailed', 5),
+                                     ('ActivityTaskCompleted', 3), ('ActivityTaskTimedOut', 2)]:
+            state.add_event(event_type, event_id)
+        assert state.failures == 2
+
+    def test_failures_before_later_completion(self):
+        state = floto.TaskState()
+        state.add_event('ActivityTaskFailed', 2)
+        state.add_event('ActivityTaskCompleted', 3)
+        assert state.failures == 0
+
+    def test_timer(self):
+        state = floto.TaskState()
+        state.add_event('TimerStarted', 1)
+        assert state.is_timer
+        assert not state.is_completed
+        state.add_event('TimerFired', 2)
+        assert state.is_completed
+
+    def test_is_open(self):
+        state = floto.TaskState()
+        assert not state.is_open
+        state.add_event('ActivityTaskScheduled', 1)
+        assert state.is_open
+        state.add_event('ActivityTaskStarted', 2)
+        assert state.is_open
+        state.add_event('ActivityTaskFailed', 3)
+        assert not state.is_open
+        state.add_event('ActivityTaskScheduled', 4)
+        assert state.is_open
+        state.add_event('ActivityTaskCanceled', 5)
+        assert not state.is_open
+        assert state.state == 'canceled'
+
+    def test_timer_canceled(self):
+        state = floto.TaskState()
+        state.add_event('TimerStarted', 1)
+        assert state.is_open
+        state.add_event('TimerCanceled', 2)
+        assert not state.is_open
+        assert not state.is_completed